@@ -1,11 +1,16 @@
-import io
 import json
 from collections import Counter
-from contextlib import redirect_stdout
+from functools import partial
 
 import BasicAlgorithm
+import BeamSearch
+import BidirectionalAlgorithm
+import Canonical
 import ComparingAlgorithm
 import NumOfGatesOptimized
+from Permutation import Permutation
+from ResultsCache import ResultsCache
+from Trace import NULL_TRACER, PrintTracer
 from TruthTable import TruthTable
 
 # --- dane AES ---
@@ -28,15 +33,18 @@ def summarize_circuit(cir):
     hist = dict(Counter(names))
     return num, cost, hist, names, instr
 
-def run_one(tt, algo_mod, label, verbose=False, out_path=None):
-    if verbose:
-        cir = algo_mod.algorithm(tt, verbose=True)
-    else:
-        with redirect_stdout(io.StringIO()):
-            cir = algo_mod.algorithm(tt, verbose=False)
+def run_one(tt, algo_mod, label, verbose=False, out_path=None, optimize=False, cache=None):
+    expected = Permutation(tt.rows).inverse()  # obwód poprawny <=> realizuje f^-1
+    algo = partial(cache.synthesize, algo_mod=algo_mod) if cache is not None else algo_mod.algorithm
+    cir = algo(tt, tracer=PrintTracer() if verbose else NULL_TRACER)
 
-    ideal = TruthTable(tt.n)
-    ok = tt.get_vectors() == ideal.get_vectors()
+    ok = cir.to_permutation(tt.n) == expected
+
+    if optimize:
+        before = len(cir.instructions)
+        cir.optimize(cost=lambda g: gate_cost(g.qubits))
+        ok = ok and cir.to_permutation(tt.n) == expected
+        print(f"[{label}] optymalizacja: {before} -> {len(cir.instructions)} bramek")
 
     num_gates, circuit_cost, hist, names, instr = summarize_circuit(cir)
 
@@ -60,7 +68,24 @@ def run_one(tt, algo_mod, label, verbose=False, out_path=None):
             json.dump(record, f, ensure_ascii=False, indent=2)
         print(f"  zapisano: {out_path}")
 
-def main():
+def run_cheapest_member(tt, algo_mod, label, cache=None):
+    # odwrócenie x przesunięcia cykliczne kubitów — 2 * n syntez zamiast pełnej klasy 2 * n!
+    candidates = [
+        Canonical.Transform(inverse, tuple((q + k) % tt.n for q in range(tt.n)))
+        for k in range(tt.n)
+        for inverse in (False, True)
+    ]
+    algo = partial(cache.synthesize, algo_mod=algo_mod) if cache is not None else algo_mod.algorithm
+    cir, t = Canonical.cheapest_member(tt, algo, lambda g: gate_cost(g.qubits), candidates)
+    ok = cir.to_permutation(tt.n) == Permutation(tt.rows).inverse()
+    num_gates, circuit_cost, _, _, _ = summarize_circuit(cir)
+    print(
+        f"[{label}] najtańszy element klasy: inverse={t.inverse}, sigma={t.sigma} | "
+        f"ok={ok} | bramki={num_gates} | koszt={circuit_cost}"
+    )
+
+def main(optimize=False):
+    # optimize: Circuit.optimize po syntezie — na obwodach AES zyskuje pojedyncze bramki
 
     tt_sbox = TruthTable(8, initial_permutation=sbox)
     tt_isbox = TruthTable(8, initial_permutation=isbox)
@@ -69,13 +94,22 @@ def main():
         ("SBOX / Basic", tt_sbox, BasicAlgorithm, "sbox_basic.json"),
         ("SBOX / Comparing_Cost_Algorithm", tt_sbox, ComparingAlgorithm, "sbox_comparing_cost.json"),
         ("SBOX / Optimized_Num_Of_Gates", tt_sbox, NumOfGatesOptimized, "sbox_optimized_num_of_gates.json"),
+        ("SBOX / Bidirectional", tt_sbox, BidirectionalAlgorithm, "sbox_bidirectional.json"),
+        ("SBOX / Beam_Search", tt_sbox, BeamSearch, "sbox_beam_search.json"),
         ("ISBOX / Basic", tt_isbox, BasicAlgorithm, "isbox_basic.json"),
         ("ISBOX / Comparing_Cost_Algorithm", tt_isbox, ComparingAlgorithm, "isbox_comparing_cost.json"),
         ("ISBOX / Optimized_Num_Of_Gates", tt_isbox, NumOfGatesOptimized, "isbox_optimized_num_of_gates.json"),
+        ("ISBOX / Bidirectional", tt_isbox, BidirectionalAlgorithm, "isbox_bidirectional.json"),
+        ("ISBOX / Beam_Search", tt_isbox, BeamSearch, "isbox_beam_search.json"),
     ]
 
-    for label, tt, mod, out_name in jobs:
-        run_one(tt.__copy__(), mod, label, verbose=False, out_path=out_name)
+    # obwody zapamiętane z poprzednich uruchomień (klucz: moduł, wersja źródeł, permutacja)
+    with ResultsCache("aes_results_cache.sqlite") as cache:
+        for label, tt, mod, out_name in jobs:
+            run_one(tt.__copy__(), mod, label, out_path=out_name, optimize=optimize, cache=cache)
+
+        for label, tt, mod, _ in jobs:
+            run_cheapest_member(tt, mod, label, cache=cache)
 
 if __name__ == "__main__":
     main()
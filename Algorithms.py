@@ -0,0 +1,39 @@
+from types import ModuleType
+from typing import Dict, List
+
+import BasicAlgorithm
+import BeamSearch
+import BidirectionalAlgorithm
+import ComparingAlgorithm
+import NumOfGatesOptimized
+
+# Rejestr algorytmów syntezy: nazwa z linii poleceń -> moduł z funkcją
+# algorithm(f, verbose=False, stats=None, tracer=None).
+ALGORITHMS: Dict[str, ModuleType] = {
+    "basic": BasicAlgorithm,
+    "comparing": ComparingAlgorithm,
+    "numgates": NumOfGatesOptimized,
+    "bidirectional": BidirectionalAlgorithm,
+    "beam": BeamSearch,
+}
+
+DEFAULT = "numgates"
+
+
+def get(name: str) -> ModuleType:
+    try:
+        return ALGORITHMS[name]
+    except KeyError:
+        raise ValueError(
+            f"Nieznany algorytm: {name!r} (dozwolone: {', '.join(ALGORITHMS)})"
+        ) from None
+
+
+def parse_names(spec: str) -> List[str]:
+    """Lista nazw z napisu "basic,comparing" (bez powtórzeń, w podanej kolejności)."""
+    names = list(dict.fromkeys(s.strip() for s in spec.split(",") if s.strip()))
+    if not names:
+        raise ValueError("Pusta lista algorytmów")
+    for name in names:
+        get(name)
+    return names
@@ -1,17 +1,31 @@
+import time
+from typing import Optional
+
 from Circuit import Circuit
 from LogicGate import LogicGate
+from SynthesisStats import SynthesisStats
+from Trace import Tracer, resolve
 from TruthTable import TruthTable
 
 
-def algorithm(f: TruthTable, verbose: bool = False) -> Circuit:
+def algorithm(
+    f: TruthTable,
+    verbose: bool = False,
+    stats: Optional[SynthesisStats] = None,
+    tracer: Optional[Tracer] = None,
+) -> Circuit:
+    tracer = resolve(tracer, verbose)
+    if stats is not None:
+        stats.runs += 1
+        stats.table_copies += 1  # ideal
+        t0 = time.perf_counter()
     num_qubits = f.n
     ideal = TruthTable(num_qubits)
 
     cir = Circuit()
 
-    if verbose:
-        print("cel:", ideal.get_vectors())
-        print("obecny stan:", f.get_vectors())
+    if tracer.enabled:
+        tracer.event("start", target=ideal.get_vectors(), state=f.get_vectors())
 
     # Step 1:
     while any(f.get_single_vector(0)):
@@ -20,60 +34,63 @@ def algorithm(f: TruthTable, verbose: bool = False) -> Circuit:
             if bit == 1:
                 temp_gate = LogicGate(idx)
                 temp_gate.apply_gate_to_truth_table(f)
-                cir.add_gate_from_idx(idx)
+                cir.add_gate(temp_gate)
 
-    if verbose:
-        print("1. stan:", f.get_vectors())
+    if stats is not None:
+        t1 = time.perf_counter()
+        stats.step1_s += t1 - t0
+        step1_gates = len(cir.instructions)
+    if tracer.enabled:
+        tracer.event("step1", state=f.get_vectors())
 
     # Step 2:
     for i in range(1, 2 ** f.n):
         fv = f.get_single_vector(i)
         iv = ideal.get_single_vector(i)
 
-        if verbose:
-            print("i:", i, "fv:", fv, "iv:", iv)
+        if tracer.enabled:
+            tracer.event("row", i=i, fv=fv, iv=iv)
 
         if fv == iv:
-            if verbose:
-                print("takie same")
+            if tracer.enabled:
+                tracer.event("row_ok")
             continue
 
         # OBLICZ p i q na bazie aktualnego fv i iv
         p = [k for k, (a, b) in enumerate(zip(iv, fv)) if a == 1 and b == 0]
         q = [k for k, (a, b) in enumerate(zip(iv, fv)) if a == 0 and b == 1]
 
-        if verbose:
-            print("p:", p)
-            print("q:", q)
-            print(f"Wiersz i={i}: f={fv}, ideal={iv}")
+        if tracer.enabled:
+            tracer.event("row_plan", p=p, q=q)
 
         for target in list(p):
             controls = [j for j, b in enumerate(fv) if b == 1 and j != target]
-            if verbose:
-                print("Ptarget:", target, "Pcontrols:", controls)
-
             temp_gate = LogicGate(target, *controls)
             temp_gate.apply_gate_to_truth_table(f)
-            cir.add_gate_from_idx(target, *controls)
+            cir.add_gate(temp_gate)
 
             fv = f.get_single_vector(i)
-            if verbose:
-                print("po P:", f.get_vectors())
+            if tracer.enabled:
+                tracer.event("gate", i=i, target=target, controls=controls, phase="P")
 
         q = [k for k, (a, b) in enumerate(zip(iv, fv)) if a == 0 and b == 1]
         for target in list(q):
             controls = [j for j, b in enumerate(iv) if b == 1 and j != target]
-            if verbose:
-                print("Qtarget:", target, "Qcontrols:", controls)
-
             temp_gate = LogicGate(target, *controls)
             temp_gate.apply_gate_to_truth_table(f)
-            cir.add_gate_from_idx(target, *controls)
+            cir.add_gate(temp_gate)
             fv = f.get_single_vector(i)
-            if verbose:
-                print("po Q:", f.get_vectors())
-
-    if verbose:
-        cir.show_gates()
+            if tracer.enabled:
+                tracer.event("gate", i=i, target=target, controls=controls, phase="Q")
+
+    if stats is not None:
+        # jedna bramka na bit (bez wyboru podzbiorów), zawsze bezpieczna
+        stats.subsets_enumerated += len(cir.instructions) - step1_gates
+        stats.step2_s += time.perf_counter() - t1
+        stats.gates_applied += len(cir.instructions)
+
+    if tracer.enabled:
+        tracer.event("circuit")
+        cir.show_gates(tracer)
 
     return cir
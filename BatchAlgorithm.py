@@ -0,0 +1,102 @@
+from typing import Any, Dict, List, Sequence, Tuple
+
+from Circuit import Circuit
+from LogicGate import LogicGate
+from TruthTable import TruthTable
+
+try:
+    import numpy as np
+except ImportError:  # numpy jest opcjonalny, potrzebny tylko tutaj
+    np = None  # type: ignore[assignment]
+
+
+def _gate_from_masks(n: int, target: int, cmask: int, cache: Dict[Tuple[int, int], LogicGate]):
+    gate = cache.get((target, cmask))
+    if gate is None:
+        controls = [j for j in range(n) if cmask >> (n - 1 - j) & 1 and j != target]
+        gate = LogicGate(target, *controls)
+        cache[(target, cmask)] = gate
+    return gate
+
+
+def _flip_matching(R, active, cmask, bit: int) -> None:
+    """W wierszach R[active] zawierających cmask (skalar lub wektor per permutacja) neguje bit."""
+    sub = R[active]
+    sub[(sub & cmask) == cmask] ^= bit
+    R[active] = sub
+
+
+def synthesize(perms: Sequence[Sequence[int]], n: int):
+    """
+    Procedura BasicAlgorithm wykonywana równolegle (lockstep) dla K permutacji n-bitowych.
+    Tablica R ma kształt (K, 2^n); w każdym kroku ta sama pozycja bitu jest przetwarzana
+    jednym wektorowym XOR-em dla wszystkich permutacji, które jej potrzebują.
+    Zwraca (lista obwodów, końcowa tablica R) — po syntezie każdy wiersz R to identyczność.
+    """
+    if np is None:
+        raise ImportError("BatchAlgorithm wymaga biblioteki numpy")
+
+    N = 1 << n
+    R: Any = np.array(perms, dtype=np.uint16 if n <= 16 else np.uint32).reshape(-1, N)
+    circuits = [Circuit() for _ in range(R.shape[0])]
+    cache: Dict[Tuple[int, int], LogicGate] = {}
+
+    # KROK 1: wyzeruj wiersz 0 — NOT na każdym bicie ustawionym w f(0)
+    v0 = R[:, 0].copy()
+    for target in range(n):
+        bit = 1 << (n - 1 - target)
+        gate = LogicGate(target)
+        for k in np.flatnonzero(v0 & bit).tolist():
+            circuits[k].add_gate(gate)
+    R ^= v0[:, None]
+
+    # KROK 2: wiersze i = 1..2^n-1
+    for i in range(1, N):
+        fv = R[:, i].copy()
+
+        # p: bity 0 -> 1, sterowania = wszystkie jedynki aktualnego fv
+        for target in range(n):
+            bit = 1 << (n - 1 - target)
+            if not i & bit:
+                continue
+            active = np.flatnonzero((fv & bit) == 0)
+            if active.size == 0:
+                continue
+            cm = fv[active]
+            _flip_matching(R, active, cm[:, None], bit)
+            fv[active] |= bit
+            for k, c in zip(active.tolist(), cm.tolist()):
+                circuits[k].add_gate(_gate_from_masks(n, target, c, cache))
+
+        # q: bity 1 -> 0, sterowania = jedynki idealnego wiersza i
+        for target in range(n):
+            bit = 1 << (n - 1 - target)
+            if i & bit:
+                continue
+            active = np.flatnonzero(fv & bit)
+            if active.size == 0:
+                continue
+            _flip_matching(R, active, i, bit)
+            fv[active] ^= bit
+            gate = _gate_from_masks(n, target, i, cache)
+            for k in active.tolist():
+                circuits[k].add_gate(gate)
+
+    return circuits, R
+
+
+def algorithm(tables: List[TruthTable]) -> List[Circuit]:
+    """
+    Wsadowy odpowiednik BasicAlgorithm.algorithm: syntetyzuje wszystkie tablice naraz
+    (muszą mieć to samo n) i — jak wersja pojedyncza — sprowadza każdą do identyczności.
+    """
+    if not tables:
+        return []
+    n = tables[0].n
+    if any(tt.n != n for tt in tables):
+        raise ValueError("Wszystkie tablice w paczce muszą mieć to samo n")
+
+    circuits, R = synthesize([tt.get_vectors_as_ints() for tt in tables], n)
+    for tt, rows in zip(tables, R.tolist()):
+        tt.set_rows(rows)
+    return circuits
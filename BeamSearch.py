@@ -0,0 +1,215 @@
+import heapq
+import multiprocessing
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from itertools import repeat
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+
+from Circuit import Circuit
+from ComparingAlgorithm import GATE_COSTS
+from LogicGate import LogicGate
+from NumOfGatesOptimized import controls_of, scored_safe_gates
+from SynthesisStats import SynthesisStats
+from Trace import Tracer, resolve
+from TruthTable import TruthTable
+
+OBJECTIVES = ("hamming", "cost")
+DEFAULT_WIDTH = 4
+
+
+class _State(NamedTuple):
+    """Stan częściowy: tablica po dotychczasowych bramkach, same bramki i ich koszt."""
+
+    f: TruthTable
+    gates: Tuple[LogicGate, ...]
+    cost: int
+    distance: int  # odległość Hamminga f od identyczności
+
+
+def _rank(state: _State, objective: str) -> Tuple[int, int]:
+    if objective == "cost":
+        return state.cost, state.distance
+    return state.distance, state.cost
+
+
+def _best_distinct(states: Iterable[_State], width: int, objective: str) -> List[_State]:
+    """
+    width najlepszych stanów wg objective, z których każdy ma inną tablicę — z kilku stanów
+    o tej samej tablicy zostaje najlepszy (pierwszy przy remisie, jak w heapq.nsmallest),
+    więc wiązka nie marnuje miejsc na kopie.
+    """
+    best: List[_State] = []
+    seen = set()
+    for state in sorted(states, key=lambda s: _rank(s, objective)):
+        key = state.f.rows.tobytes()
+        if key not in seen:
+            seen.add(key)
+            best.append(state)
+            if len(best) == width:
+                break
+    return best
+
+
+def _expand_row(
+    state: _State, i: int, width: int, objective: str
+) -> Tuple[List[_State], SynthesisStats]:
+    """
+    Naprawia wiersz i stanu state tak jak NumOfGatesOptimized (najpierw bity 0 -> 1
+    ze sterowaniami z bieżącego wiersza, potem 1 -> 0 ze sterowaniami z wiersza idealnego),
+    ale dla każdego celu zamiast jednej najlepszej bramki rozważa width najlepszych
+    i zostawia width najlepszych stanów wg objective.
+    Zwraca (stany, liczniki) — liczniki osobno, bo funkcja działa też w procesie roboczym.
+    """
+    n = state.f.n
+    stats = SynthesisStats()
+    fv = state.f.get_row(i)
+    if fv == i:
+        return [state], stats
+
+    top = n - 1
+    p = [k for k in range(n) if i >> (top - k) & 1 and not fv >> (top - k) & 1]
+    q = [k for k in range(n) if not i >> (top - k) & 1 and fv >> (top - k) & 1]
+    frontier = [state]
+    for target in p + q:
+        children = []
+        for s in frontier:
+            # dla p sterowania z bieżącego wiersza, dla q — z idealnego (jak w algorytmie
+            # zachłannym); bramka na target zmienia w wierszu i tylko bit target
+            row = s.f.get_row(i) if target in p else i
+            possible_controls = [j for j in range(n) if row >> (top - j) & 1 and j != target]
+            scored = list(scored_safe_gates(s.f, i, target, possible_controls, s.distance))
+            # ten sam klucz co w NumOfGatesOptimized: przy width=1 wybór zachłanny
+            best = heapq.nsmallest(
+                width,
+                scored,
+                key=lambda c: (c[0], c[1], controls_of(n, possible_controls, c[2])),
+            )
+            stats.subsets_enumerated += 1 << len(possible_controls)
+            stats.subsets_unsafe += (1 << len(possible_controls)) - len(scored)
+            if not best:
+                children.append(s)  # brak bezpiecznej bramki — jak w algorytmie zachłannym
+                continue
+            for distance, _, cmask in best:
+                gate = LogicGate(target, *controls_of(n, possible_controls, cmask))
+                f = s.f.__copy__()
+                gate.apply_gate_to_truth_table(f)
+                stats.table_copies += 1
+                cost = s.cost + GATE_COSTS.get(gate.get_type(), 1)
+                children.append(_State(f, s.gates + (gate,), cost, distance))
+        frontier = _best_distinct(children, width, objective)
+    return frontier, stats
+
+
+def algorithm(
+    f: TruthTable,
+    verbose: bool = False,
+    stats: Optional[SynthesisStats] = None,
+    tracer: Optional[Tracer] = None,
+    width: int = DEFAULT_WIDTH,
+    objective: str = "cost",
+    workers: int = 1,
+    executor: Optional[Executor] = None,
+) -> Circuit:
+    """
+    Przeszukiwanie wiązkowe wokół NumOfGatesOptimized:
+    - Krok 1: zeruje wiersz 0 pojedynczymi NOT-ami (jak w wersji zachłannej),
+    - Krok 2: dla i=1..2^n-1 każdy z co najwyżej width stanów częściowych (tablica + obwód)
+      jest rozwijany przez width najlepszych bezpiecznych bramek na każdy cel wiersza i;
+      do następnego wiersza przechodzi width najlepszych stanów wg objective:
+      "cost" (koszt GATE_COSTS, potem odległość od identyczności) lub "hamming" (odwrotnie).
+    Na końcu wybierany jest najtańszy obwód z wiązki. width=1 daje dokładnie obwód
+    NumOfGatesOptimized; większe width — więcej czasu za (zwykle) tańszy obwód.
+    workers > 1: stany wiązki rozwijane równolegle w ProcessPoolExecutor tworzonym na czas
+    wywołania (opłaca się przy dużych n i width); niedozwolone w procesie roboczym innej
+    puli. executor: gotowa pula od wywołującego (np. jedna na cały przebieg main.run_all),
+    używana zamiast workers.
+    Tablica f zostaje sprowadzona do identyczności, jak w pozostałych algorytmach.
+    stats: opcjonalne liczniki (SynthesisStats); tracer: odbiorca zdarzeń kroków (Trace).
+    """
+    if objective not in OBJECTIVES:
+        raise ValueError(f"Nieznany objective: {objective!r} (dozwolone: {OBJECTIVES})")
+    if width < 1:
+        raise ValueError(f"width musi być >= 1, jest {width}")
+    own_pool = executor is None and workers > 1 and width > 1
+    if own_pool and multiprocessing.parent_process() is not None:
+        raise ValueError("workers > 1 w procesie roboczym — podaj executor albo workers=1")
+    tracer = resolve(tracer, verbose)
+    if stats is not None:
+        stats.runs += 1
+        t0 = time.perf_counter()
+    n = f.n
+
+    if tracer.enabled:
+        tracer.event("start", target="identyczność", state=f.get_vectors_as_ints())
+
+    # KROK 1: wyzeruj wiersz 0 — wspólny dla całej wiązki
+    work = f.__copy__()
+    gates: List[LogicGate] = []
+    for q in range(n):
+        if work.get_row(0) & work.qubit_mask(q):
+            gate = LogicGate(q)
+            gate.apply_gate_to_truth_table(work)
+            gates.append(gate)
+    cost = sum(GATE_COSTS.get(g.get_type(), 1) for g in gates)
+    beam = [_State(work, tuple(gates), cost, work.hamming_distance_to_identity())]
+    if stats is not None:
+        t1 = time.perf_counter()
+        stats.step1_s += t1 - t0
+        stats.table_copies += 1
+    if tracer.enabled:
+        tracer.event("step1", state=work.get_vectors_as_ints())
+
+    # KROK 2: wiersz po wierszu, wiązka stanów
+    pool = ProcessPoolExecutor(max_workers=workers) if own_pool else executor
+    try:
+        for i in range(1, 1 << n):
+            if all(s.f.get_row(i) == i for s in beam):
+                continue
+            # rozwijane są stany bez dotychczasowych bramek (mniej do przesłania między
+            # procesami); dzieci wracają z samymi nowymi bramkami wiersza i
+            args = (
+                (s._replace(gates=()) for s in beam),
+                repeat(i),
+                repeat(width),
+                repeat(objective),
+            )
+            if pool is not None and len(beam) > 1:
+                expanded = list(pool.map(_expand_row, *args))
+            else:
+                expanded = list(map(_expand_row, *args))
+            children = [
+                c._replace(gates=parent.gates + c.gates)
+                for parent, (states, _) in zip(beam, expanded)
+                for c in states
+            ]
+            beam = _best_distinct(children, width, objective)
+            if stats is not None:
+                for _, row_stats in expanded:
+                    stats.merge(row_stats)
+            if tracer.enabled:
+                tracer.event(
+                    "beam",
+                    i=i,
+                    states=len(beam),
+                    distance=[s.distance for s in beam],
+                    cost=[s.cost for s in beam],
+                )
+    finally:
+        if own_pool and pool is not None:
+            pool.shutdown()
+
+    best = min(beam, key=lambda s: (not s.f.is_identity(), s.cost, len(s.gates)))
+    f.set_rows(best.f.rows.tolist())
+    cir = Circuit()
+    for gate in best.gates:
+        cir.add_gate(gate)
+
+    if stats is not None:
+        stats.step2_s += time.perf_counter() - t1
+        stats.gates_applied += len(cir.instructions)
+
+    if tracer.enabled:
+        tracer.event("circuit")
+        cir.show_gates(tracer)
+
+    return cir
@@ -0,0 +1,210 @@
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from itertools import islice
+from typing import Any, Dict, List, Optional, Tuple
+
+from AESTest import isbox, sbox
+from Algorithms import ALGORITHMS
+from Permutation import Permutation
+from TruthTable import TruthTable
+from Workload import gate_cost, iter_jsonl, iter_random_permutations, parse_entry
+
+# liczba losowych permutacji na n — mniej dla dużych n, żeby pełny przebieg trwał sekundy
+RANDOM_COUNTS = {3: 200, 4: 100, 5: 40, 6: 12, 7: 4, 8: 2}
+
+
+def random_workload(n: int, count: int, seed: int) -> List[List[int]]:
+    return list(islice(iter_random_permutations(n, seed), count))
+
+
+def build_workloads(
+    seed: int = 0,
+    counts: Optional[Dict[int, int]] = None,
+    jsonl_path: str = "permutacje_n3.jsonl",
+    jsonl_count: int = 500,
+) -> Dict[str, List[List[int]]]:
+    """Nazwane zestawy permutacji (listy indeksów wyjściowych) — zawsze te same dla seed."""
+    workloads = {
+        f"random_n{n}": random_workload(n, count, seed)
+        for n, count in sorted((counts or RANDOM_COUNTS).items())
+    }
+    workloads["aes_sbox"] = [list(sbox)]
+    workloads["aes_isbox"] = [list(isbox)]
+    if jsonl_path and jsonl_count:
+        entries = islice(iter_jsonl(jsonl_path), jsonl_count)
+        workloads["jsonl_n3"] = [
+            parse_entry(idx, vectors).get_vectors_as_ints()
+            for idx, vectors in enumerate(entries, start=1)
+        ]
+    return workloads
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    k = min(len(sorted_values) - 1, max(0, round(q * (len(sorted_values) - 1))))
+    return sorted_values[k]
+
+
+def bench_one(algo_mod, perms: List[List[int]], repeat: int = 1, memory: bool = True) -> Dict:
+    """
+    Czas syntezy każdej permutacji (minimum z repeat przebiegów, bez budowy TruthTable),
+    szczytowa pamięć (tracemalloc, osobny przebieg), liczba bramek i koszt.
+    """
+    latencies: List[float] = []
+    gates = 0
+    cost = 0
+    ok = True
+    for perm in perms:
+        n = (len(perm) - 1).bit_length()
+        best = float("inf")
+        for _ in range(repeat):
+            f = TruthTable(n, perm)
+            t0 = time.perf_counter()
+            cir = algo_mod.algorithm(f, verbose=False)
+            best = min(best, time.perf_counter() - t0)
+        latencies.append(best)
+        ok = ok and cir.to_permutation(n) == Permutation(perm).inverse()
+        gates += len(cir.instructions)
+        cost += sum(gate_cost(g.qubits) for g in cir.instructions)
+
+    peak = None
+    if memory:
+        tracemalloc.start()
+        for perm in perms:
+            f = TruthTable((len(perm) - 1).bit_length(), perm)
+            tracemalloc.reset_peak()
+            algo_mod.algorithm(f, verbose=False)
+            _, p = tracemalloc.get_traced_memory()
+            peak = p if peak is None else max(peak, p)
+        tracemalloc.stop()
+
+    lat = sorted(latencies)
+    count = len(perms)
+    return {
+        "count": count,
+        "ok": ok,
+        "latency_mean_s": statistics.fmean(lat),
+        "latency_median_s": statistics.median(lat),
+        "latency_p95_s": _percentile(lat, 0.95),
+        "latency_max_s": lat[-1],
+        "total_s": sum(lat),
+        "peak_memory_kib": None if peak is None else round(peak / 1024, 1),
+        "num_gates_total": gates,
+        "num_gates_mean": gates / count,
+        "cost_total": cost,
+        "cost_mean": cost / count,
+    }
+
+
+def run_benchmarks(
+    algorithms: List[str],
+    workloads: Dict[str, List[List[int]]],
+    repeat: int = 1,
+    memory: bool = True,
+    verbose: bool = True,
+) -> Dict[str, Any]:
+    results: Dict[str, Dict] = {}
+    for wname, perms in workloads.items():
+        for aname in algorithms:
+            key = f"{wname}/{aname}"
+            results[key] = bench_one(ALGORITHMS[aname], perms, repeat, memory)
+            if verbose:
+                r = results[key]
+                print(
+                    f"{key:28s} n={r['count']:4d} | śr. {r['latency_mean_s'] * 1e3:9.3f} ms | "
+                    f"p95 {r['latency_p95_s'] * 1e3:9.3f} ms | bramki {r['num_gates_mean']:8.2f} | "
+                    f"koszt {r['cost_mean']:9.2f} | pamięć {r['peak_memory_kib']} KiB"
+                )
+    return {
+        "meta": {
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def compare(
+    current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = 0.10
+) -> Tuple[List[str], List[str]]:
+    """
+    Porównanie z zapisanym przebiegiem. Zwraca (raport, regresje): regresja to wzrost
+    liczby bramek/kosztu albo spowolnienie średniego czasu o więcej niż tolerance.
+    """
+    report: List[str] = []
+    regressions: List[str] = []
+    for key, cur in current["results"].items():
+        base = baseline.get("results", {}).get(key)
+        if base is None:
+            report.append(f"{key}: brak w bazie")
+            continue
+        if cur["count"] != base["count"]:
+            report.append(f"{key}: inna liczba permutacji ({cur['count']} vs {base['count']})")
+            continue
+        speedup = base["latency_mean_s"] / cur["latency_mean_s"] if cur["latency_mean_s"] else 0
+        d_gates = cur["num_gates_total"] - base["num_gates_total"]
+        d_cost = cur["cost_total"] - base["cost_total"]
+        line = f"{key}: przyspieszenie x{speedup:.2f}, bramki {d_gates:+d}, koszt {d_cost:+d}"
+        report.append(line)
+        if d_gates > 0 or d_cost > 0 or speedup < 1 / (1 + tolerance):
+            regressions.append(line)
+    return report, regressions
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Benchmark algorytmów syntezy.")
+    p.add_argument("--output", default="benchmark.json", help="Plik JSON z wynikami.")
+    p.add_argument("--baseline", default=None, help="Wcześniejszy wynik do porównania.")
+    p.add_argument(
+        "--algorithms",
+        default=",".join(ALGORITHMS),
+        help=f"Lista algorytmów rozdzielona przecinkami ({', '.join(ALGORITHMS)}).",
+    )
+    p.add_argument("--seed", type=int, default=0, help="Ziarno losowych permutacji.")
+    p.add_argument("--repeat", type=int, default=3, help="Powtórzenia pomiaru czasu (minimum).")
+    p.add_argument("--max-n", type=int, default=8, help="Największe n losowych permutacji.")
+    p.add_argument("--jsonl", default="permutacje_n3.jsonl", help="Plik z wycinkiem permutacji.")
+    p.add_argument("--jsonl-count", type=int, default=500, help="Ile wpisów wziąć z --jsonl.")
+    p.add_argument("--no-memory", action="store_true", help="Pomiń pomiar pamięci.")
+    p.add_argument(
+        "--tolerance", type=float, default=0.10, help="Dopuszczalne spowolnienie (ułamek)."
+    )
+    return p.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    algorithms = [a.strip() for a in args.algorithms.split(",") if a.strip()]
+    unknown = [a for a in algorithms if a not in ALGORITHMS]
+    if unknown:
+        raise SystemExit(f"Nieznane algorytmy: {unknown}")
+
+    counts = {n: c for n, c in RANDOM_COUNTS.items() if n <= args.max_n}
+    workloads = build_workloads(args.seed, counts, args.jsonl, args.jsonl_count)
+    current = run_benchmarks(algorithms, workloads, args.repeat, not args.no_memory)
+    current["meta"]["seed"] = args.seed
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(current, f, ensure_ascii=False, indent=2)
+    print(f"Zapisano: {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        report, regressions = compare(current, baseline, args.tolerance)
+        print("\n".join(report))
+        if regressions:
+            print(f"\nRegresje ({len(regressions)}):")
+            print("\n".join(regressions))
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+import time
+from typing import Optional
+
+from Circuit import Circuit
+from ComparingAlgorithm import GATE_COSTS, plan_row
+from SynthesisStats import SynthesisStats
+from Trace import Tracer, resolve
+from TruthTable import TruthTable
+
+OBJECTIVES = ("cost", "gates")
+
+
+def _score(gates, objective: str) -> int:
+    if objective == "gates":
+        return len(gates)
+    return sum(GATE_COSTS.get(g.get_type(), 1) for g in gates)
+
+
+def algorithm(
+    f: TruthTable,
+    verbose: bool = False,
+    objective: str = "cost",
+    stats: Optional[SynthesisStats] = None,
+    tracer: Optional[Tracer] = None,
+) -> Circuit:
+    """
+    Wariant dwukierunkowy:
+    - dla i=0..2^n-1 wiersz i można naprawić od strony wyjść (f(i) -> i, bramki dopisywane
+      na koniec, jak w ComparingAlgorithm) albo od strony wejść (wejście j = f^-1(i)
+      przeprowadzane na i, bramki doklejane z przodu części wejściowej),
+    - wybierana jest strona tańsza wg objective: "cost" (GATE_COSTS) lub "gates" (liczba bramek).
+    Obwód — jak w pozostałych algorytmach — sprowadza f do identyczności.
+    stats: opcjonalne liczniki (SynthesisStats); cała praca liczy się jako krok 2.
+    tracer: odbiorca zdarzeń kroków (Trace); verbose=True oznacza PrintTracer.
+    """
+    if objective not in OBJECTIVES:
+        raise ValueError(f"Nieznany objective: {objective!r} (dozwolone: {OBJECTIVES})")
+    tracer = resolve(tracer, verbose)
+
+    if stats is not None:
+        stats.runs += 1
+        t0 = time.perf_counter()
+    n = f.n
+    had_inverse = f.inverse is not None
+    f.enable_inverse()  # f^-1 utrzymywane na bieżąco przez obie strony (do końca wywołania)
+    output_gates = []
+    input_gates = []
+
+    if tracer.enabled:
+        tracer.event("start", target="identyczność", state=f.get_vectors_as_ints())
+
+    try:
+        for i in range(1 << n):
+            if f.get_row(i) == i:
+                continue
+
+            # bramki po stronie wejść to bramki po stronie wyjść dla f^-1 — wiersze < i
+            # f^-1 też są już identycznością, więc obowiązuje ta sama wyrocznia
+            # bezpieczeństwa
+            out_plan = plan_row(f.get_row(i), i, n, stats)
+            in_plan = plan_row(f.inverse_row(i), i, n, stats)
+
+            if _score(in_plan, objective) < _score(out_plan, objective):
+                for gate in in_plan:
+                    f.apply_masks_to_inputs(*gate.masks(n))
+                input_gates.extend(in_plan)
+                side = "wejścia"
+            else:
+                for gate in out_plan:
+                    gate.apply_gate_to_truth_table(f)
+                output_gates.extend(out_plan)
+                side = "wyjścia"
+
+            if tracer.enabled:
+                plan = in_plan if side == "wejścia" else out_plan
+                tracer.event("row_side", i=i, side=side, gates=[g.qubits for g in plan])
+    finally:
+        if not had_inverse:
+            f.inverse = None  # nie obciążaj dalszych bramek na tablicy wywołującego
+
+    # G_out . f . G_in = id  =>  G_in . G_out . f = id: najpierw bramki wyjściowe,
+    # potem wejściowe w odwrotnej kolejności ich wyboru
+    cir = Circuit()
+    for gate in output_gates:
+        cir.add_gate(gate)
+    for gate in reversed(input_gates):
+        cir.add_gate(gate)
+
+    if stats is not None:
+        stats.step2_s += time.perf_counter() - t0
+        stats.gates_applied += len(cir.instructions)
+
+    if tracer.enabled:
+        tracer.event("circuit")
+        cir.show_gates(tracer)
+
+    return cir
@@ -0,0 +1,209 @@
+from functools import lru_cache
+from itertools import permutations
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from Circuit import Circuit
+from LogicGate import LogicGate
+from SynthesisStats import SynthesisStats
+from Trace import Tracer
+from TruthTable import TruthTable
+
+# Symetrie syntezy: g = N_b . P . h . P^-1 . N_a, gdzie
+# - h = f albo f^-1 (odwrócenie),
+# - P przenosi bit kubitu q na kubit sigma[q] (relabeling kubitów),
+# - N_a / N_b negują bity wejścia / wyjścia (XOR z maską).
+# Obwód dla g przekłada się na obwód dla f bez ponownej syntezy (map_circuit).
+
+
+class Transform(NamedTuple):
+    inverse: bool
+    sigma: Tuple[int, ...]
+    a: int = 0
+    b: int = 0
+
+
+def identity_transform(n: int) -> Transform:
+    return Transform(False, tuple(range(n)))
+
+
+@lru_cache(maxsize=None)
+def _qubit_perm(sigma: Tuple[int, ...], n: int) -> Tuple[int, ...]:
+    """P jako permutacja wierszy: bit kubitu q (maska 1 << (n-1-q)) trafia na kubit sigma[q]."""
+    P = [0] * (1 << n)
+    for x in range(1 << n):
+        y = 0
+        for q in range(n):
+            if x >> (n - 1 - q) & 1:
+                y |= 1 << (n - 1 - sigma[q])
+        P[x] = y
+    return tuple(P)
+
+
+def _inverse_rows(rows: List[int]) -> List[int]:
+    inv = [0] * len(rows)
+    for x, y in enumerate(rows):
+        inv[y] = x
+    return inv
+
+
+def apply_transform(rows: List[int], t: Transform, n: int) -> List[int]:
+    """Wiersze g dla wierszy f i przekształcenia t."""
+    h = _inverse_rows(rows) if t.inverse else rows
+    P = _qubit_perm(t.sigma, n)
+    g = [0] * len(rows)
+    for x, y in enumerate(h):
+        g[P[x] ^ t.a] = P[y] ^ t.b
+    return g
+
+
+def _not_gates(mask: int, n: int) -> List[LogicGate]:
+    return [LogicGate(q) for q in range(n) if mask >> (n - 1 - q) & 1]
+
+
+def _cancel_nots(gates: List[LogicGate]) -> List[LogicGate]:
+    """
+    Skraca pary NOT-ów na tym samym kubicie w obrębie ciągu samych NOT-ów (takie bramki
+    komutują); pozostałe bramki zostają bez zmian.
+    """
+    out: List[LogicGate] = []
+    start = 0  # początek bieżącego ciągu NOT-ów w out
+    for gate in gates:
+        if gate.get_type() != 1:
+            out.append(gate)
+            start = len(out)
+            continue
+        for k in range(start, len(out)):
+            if out[k].target == gate.target:
+                del out[k]
+                break
+        else:
+            out.append(gate)
+    return out
+
+
+def map_circuit(cir: Circuit, t: Transform, n: int) -> Circuit:
+    """
+    Obwód dla g = t(f) -> obwód dla f:
+    - negacje: C_k = NOT(b) + C_g + NOT(a) (k = P . h . P^-1),
+    - relabeling: bramki C_k na kubitach sigma^-1,
+    - odwrócenie: bramki w odwrotnej kolejności.
+    Dopisane bramki NOT skracają się tylko z sąsiednimi NOT-ami (_cancel_nots); dalsze
+    upraszczanie należy do wywołującego (np. main --optimize).
+    """
+    gates = _not_gates(t.b, n) + list(cir.instructions) + _not_gates(t.a, n)
+    sigma_inv = [0] * n
+    for q, s in enumerate(t.sigma):
+        sigma_inv[s] = q
+    gates = [LogicGate(*(sigma_inv[q] for q in gate.qubits)) for gate in gates]
+    if t.inverse:
+        gates.reverse()
+
+    if t.a or t.b:
+        gates = _cancel_nots(gates)
+    out = Circuit()
+    for gate in gates:
+        out.add_gate(gate)
+    return out
+
+
+def transforms(n: int, invert: bool = True, relabel: bool = True) -> Iterable[Transform]:
+    """Przekształcenia bez negacji: odwrócenie x relabeling kubitów (2 * n! elementów)."""
+    sigmas = permutations(range(n)) if relabel else [tuple(range(n))]
+    for sigma in sigmas:
+        for inverse in (False, True) if invert else (False,):
+            yield Transform(inverse, tuple(sigma))
+
+
+def canonicalize(f: TruthTable, negate: bool = False) -> Tuple[Tuple[int, ...], Transform]:
+    """
+    Reprezentant klasy f (najmniejsze leksykograficznie wiersze) i przekształcenie, które
+    go daje. Przy negate dla każdego (h, sigma, a) wystarcza jedno b = g[0] (wtedy g[0] = 0),
+    więc przegląda się 2 * n! * 2^n kandydatów zamiast 2 * n! * 4^n.
+    """
+    n = f.n
+    rows = f.get_vectors_as_ints()
+    inverse_rows = _inverse_rows(rows)
+    best = tuple(rows)  # przekształcenie tożsamościowe
+    best_t = identity_transform(n)
+    for t in transforms(n):
+        h = inverse_rows if t.inverse else rows
+        P = _qubit_perm(t.sigma, n)
+        for a in range(1 << n) if negate else (0,):
+            g = [0] * len(rows)
+            for x, y in zip(P, h):
+                g[x ^ a] = P[y]
+            b = g[0] if negate else 0
+            cand = tuple(v ^ b for v in g) if b else tuple(g)
+            if cand < best:
+                best, best_t = cand, t._replace(a=a, b=b)
+    return best, best_t
+
+
+class CanonicalCache:
+    """
+    Synteza przez reprezentanta klasy: algorithm(f) kanonizuje f, syntetyzuje reprezentanta
+    (albo bierze obwód z pamięci) i przekłada obwód z powrotem na f. Interfejs jak w
+    modułach algorytmów — f zostaje sprowadzone do identyczności.
+    """
+
+    def __init__(self, algo: Callable[..., Circuit], negate: bool = False):
+        self.algo = algo
+        self.negate = negate
+        self.circuits: Dict[Tuple[int, ...], Tuple[Tuple[int, ...], ...]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.circuits)
+
+    def algorithm(
+        self,
+        f: TruthTable,
+        verbose: bool = False,
+        stats: Optional[SynthesisStats] = None,
+        tracer: Optional[Tracer] = None,
+    ) -> Circuit:
+        rep, t = canonicalize(f, self.negate)
+        gates = self.circuits.get(rep)
+        if gates is None:
+            self.misses += 1
+            kwargs: Dict[str, Any] = {} if stats is None else {"stats": stats}
+            if tracer is not None:
+                kwargs["tracer"] = tracer
+            cir = self.algo(TruthTable(f.n, list(rep)), verbose=verbose, **kwargs)
+            gates = tuple(g.qubits for g in cir.instructions)
+            self.circuits[rep] = gates
+        else:
+            self.hits += 1
+            cir = Circuit()
+            for qubits in gates:
+                cir.add_gate_from_idx(*qubits)
+
+        out = map_circuit(cir, t, f.n)
+        out.apply_circuit(f)
+        return out
+
+
+def cheapest_member(
+    f: TruthTable,
+    algo: Callable[..., Circuit],
+    cost: Optional[Callable[[LogicGate], int]] = None,
+    candidates: Optional[Iterable[Transform]] = None,
+) -> Tuple[Circuit, Transform]:
+    """
+    Syntetyzuje kolejne elementy klasy f (domyślnie: odwrócenie x relabeling kubitów)
+    i zwraca najtańszy obwód dla f (po przełożeniu) wraz z przekształceniem.
+    f nie jest zmieniane.
+    """
+    cost = cost or (lambda gate: 1)
+    rows = f.get_vectors_as_ints()
+    best: Optional[Tuple[int, Circuit, Transform]] = None
+    for t in transforms(f.n) if candidates is None else candidates:
+        g = TruthTable(f.n, apply_transform(rows, t, f.n), backend=f.backend)
+        cir = map_circuit(algo(g, verbose=False), t, f.n)
+        total = sum(cost(gate) for gate in cir.instructions)
+        if best is None or total < best[0]:
+            best = (total, cir, t)
+    if best is None:
+        raise ValueError("Pusta lista przekształceń")
+    return best[1], best[2]
@@ -1,9 +1,130 @@
-from typing import List
+from typing import Callable, List, Optional
 
 from LogicGate import LogicGate
+from Permutation import Permutation
+from Trace import PrintTracer, Tracer
 from TruthTable import TruthTable
 
 
+def _cancel_pass(gates: List[LogicGate]) -> bool:
+    """
+    Usuwa pary identycznych bramek, które da się zsunąć — między nimi stoją wyłącznie
+    bramki komutujące z pierwszą z pary. Zwraca True, jeśli coś usunięto.
+    """
+    changed = False
+    i = 0
+    while i < len(gates):
+        g = gates[i]
+        for j in range(i + 1, len(gates)):
+            h = gates[j]
+            if g.is_equivalent(h):
+                del gates[j]
+                del gates[i]
+                changed = True
+                break
+            if not g.commutes_with(h):
+                i += 1
+                break
+        else:
+            i += 1
+    return changed
+
+
+def _template(x: LogicGate, g: LogicGate) -> Optional[LogicGate]:
+    """
+    Szablony NCT z reguły przesuwania: dla T1 = T(C1, t1), T2 = T(C2, t2), gdy dokładnie
+    jedna z bramek steruje drugą (t1 w C2 i t2 poza C1 — albo odwrotnie), zachodzi
+    T1 . T2 . T1 = T2 . R, gdzie R = T((C1 | C2) - {t1, t2}, t) ma cel t tej bramki,
+    której cel jest sterowaniem drugiej (t2 w pierwszym przypadku, t1 w drugim).
+    Szczególne przypadki: NOT(a) przed Toffolim (R bez sterowania a), CNOT(b <- a)
+    (R ze sterowaniem a zamiast b). Zwraca R albo None, gdy x i g komutują lub sterują
+    sobą nawzajem.
+    """
+    x_drives_g = x.target in g.controls
+    g_drives_x = g.target in x.controls
+    if x_drives_g == g_drives_x:
+        return None
+    controls = (set(x.controls) | set(g.controls)) - {x.target, g.target}
+    return LogicGate(g.target if x_drives_g else x.target, *sorted(controls))
+
+
+def _template_pass(gates: List[LogicGate], cost: Callable[[LogicGate], int]) -> bool:
+    """
+    Szuka X ... G ... X, gdzie oba X da się przesunąć do G (komutacja), i zamienia trójkę
+    X . G . X na G . R z szablonu, o ile nie zwiększa to kosztu. Zwraca True przy zmianie.
+    """
+    changed = False
+    i = 0
+    while i < len(gates):
+        x = gates[i]
+        replaced = False
+        m = next((j for j in range(i + 1, len(gates)) if not x.commutes_with(gates[j])), -1)
+        r = None if m < 0 else _template(x, gates[m])
+        if r is not None and cost(r) <= 2 * cost(x):
+            for k in range(m + 1, len(gates)):
+                if x.is_equivalent(gates[k]):
+                    g = gates[m]
+                    del gates[k]
+                    gates[m : m + 1] = [g, r]
+                    del gates[i]
+                    changed = replaced = True
+                    break
+                if not x.commutes_with(gates[k]):
+                    break
+        if not replaced:
+            i += 1
+    return changed
+
+
+def _window_pass(gates: List[LogicGate], cost: Callable[[LogicGate], int]) -> bool:
+    """
+    Resynteza okien: najdłuższy ciąg kolejnych bramek działających na co najwyżej 3 liniach
+    realizuje permutację 3 kubitów, więc można go zastąpić obwodem z bazy optymalnych
+    obwodów n=3 (OptimalN3, wg liczby bramek lub kosztu — tańszy z dwóch). Obejmuje to
+    wszystkie tożsamości NCT na 3 liniach (m.in. szablony rozmiaru 4-6). Zamiana tylko,
+    gdy maleje (koszt, liczba bramek). Zwraca True przy zmianie.
+    """
+    import OptimalN3  # OptimalN3 importuje Circuit
+
+    changed = False
+    i = 0
+    while i < len(gates):
+        lines: List[int] = []
+        j = i
+        while j < len(gates):
+            new = [q for q in gates[j].qubits if q not in lines]
+            if len(lines) + len(new) > OptimalN3.N:
+                break
+            lines += new
+            j += 1
+        if j - i >= 2:
+            lines.sort()
+            local = {q: k for k, q in enumerate(lines)}
+            perm = list(range(OptimalN3.SIZE))
+            for g in gates[i:j]:
+                g3 = LogicGate(*(local[q] for q in g.qubits))
+                perm = [g3.apply_to_row(v, OptimalN3.N) for v in perm]
+            # lookup(f) daje D z D . f = id, więc D realizuje perm dla f = perm^-1
+            f = TruthTable(OptimalN3.N, Permutation(perm).inverse().tolist())
+            best = (sum(map(cost, gates[i:j])), j - i)
+            replacement = None
+            for objective in OptimalN3.OBJECTIVES:
+                found = OptimalN3.lookup(f, objective).instructions
+                # linie dopełniające (gdy okno ma mniej niż 3) nie istnieją w obwodzie
+                if any(q >= len(lines) for g in found for q in g.qubits):
+                    continue
+                found = [LogicGate(*(lines[q] for q in g.qubits)) for g in found]
+                key = (sum(map(cost, found)), len(found))
+                if key < best:
+                    best, replacement = key, found
+            if replacement is not None:
+                gates[i:j] = replacement
+                changed = True
+                continue
+        i += 1
+    return changed
+
+
 class Circuit:
     def __init__(self):
         self.instructions: List[LogicGate] = []
@@ -27,14 +148,52 @@ class Circuit:
         for gate in reversed(self.instructions):
             gate.apply_gate_to_truth_table(tt)
 
-    def show_gates(self):
+    def to_truth_table(self, n: int, backend: str = "array") -> TruthTable:
+        tt = TruthTable(n, backend=backend)
+        self.apply_circuit(tt)
+        return tt
+
+    def to_permutation(self, n: int) -> Permutation:
+        """
+        Kompiluje obwód do permutacji (x -> wynik całego obwodu dla wejścia x).
+        Obwód C syntetyzuje f (C . f = id) wtedy i tylko wtedy, gdy C.to_permutation(n)
+        jest równe odwrotności f.
+        """
+        return Permutation(self.to_truth_table(n).rows)
+
+    def fingerprint(self, n: Optional[int] = None) -> str:
+        """
+        Skrót funkcji realizowanej przez obwód — obwody działające identycznie mają ten sam
+        odcisk. Domyślne n to najwyższy użyty kubit + 1.
+        """
+        if n is None:
+            n = max((q for gate in self.instructions for q in gate.qubits), default=0) + 1
+        return self.to_permutation(n).fingerprint()
+
+    def optimize(self, cost: Optional[Callable[[LogicGate], int]] = None) -> "Circuit":
+        """
+        Optymalizacja po syntezie (w miejscu), powtarzana do punktu stałego:
+        - skracanie par identycznych bramek z uwzględnieniem komutacji,
+        - szablony z reguły przesuwania T1 . T2 . T1 = T2 . R (3 bramki -> 2), stosowane
+          tylko gdy nie rośnie koszt,
+        - resynteza okien na co najwyżej 3 liniach z bazy optymalnych obwodów n=3.
+        cost: koszt pojedynczej bramki (domyślnie każda kosztuje 1, tj. liczba bramek).
+        """
+        cost = cost or (lambda gate: 1)
+        gates = self.instructions
+        while _cancel_pass(gates) | _template_pass(gates, cost) | _window_pass(gates, cost):
+            pass
+        return self
+
+    def show_gates(self, tracer: Optional[Tracer] = None):
+        tracer = tracer or PrintTracer()
         for gate in self.instructions:
             gate_name = {
                 1: "QNOT",
                 2: "CNOT",
                 3: "TOFFOLI"
             }.get(len(gate.qubits), "MCT")
-            print(f"{gate_name}: {gate.get_qubits()}")
+            tracer.event("circuit_gate", name=gate_name, qubits=gate.get_qubits())
 
     def remove_gate(self, index: int):
         self.instructions.pop(index)
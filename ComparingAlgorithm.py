@@ -1,86 +1,197 @@
-from itertools import combinations
+import time
+from typing import Callable, Dict, Optional
 
 from Circuit import Circuit
 from LogicGate import LogicGate
+from SynthesisStats import SynthesisStats
+from Trace import NULL_TRACER, Tracer, resolve
 from TruthTable import TruthTable
 
 GATE_COSTS = {1: 1, 2: 1, 3: 5}  # QNOT  # CNOT  # TOFFOLI
 
+# Model kosztu: liczba kubitów bramki (1 + liczba sterowań) -> koszt.
+CostModel = Callable[[int], int]
 
-def _no_effect_on_previous_rows(temp_f: TruthTable, ideal: TruthTable, upto_idx: int) -> bool:
+
+def table_cost(num_qubits: int) -> int:
+    """Koszt wg GATE_COSTS (bramki spoza tabeli kosztują 1) — domyślny model algorytmu."""
+    return GATE_COSTS.get(num_qubits, 1)
+
+
+def ncv_cost(num_qubits: int) -> int:
+    """Koszt kwantowy NCV: NOT/CNOT = 1, bramka z k >= 2 sterowaniami = 2^(k+1) - 3."""
+    return 1 if num_qubits <= 2 else (1 << num_qubits) - 3
+
+
+def t_count(num_qubits: int) -> int:
     """
-    True, jeśli zastosowanie bramki nie zmieniło żadnego wiersza.
+    Liczba bramek T: NOT/CNOT = 0, Toffoli = 7, k >= 3 sterowań = 8k - 9
+    (rozkład na Toffoli względnej fazy z k - 2 kubitami pomocniczymi).
     """
-    for x in range(upto_idx):
-        if temp_f.get_single_vector(x) != ideal.get_single_vector(x):
-            return False
-    return True
+    k = num_qubits - 1
+    return 0 if k <= 1 else 7 if k == 2 else 8 * k - 9
+
+
+COST_MODELS: Dict[str, CostModel] = {"gates": table_cost, "ncv": ncv_cost, "tcount": t_count}
+
+
+def cheapest_safe_gate(
+    n: int,
+    i: int,
+    target: int,
+    possible_controls: list[int],
+    stats: Optional[SynthesisStats] = None,
+    cost_model: CostModel = table_cost,
+) -> Optional[LogicGate]:
+    """
+    NAJTAŃSZA bramka (spośród wszystkich podzbiorów sterowań), która nie narusza
+    wcześniejszych wierszy, albo None. Wiersze 0..i-1 są już ustawione, więc wybór
+    zależy tylko od (n, i, target, possible_controls), a nie od reszty tablicy.
+
+    Minimalizowany klucz to (koszt, liczba sterowań, sterowania rosnąco). Rozmiary
+    podzbiorów przeglądamy w kolejności (koszt, rozmiar), a podzbiory danego rozmiaru
+    leksykograficznie, więc pierwszy bezpieczny jest optymalny. Bezpieczeństwo to
+    cmask >= i (LogicGate.is_safe_for_row); sterowania rosnąco mają malejące maski,
+    więc prefiks, którego maska z największymi pozostałymi maskami nie sięga i,
+    odcinamy razem z resztą tej gałęzi.
+    """
+    controls = sorted(possible_controls)
+    masks = [1 << (n - 1 - c) for c in controls]
+    m = len(controls)
+    # suffix[j] = suma masks[j:]; r największych masek od pozycji j to masks[j:j+r]
+    suffix = [0] * (m + 1)
+    for j in range(m - 1, -1, -1):
+        suffix[j] = suffix[j + 1] + masks[j]
+    considered = 0
+    pruned = 0
+
+    def best_completion(start: int, r: int) -> int:
+        return suffix[start] - suffix[start + r]
+
+    def search(start: int, r: int, mask: int, chosen: list[int]) -> Optional[list[int]]:
+        nonlocal considered, pruned
+        if r == 0:
+            considered += 1
+            return chosen
+        for j in range(start, m - r + 1):
+            if mask + masks[j] + best_completion(j + 1, r - 1) < i:
+                # dalsze j mają mniejsze maski — cała reszta poziomu też odpada
+                considered += 1
+                pruned += 1
+                return None
+            found = search(j + 1, r - 1, mask + masks[j], chosen + [controls[j]])
+            if found is not None:
+                return found
+        return None
+
+    found = None
+    for r in sorted(range(m + 1), key=lambda r: (cost_model(r + 1), r)):
+        if best_completion(0, r) < i:
+            considered += 1
+            pruned += 1
+            continue
+        found = search(0, r, 0, [])
+        if found is not None:
+            break
+
+    if stats is not None:
+        stats.subsets_enumerated += considered
+        stats.subsets_unsafe += pruned
+    return None if found is None else LogicGate(target, *found)
+
+
+def plan_row(
+    value: int,
+    i: int,
+    n: int,
+    stats: Optional[SynthesisStats] = None,
+    cost_model: CostModel = table_cost,
+) -> list[LogicGate]:
+    """
+    Bramki, którymi algorithm() sprowadza wartość wiersza i (value) do i — te same kroki
+    p/q co w pętli głównej, ale bez dotykania tablicy.
+    """
+    gates = []
+    fv = value
+    for target in range(n):  # p: bity 0 -> 1, sterowania z aktualnego fv
+        bit = 1 << (n - 1 - target)
+        if i & bit and not fv & bit:
+            controls = [j for j in range(n) if fv >> (n - 1 - j) & 1 and j != target]
+            gate = cheapest_safe_gate(n, i, target, controls, stats, cost_model)
+            if gate is not None:
+                gates.append(gate)
+                fv = gate.apply_to_row(fv, n)
+    for target in range(n):  # q: bity 1 -> 0, sterowania z idealnego wiersza i
+        bit = 1 << (n - 1 - target)
+        if fv & bit and not i & bit:
+            controls = [j for j in range(n) if i >> (n - 1 - j) & 1 and j != target]
+            gate = cheapest_safe_gate(n, i, target, controls, stats, cost_model)
+            if gate is not None:
+                gates.append(gate)
+                fv = gate.apply_to_row(fv, n)
+    return gates
 
 
 def _pick_and_apply_best_gate(
     f: TruthTable,
-    ideal: TruthTable,
     i: int,
     target: int,
     possible_controls: list[int],
     cir: Circuit,
-    verbose: bool = False,
+    tracer: Tracer = NULL_TRACER,
+    stats: Optional[SynthesisStats] = None,
+    cost_model: CostModel = table_cost,
 ) -> bool:
     """
     Dobiera i stosuje NAJTAŃSZĄ bramkę (spośród wszystkich podzbiorów sterowań),
     która nie narusza wcześniejszych wierszy. Zwraca True, jeśli cokolwiek zastosowano.
     """
-    best = None
-    # Przeszukujemy WSZYSTKIE podzbiory sterowań (włącznie z pustym — QNOT).
-    for r in range(len(possible_controls) + 1):
-        for ctrls in combinations(possible_controls, r):
-            gate = LogicGate(target, *ctrls)
-            tmp = f.__copy__()
-            gate.apply_gate_to_truth_table(tmp)
+    gate = cheapest_safe_gate(f.n, i, target, possible_controls, stats, cost_model)
 
-            if not _no_effect_on_previous_rows(tmp, ideal, i):
-                continue
-
-            gtype = gate.get_type()
-            cost = GATE_COSTS.get(gtype, 1)
-
-            key = (cost, r, list(ctrls))
-            if best is None or key < best[0]:
-                best = (key, ctrls, gate, tmp)
-
-    if best is None:
+    if gate is None:
         # Nie znaleziono bramki, która nie narusza wcześniejszych wierszy.
-        if verbose:
-            print(
-                f"[i={i}] Brak bezpiecznej bramki dla target={target} przy possible_controls={possible_controls}"
-            )
+        if tracer.enabled:
+            tracer.event("no_safe_gate", i=i, target=target, controls=possible_controls)
         return False
 
     # Zastosuj najlepszą bramkę do prawdziwej tablicy i dopisz do obwodu.
-    _, ctrls, gate, _ = best
+    ctrls = gate.controls
     gate.apply_gate_to_truth_table(f)
-    cir.add_gate_from_idx(target, *ctrls)
+    cir.add_gate(gate)
 
-    if verbose:
-        cost = GATE_COSTS.get(gate.get_type(), 1)
-        print(f"[i={i}] apply: target={target}, controls={list(ctrls)}, cost={cost}")
+    if tracer.enabled:
+        cost = cost_model(gate.get_type())
+        tracer.event("gate", i=i, target=target, controls=list(ctrls), cost=cost)
     return True
 
 
-def algorithm(f: TruthTable, verbose: bool = False) -> Circuit:
+def algorithm(
+    f: TruthTable,
+    verbose: bool = False,
+    stats: Optional[SynthesisStats] = None,
+    tracer: Optional[Tracer] = None,
+    cost_model: CostModel = table_cost,
+) -> Circuit:
     """
     Wersja zoptymalizowana:
     - Krok 1: zeruje wiersz 0 poprzez pojedyncze NOT-y na bitach, które są 1.
     - Krok 2: dla i=1..2^n-1 wyrównuje wiersz i do idealnego,
       dobierając najtańsze bramki, które NIE psują wcześniejszych wierszy.
+    stats: opcjonalne liczniki (SynthesisStats); przy None algorytm ich nie dotyka.
+    tracer: odbiorca zdarzeń kroków (Trace); verbose=True oznacza PrintTracer.
+    cost_model: koszt bramki wg liczby kubitów (COST_MODELS: GATE_COSTS, NCV, T-count).
     """
+    tracer = resolve(tracer, verbose)
+    if stats is not None:
+        stats.runs += 1
+        stats.table_copies += 1  # ideal
+        t0 = time.perf_counter()
     num_qubits = f.n
     ideal = TruthTable(num_qubits)
     cir = Circuit()
 
-    if verbose:
-        print("\ncel:", ideal.get_vectors())
-        print("obecny stan:", f.get_vectors())
+    if tracer.enabled:
+        tracer.event("start", target=ideal.get_vectors(), state=f.get_vectors())
 
     # KROK 1: wyzeruj wiersz 0
     while any(f.get_single_vector(0)):
@@ -89,21 +200,24 @@ def algorithm(f: TruthTable, verbose: bool = False) -> Circuit:
             if bit == 1:
                 gate = LogicGate(idx)  # QNOT na idx
                 gate.apply_gate_to_truth_table(f)
-                cir.add_gate_from_idx(idx)
-    if verbose:
-        print("1. stan:", f.get_vectors())
+                cir.add_gate(gate)
+    if stats is not None:
+        t1 = time.perf_counter()
+        stats.step1_s += t1 - t0
+    if tracer.enabled:
+        tracer.event("step1", state=f.get_vectors())
 
     # KROK 2: przejdź po wierszach i ustawiaj je po kolei
     for i in range(1, 2**f.n):
         fv = f.get_single_vector(i)
         iv = ideal.get_single_vector(i)
 
-        if verbose:
-            print(f"\n[i={i}] fv={fv} iv={iv}")
+        if tracer.enabled:
+            tracer.event("row", i=i, fv=fv, iv=iv)
 
         if fv == iv:
-            if verbose:
-                print("    już zgodny z celem")
+            if tracer.enabled:
+                tracer.event("row_ok")
             continue
 
         # p: bity, które powinny stać się 1 (są 0 -> mają być 1)
@@ -111,16 +225,24 @@ def algorithm(f: TruthTable, verbose: bool = False) -> Circuit:
         p = [k for k, (a, b) in enumerate(zip(iv, fv)) if a == 1 and b == 0]
         q = [k for k, (a, b) in enumerate(zip(iv, fv)) if a == 0 and b == 1]
 
-        if verbose:
-            print("   p (0->1):", p)
-            print("   q (1->0):", q)
+        if tracer.enabled:
+            tracer.event("row_plan", p=p, q=q)
 
         # Najpierw ustawiamy bity, które muszą przejść 0 -> 1.
         # Dla p sterowania bierzemy z aktualnego wiersza fv (tam gdzie bity=1).
         for target in list(p):
             fv = f.get_single_vector(i)  # odśwież
             possible_controls = [j for j, b in enumerate(fv) if b == 1 and j != target]
-            _pick_and_apply_best_gate(f, ideal, i, target, possible_controls, cir, verbose=verbose)
+            _pick_and_apply_best_gate(
+                f,
+                i,
+                target,
+                possible_controls,
+                cir,
+                tracer=tracer,
+                stats=stats,
+                cost_model=cost_model,
+            )
 
         # Następnie bity, które muszą przejść 1 -> 0.
         # Dla q sterowania bierzemy z idealnego wiersza iv (tam gdzie bity=1).
@@ -129,13 +251,26 @@ def algorithm(f: TruthTable, verbose: bool = False) -> Circuit:
         for target in list(q):
             iv_now = ideal.get_single_vector(i)
             possible_controls = [j for j, a in enumerate(iv_now) if a == 1 and j != target]
-            _pick_and_apply_best_gate(f, ideal, i, target, possible_controls, cir, verbose=verbose)
+            _pick_and_apply_best_gate(
+                f,
+                i,
+                target,
+                possible_controls,
+                cir,
+                tracer=tracer,
+                stats=stats,
+                cost_model=cost_model,
+            )
+
+        if tracer.enabled:
+            tracer.event("row_done", fv=f.get_single_vector(i))
 
-        if verbose:
-            print("   po ustawianiu:", f.get_single_vector(i))
+    if stats is not None:
+        stats.step2_s += time.perf_counter() - t1
+        stats.gates_applied += len(cir.instructions)
 
-    if verbose:
-        print("\nKońcowy obwód:")
-        cir.show_gates()
+    if tracer.enabled:
+        tracer.event("circuit")
+        cir.show_gates(tracer)
 
     return cir
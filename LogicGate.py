@@ -1,3 +1,6 @@
+from typing import Dict, Tuple
+
+
 def qnot(vector, target):
     vector[target] = int(not vector[target])
     return vector
@@ -22,9 +25,86 @@ def MCT(vector, target, *controls):
 
 
 class LogicGate:
+    """
+    Niemutowalna bramka (target, *controls). Instancje są internowane — ta sama krotka
+    qubitów zawsze daje ten sam obiekt — a maski sterowań/celu są liczone raz dla danego n.
+    """
+
+    __slots__ = ("qubits", "target", "controls", "_masks")
+
+    qubits: Tuple[int, ...]
+    target: int
+    controls: Tuple[int, ...]
+    _masks: Dict[int, Tuple[int, int]]
+
+    _interned: dict = {}
+
+    def __new__(cls, *qubits):
+        gate = cls._interned.get(qubits)
+        if gate is None:
+            gate = object.__new__(cls)
+            object.__setattr__(gate, "qubits", qubits)
+            object.__setattr__(gate, "target", qubits[0])
+            object.__setattr__(gate, "controls", qubits[1:])
+            object.__setattr__(gate, "_masks", {})
+            cls._interned[qubits] = gate
+        return gate
+
+    def __setattr__(self, name, value):
+        raise AttributeError("LogicGate jest niemutowalna")
+
+    def __delattr__(self, name):
+        raise AttributeError("LogicGate jest niemutowalna")
+
+    def __reduce__(self):
+        return LogicGate, self.qubits
 
-    def __init__(self, *qubits):
-        self.qubits = qubits
+    def __eq__(self, other):
+        if not isinstance(other, LogicGate):
+            return NotImplemented
+        return self.qubits == other.qubits
+
+    def __hash__(self):
+        return hash(self.qubits)
+
+    def __repr__(self):
+        return f"LogicGate{self.qubits}"
+
+    def masks(self, n: int):
+        """
+        Zwraca (cmask, tmask) dla wierszy n-bitowych (qubit 0 to najstarszy bit).
+        """
+        m = self._masks.get(n)
+        if m is None:
+            cmask = 0
+            for c in self.controls:
+                cmask |= 1 << (n - 1 - c)
+            m = (cmask, 1 << (n - 1 - self.target))
+            self._masks[n] = m
+        return m
+
+    def is_safe_for_row(self, i: int, n: int) -> bool:
+        """
+        Wyrocznia bezpieczeństwa: zakładając, że wiersze 0..i-1 są już identycznością
+        (wiersz j ma wartość j), bramka zmienia wiersz j < i dokładnie wtedy, gdy j zawiera
+        maskę sterowań. Najmniejszym takim j jest sama maska, więc bramka jest bezpieczna
+        wtedy i tylko wtedy, gdy cmask >= i — decyzja w O(1), bez symulacji.
+        """
+        return self.masks(n)[0] >= i
+
+    def commutes_with(self, other: "LogicGate") -> bool:
+        """Bramki komutują, gdy cel żadnej z nich nie jest sterowaniem drugiej."""
+        return self.target not in other.controls and other.target not in self.controls
+
+    def is_equivalent(self, other: "LogicGate") -> bool:
+        """Ta sama funkcja: ten sam cel i ten sam zbiór sterowań (kolejność bez znaczenia)."""
+        return self is other or (
+            self.target == other.target and set(self.controls) == set(other.controls)
+        )
+
+    def apply_to_row(self, row: int, n: int) -> int:
+        cmask, tmask = self.masks(n)
+        return row ^ tmask if row & cmask == cmask else row
 
     def apply_gate_to_vector(self, vector):
         if len(self.qubits) == 1:
@@ -37,8 +117,14 @@ class LogicGate:
             MCT(vector, self.qubits[0], *self.qubits[1:])
 
     def apply_gate_to_truth_table(self, truth_table):
-        for vector in truth_table.get_vectors():
-            self.apply_gate_to_vector(vector)
+        truth_table.apply_masks(*self.masks(truth_table.n))
+
+    def dry_run(self, truth_table):
+        """
+        Symuluje bramkę bez kopiowania tablicy: zwraca (indeksy wierszy, które zostałyby
+        zanegowane, zmiana odległości Hamminga od tablicy idealnej).
+        """
+        return truth_table.dry_run(*self.masks(truth_table.n))
 
     def get_qubits(self):
         return self.qubits
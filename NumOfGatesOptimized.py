@@ -1,7 +1,11 @@
+import time
 from itertools import combinations
+from typing import Iterator, Optional
 
 from Circuit import Circuit
 from LogicGate import LogicGate
+from SynthesisStats import SynthesisStats
+from Trace import NULL_TRACER, Tracer, resolve
 from TruthTable import TruthTable
 
 
@@ -19,87 +23,200 @@ def hamming_distance(tt1, tt2) -> int:
     return sum(sum(b1 != b2 for b1, b2 in zip(vec1, vec2)) for vec1, vec2 in zip(tt1, tt2))
 
 
-def _no_effect_on_previous_rows(temp_f: TruthTable, ideal: TruthTable, upto_idx: int) -> bool:
+ENUMERATIONS = ("auto", "gray", "lex")
+
+# przy "auto" kod Graya od tylu możliwych sterowań; dla mniejszych zbiorów prostszy przegląd
+# leksykograficzny jest szybszy (n=3: wszystkie wywołania, n=4: prawie wszystkie)
+GRAY_MIN_CONTROLS = 4
+
+
+def _best_gate_lex(
+    f: TruthTable, i: int, target: int, possible_controls: list[int]
+) -> tuple[Optional[tuple], int]:
+    """Podzbiory sterowań po kolei (combinations), każdy symulowany na całej tablicy."""
+    best = None
+    unsafe = 0
+    base_dist = f.hamming_distance_to_identity()
+    # Przeszukujemy WSZYSTKIE podzbiory sterowań (włącznie z pustym — QNOT).
+    for r in range(len(possible_controls) + 1):
+        for ctrls in combinations(possible_controls, r):
+            gate = LogicGate(target, *ctrls)
+            # wiersze 0..i-1 są już ustawione — bezpieczeństwo rozstrzyga wyrocznia w O(1)
+            if not gate.is_safe_for_row(i, f.n):
+                unsafe += 1
+                continue
+
+            # symulacja bez kopii tablicy: o ile zmieni się odległość Hamminga
+            _, delta = gate.dry_run(f)
+
+            hamming_dist = base_dist + delta  # odległość Hamminga po zastosowaniu bramki
+
+            key = (hamming_dist, r, list(ctrls))
+            if best is None or key < best[0]:
+                best = (key, ctrls, gate)
+    return best, unsafe
+
+
+def scored_safe_gates(
+    f: TruthTable,
+    i: int,
+    target: int,
+    possible_controls: list[int],
+    base_dist: Optional[int] = None,
+) -> Iterator[tuple[int, int, int]]:
     """
-    True, jeśli zastosowanie bramki nie zmieniło żadnego wiersza.
+    Bezpieczne bramki na target (podzbiory possible_controls z maską sterowań >= i) jako
+    krotki (odległość Hamminga po zastosowaniu, liczba sterowań, maska sterowań).
+    Podzbiory przeglądane w kodzie Graya — kolejne różnią się jednym sterowaniem.
+    Wiersze grupujemy raz wg bitów na pozycjach sterowań (v & maska wszystkich sterowań):
+    weights[p] = suma zmian odległości Hamminga po zanegowaniu celu we wierszach grupy p.
+    Bramka z maską sterowań S neguje grupy p ⊇ S, więc dodanie sterowania c do S odejmuje
+    od zmiany odległości weights[p] dla p ⊇ S bez c (usunięcie — dodaje). Bezpieczeństwo
+    (cmask >= i) to sama maska S, też zmieniana o jeden bit.
+    base_dist: odległość f od identyczności, jeśli wywołujący już ją zna.
     """
-    for x in range(upto_idx):
-        if temp_f.get_single_vector(x) != ideal.get_single_vector(x):
-            return False
-    return True
+    n = f.n
+    masks = [1 << (n - 1 - c) for c in possible_controls]
+    full = sum(masks)
+    if full < i:
+        return  # żaden podzbiór nie jest bezpieczny
+
+    tmask = 1 << (n - 1 - target)
+    weights: dict[int, int] = {}
+    rows = f.rows.tolist() if f.backend == "numpy" else f.rows
+    for x, v in enumerate(rows):
+        p = v & full
+        # bit celu już błędny -> zanegowanie naprawia, poprawny -> psuje
+        weights[p] = weights.get(p, 0) + (-1 if (v ^ x) & tmask else 1)
+
+    if base_dist is None:
+        base_dist = f.hamming_distance_to_identity()
+    cmask = 0
+    r = 0
+    delta = sum(weights.values())  # pusty zbiór (QNOT) neguje wszystkie wiersze
+    for step in range(1 << len(masks)):
+        if step:
+            j = (step & -step).bit_length() - 1  # sterowanie zmieniane w kroku kodu Graya
+            bit = masks[j]
+            rest = cmask & ~bit
+            # grupy p ⊇ rest bez bitu c: negowane bez sterowania c, z nim już nie
+            free = full & ~rest & ~bit
+            changed = 0
+            sub = free
+            while True:
+                changed += weights.get(rest | sub, 0)
+                if not sub:
+                    break
+                sub = (sub - 1) & free
+            if cmask & bit:
+                delta += changed
+                r -= 1
+            else:
+                delta -= changed
+                r += 1
+            cmask ^= bit
+        if cmask >= i:
+            yield base_dist + delta, r, cmask
+
+
+def controls_of(n: int, possible_controls: list[int], cmask: int) -> tuple[int, ...]:
+    """Sterowania z possible_controls, których bity są w masce cmask."""
+    return tuple(c for c in possible_controls if cmask >> (n - 1 - c) & 1)
+
+
+def _best_gate_gray(
+    f: TruthTable, i: int, target: int, possible_controls: list[int]
+) -> tuple[Optional[tuple], int]:
+    """Ci sami kandydaci i ten sam klucz co w _best_gate_lex, z scored_safe_gates."""
+    best = None
+    safe = 0
+    for hamming_dist, r, cmask in scored_safe_gates(f, i, target, possible_controls):
+        safe += 1
+        if best is None or (hamming_dist, r) <= best[0][:2]:
+            ctrls = controls_of(f.n, possible_controls, cmask)
+            key = (hamming_dist, r, list(ctrls))
+            if best is None or key < best[0]:
+                best = (key, ctrls, LogicGate(target, *ctrls))
+    return best, (1 << len(possible_controls)) - safe
 
 
 def _pick_and_apply_best_gate(
     f: TruthTable,
-    ideal: TruthTable,
     i: int,
     target: int,
     possible_controls: list[int],
     cir: Circuit,
-    verbose: bool = False,
+    tracer: Tracer = NULL_TRACER,
+    stats: Optional[SynthesisStats] = None,
+    enumeration: str = "auto",
 ) -> bool:
     """
     Dobiera i stosuje najmniejszą ilość bramek (spośród wszystkich podzbiorów sterowań),
     która nie narusza wcześniejszych wierszy. Zwraca True, jeśli cokolwiek zastosowano.
-    (Bazuje na wyznaczeniu odległości hamminga).
+    (Bazuje na wyznaczeniu odległości hamminga). enumeration: "gray" (przyrostowo, kod
+    Graya), "lex" (każdy podzbiór symulowany osobno) albo "auto" (gray od GRAY_MIN_CONTROLS
+    możliwych sterowań, wcześniej lex) — wynik jest ten sam.
     """
-    best = None
-    # Przeszukujemy WSZYSTKIE podzbiory sterowań (włącznie z pustym — QNOT).
-    for r in range(len(possible_controls) + 1):
-        for ctrls in combinations(possible_controls, r):
-            gate = LogicGate(target, *ctrls)
-            tmp = f.__copy__()
-            gate.apply_gate_to_truth_table(tmp)
+    if enumeration == "auto":
+        enumeration = "gray" if len(possible_controls) >= GRAY_MIN_CONTROLS else "lex"
+    if enumeration == "gray":
+        best, unsafe = _best_gate_gray(f, i, target, possible_controls)
+    else:
+        best, unsafe = _best_gate_lex(f, i, target, possible_controls)
 
-            if not _no_effect_on_previous_rows(tmp, ideal, i):
-                continue
-
-            gtype = gate.get_type()
-            # cost = GATE_COSTS.get(gtype, 1)
-
-            hamming_dist = hamming_distance(
-                tmp.get_vectors(), ideal.get_vectors()
-            )  # Wyznaczamy odległość hamminga
-
-            key = (hamming_dist, r, list(ctrls))
-            if best is None or key < best[0]:
-                best = (key, ctrls, gate, tmp)
+    if stats is not None:
+        enumerated = 1 << len(possible_controls)
+        stats.subsets_enumerated += enumerated
+        stats.subsets_unsafe += unsafe
+        stats.dry_runs += enumerated - unsafe
 
     if best is None:
         # Nie znaleziono bramki, która nie narusza wcześniejszych wierszy.
-        if verbose:
-            print(
-                f"[i={i}] Brak bezpiecznej bramki dla target={target} przy possible_controls={possible_controls}"
-            )
+        if tracer.enabled:
+            tracer.event("no_safe_gate", i=i, target=target, controls=possible_controls)
         return False
 
     # Zastosuj najlepszą bramkę do prawdziwej tablicy i dopisz do obwodu.
-    _, ctrls, gate, _ = best
+    _, ctrls, gate = best
     gate.apply_gate_to_truth_table(f)
-    cir.add_gate_from_idx(target, *ctrls)
+    cir.add_gate(gate)
 
-    if verbose:
-        print(
-            f"[i={i}] apply: target={target}, controls={list(ctrls)}, "
-            f"hamming distance={hamming_distance(f.get_vectors(), ideal.get_vectors())}"
-        )
+    if tracer.enabled:
+        distance = f.hamming_distance_to_identity()
+        tracer.event("gate", i=i, target=target, controls=list(ctrls), hamming_distance=distance)
 
     return True
 
 
-def algorithm(f: TruthTable, verbose: bool = False) -> Circuit:
+def algorithm(
+    f: TruthTable,
+    verbose: bool = False,
+    stats: Optional[SynthesisStats] = None,
+    tracer: Optional[Tracer] = None,
+    enumeration: str = "auto",
+) -> Circuit:
     """
     Wersja zoptymalizowana:
     - Krok 1: zeruje wiersz 0 poprzez pojedyncze NOT-y na bitach, które są 1.
     - Krok 2: dla i=1..2^n-1 wyrównuje wiersz i do idealnego,
+    stats: opcjonalne liczniki (SynthesisStats); przy None algorytm ich nie dotyka.
+    tracer: odbiorca zdarzeń kroków (Trace); verbose=True oznacza PrintTracer.
+    enumeration: kolejność przeglądania podzbiorów sterowań (ENUMERATIONS), bez wpływu
+    na wynik.
     """
+    if enumeration not in ENUMERATIONS:
+        raise ValueError(f"Nieznany enumeration: {enumeration!r} (dozwolone: {ENUMERATIONS})")
+    tracer = resolve(tracer, verbose)
+    if stats is not None:
+        stats.runs += 1
+        stats.table_copies += 1  # ideal
+        t0 = time.perf_counter()
     num_qubits = f.n
     ideal = TruthTable(num_qubits)
     cir = Circuit()
 
-    if verbose:
-        print("\ncel:", ideal.get_vectors())
-        print("obecny stan:", f.get_vectors())
+    if tracer.enabled:
+        tracer.event("start", target=ideal.get_vectors(), state=f.get_vectors())
 
     # KROK 1: wyzeruj wiersz 0
     while any(f.get_single_vector(0)):
@@ -108,21 +225,24 @@ def algorithm(f: TruthTable, verbose: bool = False) -> Circuit:
             if bit == 1:
                 gate = LogicGate(idx)  # QNOT na idx
                 gate.apply_gate_to_truth_table(f)
-                cir.add_gate_from_idx(idx)
-    if verbose:
-        print("1. stan:", f.get_vectors())
+                cir.add_gate(gate)
+    if stats is not None:
+        t1 = time.perf_counter()
+        stats.step1_s += t1 - t0
+    if tracer.enabled:
+        tracer.event("step1", state=f.get_vectors())
 
     # KROK 2: przejdź po wierszach i ustawiaj je po kolei
     for i in range(1, 2**f.n):
         fv = f.get_single_vector(i)
         iv = ideal.get_single_vector(i)
 
-        if verbose:
-            print(f"\n[i={i}] fv={fv} iv={iv}")
+        if tracer.enabled:
+            tracer.event("row", i=i, fv=fv, iv=iv)
 
         if fv == iv:
-            if verbose:
-                print("    już zgodny z celem")
+            if tracer.enabled:
+                tracer.event("row_ok")
             continue
 
         # p: bity, które powinny stać się 1 (są 0 -> mają być 1)
@@ -130,16 +250,24 @@ def algorithm(f: TruthTable, verbose: bool = False) -> Circuit:
         p = [k for k, (a, b) in enumerate(zip(iv, fv)) if a == 1 and b == 0]
         q = [k for k, (a, b) in enumerate(zip(iv, fv)) if a == 0 and b == 1]
 
-        if verbose:
-            print("   p (0->1):", p)
-            print("   q (1->0):", q)
+        if tracer.enabled:
+            tracer.event("row_plan", p=p, q=q)
 
         # Najpierw ustawiamy bity, które muszą przejść 0 -> 1.
         # Dla p sterowania bierzemy z aktualnego wiersza fv (tam gdzie bity=1).
         for target in list(p):
             fv = f.get_single_vector(i)  # odśwież
             possible_controls = [j for j, b in enumerate(fv) if b == 1 and j != target]
-            _pick_and_apply_best_gate(f, ideal, i, target, possible_controls, cir, verbose=verbose)
+            _pick_and_apply_best_gate(
+                f,
+                i,
+                target,
+                possible_controls,
+                cir,
+                tracer=tracer,
+                stats=stats,
+                enumeration=enumeration,
+            )
 
         # Następnie bity, które muszą przejść 1 -> 0.
         # Dla q sterowania bierzemy z idealnego wiersza iv (tam gdzie bity=1).
@@ -148,13 +276,26 @@ def algorithm(f: TruthTable, verbose: bool = False) -> Circuit:
         for target in list(q):
             iv_now = ideal.get_single_vector(i)
             possible_controls = [j for j, a in enumerate(iv_now) if a == 1 and j != target]
-            _pick_and_apply_best_gate(f, ideal, i, target, possible_controls, cir, verbose=verbose)
+            _pick_and_apply_best_gate(
+                f,
+                i,
+                target,
+                possible_controls,
+                cir,
+                tracer=tracer,
+                stats=stats,
+                enumeration=enumeration,
+            )
+
+        if tracer.enabled:
+            tracer.event("row_done", fv=f.get_single_vector(i))
 
-        if verbose:
-            print("   po ustawianiu:", f.get_single_vector(i))
+    if stats is not None:
+        stats.step2_s += time.perf_counter() - t1
+        stats.gates_applied += len(cir.instructions)
 
-    if verbose:
-        print("\nKońcowy obwód:")
-        cir.show_gates()
+    if tracer.enabled:
+        tracer.event("circuit")
+        cir.show_gates(tracer)
 
     return cir
@@ -0,0 +1,217 @@
+import argparse
+import heapq
+import os
+import time
+from array import array
+from collections import Counter, deque
+from itertools import combinations, permutations
+from typing import Dict, List, Optional
+
+import PermutationSource
+from Circuit import Circuit
+from ComparingAlgorithm import GATE_COSTS
+from LogicGate import LogicGate
+from SynthesisStats import SynthesisStats
+from Trace import Tracer, resolve
+from TruthTable import TruthTable
+
+# Baza optymalnych obwodów dla n=3 (8! = 40320 permutacji).
+# Dla każdej permutacji (po randze leksykograficznej) zapisany jest 1 bajt: indeks w GATES
+# bramki, która leży na optymalnej ścieżce do identyczności (NONE dla identyczności).
+# Obwód odtwarzany jest przez powtarzanie: bramka = tabela[rank(f)], f <- bramka . f.
+N = 3
+SIZE = 1 << N
+NONE = 0xFF
+OBJECTIVES = ("gates", "cost")
+MAGIC = b"OPT3"
+DEFAULT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+GATES: List[LogicGate] = [
+    LogicGate(t, *ctrls)
+    for r in range(N)
+    for t in range(N)
+    for ctrls in combinations([q for q in range(N) if q != t], r)
+]
+
+_tables: Dict[str, array] = {}
+_ranks: Dict[tuple, int] = {}
+
+
+def _gate_cost(gate: LogicGate, objective: str) -> int:
+    return 1 if objective == "gates" else GATE_COSTS.get(gate.get_type(), 1)
+
+
+def _rank(perm) -> int:
+    """Ranga leksykograficzna przez słownik (8! krotek) — szybsza niż kod Lehmera."""
+    if not _ranks:
+        _ranks.update((p, r) for r, p in enumerate(permutations(range(SIZE))))
+    return _ranks[tuple(perm)]
+
+
+def _gate_perms() -> List[List[int]]:
+    return [[g.apply_to_row(x, N) for x in range(SIZE)] for g in GATES]
+
+
+def build(objective: str = "gates") -> array:
+    """
+    Przeszukiwanie od identyczności po całej grupie permutacji 3 kubitów:
+    - "gates": BFS (każda bramka kosztuje 1) — minimalna liczba bramek,
+    - "cost":  Dijkstra z wagami GATE_COSTS — minimalny koszt.
+    Bramki NOT/CNOT/Toffoli są inwolucjami, więc odległość od identyczności do f
+    jest równa odległości od f do identyczności, a bramka prowadząca do f jest
+    pierwszą bramką obwodu dla f.
+    """
+    if objective not in OBJECTIVES:
+        raise ValueError(f"Nieznany objective: {objective!r} (dozwolone: {OBJECTIVES})")
+    gate_perms = _gate_perms()
+    total = PermutationSource.num_permutations(N)
+    table = array("B", [NONE]) * total
+    dist = [-1] * total  # -1: jeszcze nie osiągnięta
+    start = tuple(range(SIZE))
+    dist[0] = 0
+
+    if objective == "gates":
+        queue = deque([start])
+        while queue:
+            perm = queue.popleft()
+            d = dist[_rank(perm)] + 1
+            for k, g in enumerate(gate_perms):
+                nxt = tuple(g[v] for v in perm)
+                r = _rank(nxt)
+                if dist[r] < 0:
+                    dist[r] = d
+                    table[r] = k
+                    queue.append(nxt)
+    else:
+        costs = [_gate_cost(g, objective) for g in GATES]
+        heap = [(0, 0)]
+        while heap:
+            d, r = heapq.heappop(heap)
+            if d > dist[r]:
+                continue
+            popped = PermutationSource.unrank(r, SIZE)  # tylko przy zdejmowaniu z kopca
+            for k, g in enumerate(gate_perms):
+                nd = d + costs[k]
+                nr = _rank(g[v] for v in popped)
+                if dist[nr] < 0 or nd < dist[nr]:
+                    dist[nr] = nd
+                    table[nr] = k
+                    heapq.heappush(heap, (nd, nr))
+    return table
+
+
+def table_path(objective: str, directory: str = DEFAULT_DIR) -> str:
+    return os.path.join(directory, f"optimal_n3_{objective}.bin")
+
+
+def save(table: array, path: str) -> None:
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        table.tofile(f)
+
+
+def load(path: str) -> array:
+    total = PermutationSource.num_permutations(N)
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path}: to nie jest baza optymalnych obwodów n=3")
+        table = array("B")
+        table.fromfile(f, total)
+    return table
+
+
+def get_table(objective: str = "gates") -> array:
+    """Tabela dla objective: z pamięci, z pliku obok modułu albo zbudowana na miejscu."""
+    if objective not in _tables:
+        path = table_path(objective)
+        _tables[objective] = load(path) if os.path.exists(path) else build(objective)
+    return _tables[objective]
+
+
+def lookup(f: TruthTable, objective: str = "gates") -> Circuit:
+    """
+    Optymalny obwód (wg objective) sprowadzający f do identyczności. f nie jest zmieniane.
+    Każdy krok to odczyt jednego bajtu tabeli — obwód ma co najwyżej 8 bramek (dla "gates").
+    """
+    if f.n != N:
+        raise ValueError(f"Baza obejmuje tylko n={N}, a tablica ma n={f.n}")
+    table = get_table(objective)
+    perm = f.get_vectors_as_ints()
+    cir = Circuit()
+    while True:
+        k = table[_rank(perm)]
+        if k == NONE:
+            return cir
+        gate = GATES[k]
+        cir.add_gate(gate)
+        perm = [gate.apply_to_row(v, N) for v in perm]
+
+
+def optimal_size(f: TruthTable, objective: str = "gates") -> int:
+    """Optymalna liczba bramek ("gates") albo koszt wg GATE_COSTS ("cost") dla f."""
+    cir = lookup(f, objective)
+    return sum(_gate_cost(g, objective) for g in cir.instructions)
+
+
+def algorithm(
+    f: TruthTable,
+    verbose: bool = False,
+    objective: str = "gates",
+    stats: Optional[SynthesisStats] = None,
+    tracer: Optional[Tracer] = None,
+) -> Circuit:
+    """
+    Ten sam interfejs co pozostałe algorytmy: zwraca obwód i sprowadza f do identyczności,
+    tylko zamiast heurystyki odczytuje optymalny obwód z bazy.
+    """
+    if stats is not None:
+        stats.runs += 1
+        t0 = time.perf_counter()
+    cir = lookup(f, objective)
+
+    tracer = resolve(tracer, verbose)
+    if tracer.enabled:
+        tracer.event("start", target="identyczność", state=f.get_vectors_as_ints())
+
+    cir.apply_circuit(f)
+
+    if stats is not None:
+        stats.step2_s += time.perf_counter() - t0
+        stats.gates_applied += len(cir.instructions)
+
+    if tracer.enabled:
+        tracer.event("circuit")
+        cir.show_gates(tracer)
+
+    return cir
+
+
+def gap_histogram(algo_mod, objective: str = "gates") -> Dict[int, int]:
+    """
+    Dla wszystkich 40320 permutacji: histogram różnicy (heurystyka - optimum) liczby bramek
+    albo kosztu. algo_mod to moduł z funkcją algorithm(f, verbose).
+    """
+    hist: Counter[int] = Counter()
+    for r in range(PermutationSource.num_permutations(N)):
+        f = TruthTable.from_rank(N, r)
+        best = optimal_size(f, objective)
+        cir = algo_mod.algorithm(f, verbose=False)
+        hist[sum(_gate_cost(g, objective) for g in cir.instructions) - best] += 1
+    return dict(sorted(hist.items()))
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    p = argparse.ArgumentParser(description="Buduje bazy optymalnych obwodów dla n=3.")
+    p.add_argument("--dir", default=DEFAULT_DIR, help="Katalog docelowy plików bazy.")
+    p.add_argument(
+        "--objective", choices=OBJECTIVES, action="append", help="Domyślnie obie bazy."
+    )
+    args = p.parse_args(argv)
+    for objective in args.objective or OBJECTIVES:
+        path = table_path(objective, args.dir)
+        save(build(objective), path)
+        print(f"Zapisano bazę '{objective}' do {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+import hashlib
+import sys
+from array import array
+from typing import Iterable, Iterator, List, Optional
+
+
+class Permutation:
+    """
+    Compiled reversible function on n qubits: ``values[x]`` is the output for input ``x``.
+    Unlike TruthTable it is immutable, so it can be hashed, compared and cached.
+    Evaluation is a table lookup; composition and inversion are single passes over the table.
+    """
+
+    __slots__ = ("n", "values", "_hash")
+
+    _hash: Optional[int]
+
+    def __init__(self, values: Iterable[int]):
+        values = array("I", values)
+        size = len(values)
+        if size == 0 or size & (size - 1):
+            raise ValueError(f"Permutation size must be a power of 2, got {size}")
+        seen = bytearray(size)
+        for v in values:
+            if v >= size or seen[v]:
+                raise ValueError("Values do not form a permutation")
+            seen[v] = 1
+        self.n = size.bit_length() - 1
+        self.values = values
+        self._hash = None
+
+    @classmethod
+    def _trusted(cls, n: int, values: array) -> "Permutation":
+        p = cls.__new__(cls)
+        p.n = n
+        p.values = values
+        p._hash = None
+        return p
+
+    @classmethod
+    def identity(cls, n: int) -> "Permutation":
+        return cls._trusted(n, array("I", range(1 << n)))
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.values)
+
+    def __getitem__(self, x: int) -> int:
+        return self.values[x]
+
+    def __call__(self, x: int) -> int:
+        return self.values[x]
+
+    def apply_to_vector(self, vector: List[int]) -> None:
+        """In-place counterpart of Circuit.apply_circuit_to_vector (bit of qubit 0 first)."""
+        x = 0
+        for bit in vector:
+            x = (x << 1) | bit
+        y = self.values[x]
+        for q in range(self.n):
+            vector[q] = (y >> (self.n - 1 - q)) & 1
+
+    def compose(self, other: "Permutation") -> "Permutation":
+        """self . other: first other, then self (x -> self(other(x)))."""
+        if other.n != self.n:
+            raise ValueError(f"Cannot compose permutations on {self.n} and {other.n} qubits")
+        v = self.values
+        return Permutation._trusted(self.n, array("I", [v[y] for y in other.values]))
+
+    def then(self, other: "Permutation") -> "Permutation":
+        """First self, then other — the order in which circuits are applied."""
+        return other.compose(self)
+
+    def __matmul__(self, other: "Permutation") -> "Permutation":
+        return self.compose(other)
+
+    def inverse(self) -> "Permutation":
+        inv = array("I", [0]) * len(self.values)
+        for x, y in enumerate(self.values):
+            inv[y] = x
+        return Permutation._trusted(self.n, inv)
+
+    def is_identity(self) -> bool:
+        return self.values == array("I", range(len(self.values)))
+
+    def to_bytes(self) -> bytes:
+        """Little-endian fixed-width encoding (2 bytes per entry up to n=16, then 4)."""
+        row = array("H" if self.n <= 16 else "I", self.values)
+        if sys.byteorder != "little":
+            row.byteswap()
+        return row.tobytes()
+
+    def fingerprint(self) -> str:
+        """Stable digest of the function (equal functions give equal fingerprints)."""
+        return hashlib.blake2b(bytes([self.n]) + self.to_bytes(), digest_size=16).hexdigest()
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Permutation):
+            return NotImplemented
+        return self.values == other.values
+
+    def __hash__(self) -> int:
+        if self._hash is None:
+            self._hash = hash(self.values.tobytes())
+        return self._hash
+
+    def __repr__(self) -> str:
+        return f"Permutation({self.values.tolist()})"
+
+    def tolist(self) -> List[int]:
+        return self.values.tolist()
@@ -0,0 +1,182 @@
+import argparse
+import gzip
+import json
+import mmap
+import struct
+import sys
+from array import array
+from functools import reduce
+from typing import Iterable, Iterator, List, Optional, Sequence
+
+# Binary permutation file:
+#   header (16 B, little-endian): magic "PRM1", n (u8), width in bytes (u8), reserved (u16),
+#                                 count (u64)
+#   body: count fixed-width records, each 2^n output indices of `width` bytes.
+# HEADER, TYPECODES, width_for and the little-endian array helpers are shared with the
+# binary results format (ResultsFile).
+MAGIC = b"PRM1"
+HEADER = struct.Struct("<4sBBHQ")
+TYPECODES = {1: "B", 2: "H", 4: "I"}
+_BULK_BYTES = 1 << 20  # PermutationFileReader.iter_range decodes this much at a time
+
+
+def width_for(n: int) -> int:
+    """Bytes per stored value for n-bit values: 1, 2 or 4."""
+    return 1 if n <= 8 else 2 if n <= 16 else 4
+
+
+def array_from_le(typecode: str, raw) -> array:
+    """array of the given typecode decoded from little-endian bytes."""
+    col = array(typecode)
+    col.frombytes(raw)
+    if sys.byteorder != "little":
+        col.byteswap()
+    return col
+
+
+def array_to_le(col: array) -> bytes:
+    """Little-endian bytes of an array (the array itself is left unchanged)."""
+    if sys.byteorder != "little":
+        col = array(col.typecode, col)
+        col.byteswap()
+    return col.tobytes()
+
+
+def is_perm_bin(path: str) -> bool:
+    """True if the file starts with the binary permutation header."""
+    try:
+        with open(path, "rb") as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def write_perms_bin(path: str, n: int, perms: Iterable[Sequence[int]]) -> int:
+    """
+    Writes permutations (lists of 2^n output indices) in the binary format.
+    Returns the number of records written.
+    """
+    N = 1 << n
+    width = width_for(n)
+    typecode = TYPECODES[width]
+    count = 0
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, n, width, 0, 0))
+        for perm in perms:
+            if len(perm) != N:
+                raise ValueError(f"Record {count}: expected {N} elements, got {len(perm)}")
+            f.write(array_to_le(array(typecode, perm)))
+            count += 1
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, n, width, 0, count))
+    return count
+
+
+class PermutationFileReader:
+    """
+    mmap-backed reader of the binary permutation format. Records are read straight from
+    the mapping, so slicing by record number does not touch the rest of the file, and are
+    returned as arrays decoded from the mapped bytes (no per-element Python objects; they
+    can be passed to TruthTable as they are).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mm) < HEADER.size:
+            self.close()
+            raise ValueError(f"{path}: not a binary permutation file")
+        magic, self.n, self.width, _, self.count = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{path}: not a binary permutation file")
+        self.record_size = (1 << self.n) * self.width
+        expected = HEADER.size + self.count * self.record_size
+        if len(self._mm) < expected:
+            self.close()
+            raise ValueError(f"{path}: truncated file ({len(self._mm)} < {expected} bytes)")
+        self._view: Optional[memoryview] = memoryview(self._mm)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, k: int) -> array:
+        if k < 0:
+            k += self.count
+        if not 0 <= k < self.count:
+            raise IndexError(k)
+        start = HEADER.size + k * self.record_size
+        if self._view is None:
+            raise ValueError(f"{self.path}: file is closed")
+        raw = self._view[start : start + self.record_size]
+        return array_from_le(TYPECODES[self.width], raw)
+
+    def iter_range(self, start: int = 0, stop: Optional[int] = None) -> Iterator[array]:
+        """Records start..stop-1, decoded in bulk (_BULK_BYTES at a time) and sliced."""
+        stop = self.count if stop is None else min(stop, self.count)
+        if self._view is None:
+            raise ValueError(f"{self.path}: file is closed")
+        size = 1 << self.n
+        step = max(1, _BULK_BYTES // self.record_size)
+        for first in range(start, stop, step):
+            last = min(first + step, stop)
+            offset = HEADER.size + first * self.record_size
+            with self._view[offset : offset + (last - first) * self.record_size] as block:
+                col = array_from_le(TYPECODES[self.width], block)
+            for pos in range(0, len(col), size):
+                yield col[pos : pos + size]
+
+    def __iter__(self) -> Iterator[array]:
+        return self.iter_range()
+
+    def close(self) -> None:
+        view = getattr(self, "_view", None)
+        if view is not None:
+            view.release()
+            self._view = None
+        self._mm.close()
+        self._file.close()
+
+    def __enter__(self) -> "PermutationFileReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def convert_jsonl(input_path: str, output_path: str) -> int:
+    """Converts a JSONL/JSONL.GZ file of bit lists (Workload.iter_jsonl format) to binary."""
+
+    def _perms():
+        open_fn = gzip.open if input_path.endswith(".gz") else open
+        with open_fn(input_path, "rt", encoding="utf-8") as f:
+            for line in f:
+                s = line.strip()
+                if s:
+                    yield [reduce(lambda acc, b: (acc << 1) | b, bits, 0) for bits in json.loads(s)]
+
+    perms = _perms()
+    first = next(perms, None)
+    if first is None:
+        raise ValueError(f"{input_path}: no records")
+    n = (len(first) - 1).bit_length()
+
+    def _all():
+        yield first
+        yield from perms
+
+    return write_perms_bin(output_path, n, _all())
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    p = argparse.ArgumentParser(description="Convert JSONL permutations to the binary format.")
+    p.add_argument("input", help="JSONL/JSONL.GZ with bit-list permutations.")
+    p.add_argument("output", help="Output binary permutation file.")
+    args = p.parse_args(sys.argv[1:] if argv is None else argv)
+    count = convert_jsonl(args.input, args.output)
+    print(f"Zapisano {count} permutacji do {args.output}")
+
+
+if __name__ == "__main__":
+    main()
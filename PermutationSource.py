@@ -0,0 +1,65 @@
+from math import factorial
+from typing import Iterator, List, Optional, Sequence
+
+
+def num_permutations(n: int) -> int:
+    """Number of reversible functions on n qubits, (2^n)!."""
+    return factorial(1 << n)
+
+
+def rank(perm: Sequence[int]) -> int:
+    """
+    Lexicographic rank of a permutation of range(len(perm)) (Lehmer code).
+    Rank 0 is the identity; ranks follow itertools.permutations order.
+    """
+    size = len(perm)
+    r = 0
+    for i, p in enumerate(perm):
+        smaller_after = sum(1 for q in perm[i + 1 :] if q < p)
+        r += smaller_after * factorial(size - 1 - i)
+    return r
+
+
+def unrank(r: int, size: int) -> List[int]:
+    """Inverse of rank: the permutation of range(size) with lexicographic rank r."""
+    if not 0 <= r < factorial(size):
+        raise ValueError(f"Rank {r} out of range for {size} elements")
+    remaining = list(range(size))
+    perm = []
+    for i in range(size - 1, -1, -1):
+        digit, r = divmod(r, factorial(i))
+        perm.append(remaining.pop(digit))
+    return perm
+
+
+def next_permutation(perm: List[int]) -> bool:
+    """
+    Advances perm in place to its lexicographic successor.
+    Returns False (leaving perm unchanged) if perm is the last permutation.
+    """
+    i = len(perm) - 2
+    while i >= 0 and perm[i] >= perm[i + 1]:
+        i -= 1
+    if i < 0:
+        return False
+    j = len(perm) - 1
+    while perm[j] <= perm[i]:
+        j -= 1
+    perm[i], perm[j] = perm[j], perm[i]
+    perm[i + 1 :] = reversed(perm[i + 1 :])
+    return True
+
+
+def iter_permutations(n: int, start: int = 0, stop: Optional[int] = None) -> Iterator[List[int]]:
+    """
+    Lazily yields the permutations of 2^n rows with ranks start..stop-1.
+    Only the first one is unranked; the rest follow by next_permutation.
+    """
+    total = num_permutations(n)
+    stop = total if stop is None else min(stop, total)
+    if start >= stop:
+        return
+    perm = unrank(start, 1 << n)
+    for _ in range(start, stop):
+        yield list(perm)
+        next_permutation(perm)
@@ -0,0 +1,210 @@
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+from array import array
+from functools import partial
+from types import ModuleType
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from Circuit import Circuit
+from SynthesisStats import SynthesisStats
+from Trace import Tracer
+from TruthTable import TruthTable
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS circuits (
+    algorithm TEXT NOT NULL,
+    version TEXT NOT NULL,
+    n INTEGER NOT NULL,
+    perm BLOB NOT NULL,
+    gates TEXT NOT NULL,
+    PRIMARY KEY (algorithm, version, n, perm)
+) WITHOUT ROWID
+"""
+
+_versions: Dict[str, str] = {}
+
+
+def _source(mod: ModuleType) -> str:
+    if mod.__file__ is None:
+        raise ValueError(f"{mod.__name__} has no source file")
+    return mod.__file__
+
+
+def _repo_dependencies(mod: ModuleType) -> List[ModuleType]:
+    """mod and the modules from its directory it pulls names from, transitively."""
+    root = os.path.dirname(os.path.abspath(_source(mod)))
+    seen: Dict[str, ModuleType] = {}
+    stack = [mod]
+    while stack:
+        m = stack.pop()
+        if m.__name__ in seen:
+            continue
+        seen[m.__name__] = m
+        for value in vars(m).values():
+            if not isinstance(value, ModuleType):
+                value = sys.modules.get(getattr(value, "__module__", None) or "")
+            path = getattr(value, "__file__", None)
+            if path and os.path.dirname(os.path.abspath(path)) == root:
+                stack.append(value)
+    return sorted(seen.values(), key=lambda m: m.__name__)
+
+
+def algorithm_version(mod: ModuleType) -> str:
+    """
+    Hash of the sources of the algorithm module and the repo modules it depends on, so
+    editing any of them invalidates cached circuits.
+    """
+    if mod.__name__ not in _versions:
+        h = hashlib.sha256()
+        for dep in _repo_dependencies(mod):
+            with open(_source(dep), "rb") as f:
+                h.update(dep.__name__.encode() + b"\0" + f.read())
+        _versions[mod.__name__] = h.hexdigest()[:16]
+    return _versions[mod.__name__]
+
+
+# argumenty, które nie zmieniają zwracanego obwodu (workers/executor: tylko równoległość)
+_NEUTRAL_KWARGS = frozenset(("verbose", "stats", "tracer", "workers", "executor"))
+
+
+def bound_kwargs(run: Optional[Callable[..., Circuit]]) -> Dict[str, Any]:
+    """
+    Keyword arguments bound into `run` that can change the circuit it returns: those of
+    functools.partial layers and, for wrappers such as Canonical.CanonicalCache (bound method
+    of an object keeping the wrapped algorithm in `.algo`), those of the wrapped callable
+    plus the wrapper's `negate` flag. Positional arguments cannot be named stably, so a
+    partial binding any is rejected.
+    """
+    kwargs: Dict[str, Any] = {}
+    while run is not None:
+        if isinstance(run, partial):
+            if run.args:
+                raise ValueError(f"Cannot cache {run!r}: bind algorithm arguments by keyword")
+            for key, value in run.keywords.items():
+                if key not in _NEUTRAL_KWARGS:
+                    kwargs.setdefault(key, value)
+            run = run.func
+            continue
+        owner = getattr(run, "__self__", None)
+        if getattr(owner, "negate", False):
+            kwargs.setdefault("negate", True)
+        run = getattr(owner, "algo", None)
+    return kwargs
+
+
+def _perm_key(perm: Sequence[int], n: int) -> bytes:
+    row = array("H" if n <= 16 else "I", perm)
+    if sys.byteorder != "little":
+        row.byteswap()
+    return row.tobytes()
+
+
+class ResultsCache:
+    """
+    On-disk (sqlite) cache of synthesized circuits keyed by
+    (algorithm module, source version, n, permutation). Writes are committed in batches;
+    call commit() or close() (or use it as a context manager) to persist them.
+    """
+
+    def __init__(self, path: str, commit_every: int = 1000):
+        self.path = path
+        self.commit_every = commit_every
+        self._conn = sqlite3.connect(path, timeout=60)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(_SCHEMA)
+        self._conn.commit()
+        self._pending = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(
+        self, algorithm: str, version: str, perm: Sequence[int], n: int
+    ) -> Optional[List[Tuple[int, ...]]]:
+        row = self._conn.execute(
+            "SELECT gates FROM circuits WHERE algorithm=? AND version=? AND n=? AND perm=?",
+            (algorithm, version, n, _perm_key(perm, n)),
+        ).fetchone()
+        return None if row is None else [tuple(q) for q in json.loads(row[0])]
+
+    def put(
+        self,
+        algorithm: str,
+        version: str,
+        perm: Sequence[int],
+        n: int,
+        gates: Sequence[Tuple[int, ...]],
+    ) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO circuits VALUES (?, ?, ?, ?, ?)",
+            (algorithm, version, n, _perm_key(perm, n), json.dumps(gates, separators=(",", ":"))),
+        )
+        self._pending += 1
+        if self._pending >= self.commit_every:
+            self.commit()
+
+    def synthesize(
+        self,
+        f: TruthTable,
+        algo_mod: ModuleType,
+        verbose: bool = False,
+        run: Optional[Callable[..., Circuit]] = None,
+        variant: Optional[ModuleType] = None,
+        stats: Optional[SynthesisStats] = None,
+        tracer: Optional[Tracer] = None,
+    ) -> Circuit:
+        """
+        Drop-in for algo_mod.algorithm(f, verbose): returns the cached circuit if present,
+        otherwise runs the algorithm (or `run`, e.g. a wrapped variant of it) and stores the
+        result. Either way f is reduced to the identity, like with the algorithm itself.
+        `variant` is the module providing such a wrapper (e.g. Canonical); it becomes part
+        of the key and its sources part of the version. Keyword arguments bound into `run`
+        (e.g. partial(BeamSearch.algorithm, width=8)) are part of the key too, see
+        bound_kwargs. `stats` is passed on to the
+        algorithm on a miss only, so it counts real synthesis work; so is `tracer`.
+        """
+        name = algo_mod.__name__
+        version = algorithm_version(algo_mod)
+        if variant is not None:
+            name += ":" + variant.__name__
+            version += ":" + algorithm_version(variant)
+        bound = bound_kwargs(run)
+        if bound:
+            name += "(" + ", ".join(f"{k}={v!r}" for k, v in sorted(bound.items())) + ")"
+        perm = f.get_vectors_as_ints()
+
+        gates = self.get(name, version, perm, f.n)
+        if gates is None:
+            self.misses += 1
+            kwargs: Dict[str, Any] = {} if stats is None else {"stats": stats}
+            if tracer is not None:
+                kwargs["tracer"] = tracer
+            cir = (run or algo_mod.algorithm)(f, verbose=verbose, **kwargs)
+            self.put(name, version, perm, f.n, [g.qubits for g in cir.instructions])
+            return cir
+
+        self.hits += 1
+        cir = Circuit()
+        for qubits in gates:
+            cir.add_gate_from_idx(*qubits)
+        cir.apply_circuit(f)
+        return cir
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM circuits").fetchone()[0]
+
+    def commit(self) -> None:
+        self._conn.commit()
+        self._pending = 0
+
+    def close(self) -> None:
+        self.commit()
+        self._conn.close()
+
+    def __enter__(self) -> "ResultsCache":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,242 @@
+import mmap
+import struct
+from array import array
+from itertools import accumulate
+from typing import Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from Circuit import Circuit
+from PermutationFile import HEADER, TYPECODES, array_from_le, array_to_le, width_for
+
+# Binary results file (alternative to main's JSONL output):
+#   header (16 B, little-endian, same layout as PermutationFile.HEADER): magic "RES1",
+#         version (u8), reserved (u8, u16), record count (u64)
+#   body: chunks, each a 16 B chunk header — n (u8), mask width in bytes (u8), reserved (u16),
+#         record count (u32), gate count (u32), reserved (u32) — followed by columns:
+#           perm_idx   u64[records]   (with main --n: perm_rank + 1)
+#           status     u8[records]    (STATUS_OK / STATUS_ERROR bits)
+#           num_gates  u32[records]
+#           cost       u32[records]
+#           target     u8[gates]      (qubit index of the gate target)
+#           controls   u8|u16|u32[gates]  (control mask, qubit q = bit 1 << (n - 1 - q))
+# Gates of record k are the slice starting at the sum of num_gates of records 0..k-1.
+MAGIC = b"RES1"
+VERSION = 1
+_CHUNK = struct.Struct("<BBHIII")
+
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+
+def is_results_bin(path: str) -> bool:
+    """True if the file starts with the binary results header."""
+    try:
+        with open(path, "rb") as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+class ChunkBuilder:
+    """
+    Collects the records of one chunk column by column; to_bytes() packs them. All
+    successful records of a chunk must have the same n (error records carry no gates).
+    """
+
+    def __init__(self):
+        self.n: Optional[int] = None
+        self.perm_idx = array("Q")
+        self.status = array("B")
+        self.num_gates = array("I")
+        self.cost = array("I")
+        self.targets = array("B")
+        self.masks: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self.perm_idx)
+
+    def add(self, perm_idx: int, n: int, ok: bool, gates: Sequence[Tuple[int, ...]], cost: int):
+        """gates: qubit tuples (target, *controls) as in LogicGate.qubits."""
+        if self.n is None:
+            self.n = n
+        elif n != self.n:
+            raise ValueError(f"Mixed n in one chunk: {self.n} and {n}")
+        self.perm_idx.append(perm_idx)
+        self.status.append(STATUS_OK if ok else 0)
+        self.num_gates.append(len(gates))
+        self.cost.append(cost)
+        top = n - 1
+        for target, *controls in gates:
+            mask = 0
+            for c in controls:
+                mask |= 1 << (top - c)
+            self.targets.append(target)
+            self.masks.append(mask)
+
+    def add_error(self, perm_idx: int) -> None:
+        self.perm_idx.append(perm_idx)
+        self.status.append(STATUS_ERROR)
+        self.num_gates.append(0)
+        self.cost.append(0)
+
+    def to_bytes(self) -> bytes:
+        n = self.n or 0
+        width = width_for(n)
+        parts = [_CHUNK.pack(n, width, 0, len(self), len(self.targets), 0)]
+        for col in (self.perm_idx, self.status, self.num_gates, self.cost, self.targets):
+            parts.append(array_to_le(col))
+        parts.append(array_to_le(array(TYPECODES[width], self.masks)))
+        return b"".join(parts)
+
+
+def chunk_records(data: bytes) -> int:
+    """Number of records in a packed chunk (ChunkBuilder.to_bytes output)."""
+    return _CHUNK.unpack_from(data, 0)[3]
+
+
+class ResultsFileWriter:
+    """Appends packed chunks; the record count in the header is filled in by close()."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.count = 0
+        self._file = open(path, "wb")
+        self._file.write(HEADER.pack(MAGIC, VERSION, 0, 0, 0))
+
+    def write_chunk(self, data: bytes) -> None:
+        if not data:
+            return
+        self._file.write(data)
+        self.count += chunk_records(data)
+
+    def close(self) -> None:
+        if self._file.closed:
+            return
+        self._file.seek(0)
+        self._file.write(HEADER.pack(MAGIC, VERSION, 0, 0, self.count))
+        self._file.close()
+
+    def __enter__(self) -> "ResultsFileWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class ResultRecord(NamedTuple):
+    perm_idx: int
+    n: int
+    ok: bool
+    error: bool
+    num_gates: int
+    circuit_cost: int
+    targets: Sequence[int]
+    masks: Sequence[int]
+
+    def gates(self) -> List[Tuple[int, ...]]:
+        """Gate qubit tuples (target, *controls), controls in ascending order."""
+        top = self.n - 1
+        return [
+            (t, *(q for q in range(self.n) if m >> (top - q) & 1))
+            for t, m in zip(self.targets, self.masks)
+        ]
+
+    def circuit(self) -> Circuit:
+        cir = Circuit()
+        for qubits in self.gates():
+            cir.add_gate_from_idx(*qubits)
+        return cir
+
+
+class ResultsChunk(NamedTuple):
+    n: int
+    perm_idx: array
+    status: array
+    num_gates: array
+    cost: array
+    targets: array
+    masks: array
+
+    def __len__(self) -> int:
+        return len(self.perm_idx)
+
+    def records(self) -> Iterator[ResultRecord]:
+        starts = accumulate(self.num_gates, initial=0)
+        for k, start in zip(range(len(self.perm_idx)), starts):
+            end = start + self.num_gates[k]
+            status = self.status[k]
+            yield ResultRecord(
+                self.perm_idx[k],
+                self.n,
+                bool(status & STATUS_OK),
+                bool(status & STATUS_ERROR),
+                self.num_gates[k],
+                self.cost[k],
+                self.targets[start:end],
+                self.masks[start:end],
+            )
+
+
+class ResultsFileReader:
+    """
+    mmap-backed reader of the binary results format. Columns are decoded a chunk at a time,
+    so per-record statistics (num_gates, cost) never touch the gate streams, and circuits
+    are only rebuilt when ResultRecord.circuit() is called.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mm) < HEADER.size:
+            self.close()
+            raise ValueError(f"{path}: not a binary results file")
+        magic, version, _, _, self.count = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path}: not a binary results file (version {VERSION})")
+
+    def __len__(self) -> int:
+        return self.count
+
+    def iter_chunks(self) -> Iterator[ResultsChunk]:
+        mm = self._mm
+        pos = HEADER.size
+        while pos < len(mm):
+            n, width, _, records, gates, _ = _CHUNK.unpack_from(mm, pos)
+            pos += _CHUNK.size
+            columns = []
+            for typecode, size, count in (
+                ("Q", 8, records),
+                ("B", 1, records),
+                ("I", 4, records),
+                ("I", 4, records),
+                ("B", 1, gates),
+                (TYPECODES[width], width, gates),
+            ):
+                end = pos + size * count
+                if end > len(mm):
+                    raise ValueError(f"{self.path}: truncated chunk at byte {pos}")
+                columns.append(array_from_le(typecode, mm[pos:end]))
+                pos = end
+            yield ResultsChunk(n, *columns)
+
+    def __iter__(self) -> Iterator[ResultRecord]:
+        for chunk in self.iter_chunks():
+            yield from chunk.records()
+
+    def column(self, name: str) -> array:
+        """One column over the whole file: perm_idx, status, num_gates or cost."""
+        out = array({"perm_idx": "Q", "status": "B"}.get(name, "I"))
+        for chunk in self.iter_chunks():
+            out.extend(getattr(chunk, name))
+        return out
+
+    def close(self) -> None:
+        self._mm.close()
+        self._file.close()
+
+    def __enter__(self) -> "ResultsFileReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,231 @@
+import argparse
+import json
+import math
+import sys
+import time
+from collections import Counter
+from statistics import NormalDist
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from Algorithms import ALGORITHMS
+from Permutation import Permutation
+from TruthTable import TruthTable
+from Workload import gate_cost, iter_random_permutations
+
+
+def _z(confidence: float) -> float:
+    return NormalDist().inv_cdf(0.5 + confidence / 2)
+
+
+class RunningStats:
+    """
+    Bieżące estymatory dla wartości całkowitych (liczba bramek, koszt): średnia i wariancja
+    metodą Welforda (jedno przejście, stabilnie numerycznie) oraz histogram, z którego
+    kwantyle są liczone dokładnie. Przedziały ufności — przybliżenie normalne.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.hist: Counter = Counter()
+
+    def add(self, x: int) -> None:
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (x - self.mean)
+        self.hist[x] += 1
+
+    @property
+    def variance(self) -> float:
+        """Wariancja z próby (nieobciążona); 0 dla mniej niż 2 obserwacji."""
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def stddev(self) -> float:
+        return math.sqrt(self.variance)
+
+    def half_width(self, confidence: float = 0.95) -> float:
+        """Połowa szerokości przedziału ufności dla średniej."""
+        if self.count < 2:
+            return math.inf
+        return _z(confidence) * self.stddev / math.sqrt(self.count)
+
+    def mean_ci(self, confidence: float = 0.95) -> Tuple[float, float]:
+        h = self.half_width(confidence)
+        return self.mean - h, self.mean + h
+
+    def _order_statistic(self, k: int) -> int:
+        """k-ta (od 0) najmniejsza obserwacja."""
+        k = min(max(k, 0), self.count - 1)
+        seen = 0
+        for value in sorted(self.hist):
+            seen += self.hist[value]
+            if k < seen:
+                return value
+        raise ValueError("Brak obserwacji")
+
+    def quantile(self, q: float) -> int:
+        return self._order_statistic(math.ceil(q * self.count) - 1)
+
+    def quantile_ci(self, q: float, confidence: float = 0.95) -> Tuple[int, int]:
+        """Przedział ufności kwantyla (rozkład dwumianowy liczby obserwacji poniżej)."""
+        spread = _z(confidence) * math.sqrt(self.count * q * (1 - q))
+        lo = math.floor(self.count * q - spread) - 1
+        hi = math.ceil(self.count * q + spread) - 1
+        return self._order_statistic(lo), self._order_statistic(hi)
+
+    def summary(self, confidence: float = 0.95, quantiles=(0.05, 0.25, 0.5, 0.75, 0.95)) -> Dict:
+        if self.count == 0:
+            return {"count": 0}
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "mean_ci": list(self.mean_ci(confidence)),
+            "variance": self.variance,
+            "stddev": self.stddev,
+            "min": min(self.hist),
+            "max": max(self.hist),
+            "quantiles": {
+                str(q): {"value": self.quantile(q), "ci": list(self.quantile_ci(q, confidence))}
+                for q in quantiles
+            },
+        }
+
+
+def run_sampling(
+    n: int,
+    algo_mod,
+    seed: int = 0,
+    rel_precision: float = 0.01,
+    confidence: float = 0.95,
+    time_budget: Optional[float] = None,
+    max_samples: Optional[int] = None,
+    min_samples: int = 30,
+    report_every: int = 100,
+    on_report: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Losuje jednostajnie permutacje n-bitowe (ziarno seed), syntetyzuje je algo_mod.algorithm
+    i aktualizuje estymatory liczby bramek i kosztu. Kończy, gdy względna połowa szerokości
+    przedziału ufności średniej obu wielkości spadnie do rel_precision (po min_samples),
+    po time_budget sekundach albo po max_samples próbkach. Co report_every próbek (i na
+    końcu) przekazuje migawkę do on_report. Zwraca migawkę końcową z powodem zatrzymania.
+    """
+    gates = RunningStats()
+    cost = RunningStats()
+    failures = 0
+    t0 = time.perf_counter()
+
+    def snapshot(stop_reason: Optional[str] = None) -> Dict[str, Any]:
+        snap: Dict[str, Any] = {
+            "n": n,
+            "algorithm": algo_mod.__name__,
+            "seed": seed,
+            "confidence": confidence,
+            "samples": gates.count,
+            "failures": failures,
+            "elapsed_s": time.perf_counter() - t0,
+            "num_gates": gates.summary(confidence),
+            "cost": cost.summary(confidence),
+        }
+        if stop_reason is not None:
+            snap["stop_reason"] = stop_reason
+        return snap
+
+    def precise() -> bool:
+        return gates.count >= min_samples and all(
+            s.half_width(confidence) <= rel_precision * abs(s.mean) for s in (gates, cost)
+        )
+
+    stop_reason = None
+    for perm in iter_random_permutations(n, seed):
+        cir = algo_mod.algorithm(TruthTable(n, perm))
+        if cir.to_permutation(n) != Permutation(perm).inverse():
+            failures += 1
+        gates.add(len(cir.instructions))
+        cost.add(sum(gate_cost(g.qubits) for g in cir.instructions))
+
+        if precise():
+            stop_reason = "precision"
+        elif max_samples is not None and gates.count >= max_samples:
+            stop_reason = "max_samples"
+        elif time_budget is not None and time.perf_counter() - t0 >= time_budget:
+            stop_reason = "time_budget"
+        if stop_reason is not None:
+            break
+        if on_report and report_every and gates.count % report_every == 0:
+            on_report(snapshot())
+
+    final = snapshot(stop_reason)
+    if on_report:
+        on_report(final)
+    return final
+
+
+def _format_report(snap: Dict[str, Any]) -> str:
+    g, c = snap["num_gates"], snap["cost"]
+    return (
+        f"próbki {snap['samples']:7d} | bramki {g['mean']:9.3f} "
+        f"[{g['mean_ci'][0]:.3f}, {g['mean_ci'][1]:.3f}] | koszt {c['mean']:9.3f} "
+        f"[{c['mean_ci'][0]:.3f}, {c['mean_ci'][1]:.3f}] | {snap['elapsed_s']:.1f} s"
+    )
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Estymacja statystyk obwodów z losowej próby.")
+    p.add_argument("--n", type=int, required=True, help="Liczba kubitów.")
+    p.add_argument("--algorithm", choices=ALGORITHMS, default="numgates", help="Algorytm.")
+    p.add_argument("--seed", type=int, default=0, help="Ziarno losowania.")
+    p.add_argument(
+        "--precision",
+        type=float,
+        default=0.01,
+        help="Docelowa względna połowa szerokości przedziału ufności średniej.",
+    )
+    p.add_argument("--confidence", type=float, default=0.95, help="Poziom ufności.")
+    p.add_argument("--time-budget", type=float, default=None, help="Limit czasu [s].")
+    p.add_argument("--max-samples", type=int, default=None, help="Limit liczby próbek.")
+    p.add_argument("--min-samples", type=int, default=30, help="Minimalna liczba próbek.")
+    p.add_argument("--report-every", type=int, default=100, help="Co ile próbek raportować.")
+    p.add_argument("--output", default=None, help="JSONL z kolejnymi migawkami estymatorów.")
+    p.add_argument("--stats", default=None, help="JSON z migawką końcową.")
+    return p.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    out = open(args.output, "w", encoding="utf-8") if args.output else None
+
+    def report(snap: Dict[str, Any]) -> None:
+        print(_format_report(snap))
+        if out is not None:
+            out.write(json.dumps(snap, separators=(",", ":")) + "\n")
+            out.flush()
+
+    try:
+        final = run_sampling(
+            args.n,
+            ALGORITHMS[args.algorithm],
+            seed=args.seed,
+            rel_precision=args.precision,
+            confidence=args.confidence,
+            time_budget=args.time_budget,
+            max_samples=args.max_samples,
+            min_samples=args.min_samples,
+            report_every=args.report_every,
+            on_report=report,
+        )
+    finally:
+        if out is not None:
+            out.close()
+    print(f"Koniec: {final['stop_reason']}")
+    if args.stats:
+        with open(args.stats, "w", encoding="utf-8") as f:
+            json.dump(final, f, ensure_ascii=False, indent=2)
+    return final
+
+
+if __name__ == "__main__":
+    main()
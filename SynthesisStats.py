@@ -0,0 +1,40 @@
+from dataclasses import dataclass, fields
+from typing import Dict, Union
+
+
+@dataclass(slots=True)
+class SynthesisStats:
+    """
+    Counters filled in by algorithm(f, stats=...) when a stats object is passed.
+    With stats=None the algorithms skip all bookkeeping (and the timers).
+
+    - runs:               algorithm() calls
+    - subsets_enumerated: control subsets considered as gate candidates
+    - subsets_unsafe:     candidates rejected by the safety oracle (would break rows < i)
+    - dry_runs:           candidates simulated on the table (NumOfGatesOptimized)
+    - table_copies:       TruthTable objects built by the algorithm itself
+    - gates_applied:      gates applied to the table (= gates in the returned circuit)
+    - step1_s / step2_s:  time spent zeroing row 0 / fixing rows 1..2^n-1
+    """
+
+    runs: int = 0
+    subsets_enumerated: int = 0
+    subsets_unsafe: int = 0
+    dry_runs: int = 0
+    table_copies: int = 0
+    gates_applied: int = 0
+    step1_s: float = 0.0
+    step2_s: float = 0.0
+
+    def merge(self, other: Union["SynthesisStats", Dict[str, float]]) -> "SynthesisStats":
+        """Adds another stats object (or its as_dict() form) to this one."""
+        values = other if isinstance(other, dict) else other.as_dict()
+        for name in FIELDS:
+            setattr(self, name, getattr(self, name) + values.get(name, 0))
+        return self
+
+    def as_dict(self) -> Dict[str, float]:
+        return {name: getattr(self, name) for name in FIELDS}
+
+
+FIELDS = tuple(field.name for field in fields(SynthesisStats))
@@ -109,6 +109,29 @@ class TestTruthTable:
         with pytest.raises(ValueError):
             tt._check_perm([4, 2, 1, 0])
 
+    def test_rows_are_permutation(self):
+        tt = TruthTable(3, [7, 6, 5, 4, 3, 2, 1, 0])
+        assert tt.rows.tolist() == [7, 6, 5, 4, 3, 2, 1, 0]
+        assert tt.get_row(1) == 6
+        assert tt.get_single_vector(1) == [1, 1, 0]
+
+    def test_set_vectors_packs_rows(self):
+        tt = TruthTable(2).set_vectors([[1, 0], [0, 0], [1, 1], [0, 1]])
+        assert tt.get_vectors_as_ints() == [2, 0, 3, 1]
+
+    def test_set_rows(self):
+        tt = TruthTable(2).set_rows([1, 0, 3, 2])
+        assert tt.get_vectors() == [[0, 1], [0, 0], [1, 1], [1, 0]]
+        with pytest.raises(ValueError):
+            tt.set_rows([0, 0, 1, 2])
+
+    def test_copy_is_independent(self):
+        tt = TruthTable(2, [3, 2, 1, 0])
+        cp = tt.__copy__()
+        LogicGate(0).apply_gate_to_truth_table(cp)
+        assert tt.get_vectors_as_ints() == [3, 2, 1, 0]
+        assert cp.get_vectors_as_ints() == [1, 0, 3, 2]
+
     def test_all_permutations(self):
         perms = TruthTable.all_permutations(1)
         assert len(perms) == 2  # 2! = 2
@@ -121,6 +144,40 @@ class TestTruthTable:
         assert file_path.exists()
 
 
+class TestNumpyBackend:
+    def test_gate_application_matches_array_backend(self):
+        pytest.importorskip("numpy")
+        perm = [5, 3, 0, 7, 1, 6, 2, 4]
+        tt_array = TruthTable(3, perm)
+        tt_numpy = TruthTable(3, perm, backend="numpy")
+        for gate in (LogicGate(0), LogicGate(1, 0), LogicGate(2, 0, 1)):
+            gate.apply_gate_to_truth_table(tt_array)
+            gate.apply_gate_to_truth_table(tt_numpy)
+        assert tt_numpy.get_vectors() == tt_array.get_vectors()
+
+    def test_copy_keeps_backend(self):
+        pytest.importorskip("numpy")
+        tt = TruthTable(2, [3, 2, 1, 0], backend="numpy")
+        cp = tt.__copy__()
+        LogicGate(0).apply_gate_to_truth_table(cp)
+        assert cp.backend == "numpy"
+        assert tt.get_vectors_as_ints() == [3, 2, 1, 0]
+
+    def test_algorithm_runs_unchanged(self):
+        pytest.importorskip("numpy")
+        perm = [5, 3, 0, 7, 1, 6, 2, 4]
+        f = TruthTable(3, perm, backend="numpy")
+        circuit = algorithm(f)
+        assert f.is_identity()
+        assert [g.qubits for g in circuit.instructions] == [
+            g.qubits for g in algorithm(TruthTable(3, perm)).instructions
+        ]
+
+    def test_unknown_backend(self):
+        with pytest.raises(ValueError):
+            TruthTable(2, backend="gpu")
+
+
 class TestLogicGate:
     def test_init_single_qubit(self):
         gate = LogicGate(0)
@@ -161,6 +218,69 @@ class TestLogicGate:
         assert tt.get_single_vector(0) == [1]
         assert tt.get_single_vector(1) == [0]
 
+    def test_gates_are_interned(self):
+        assert LogicGate(2, 0, 1) is LogicGate(2, 0, 1)
+        assert LogicGate(2, 0, 1) == LogicGate(2, 0, 1)
+        assert len({LogicGate(0), LogicGate(0), LogicGate(1)}) == 2
+
+    def test_gate_is_immutable(self):
+        gate = LogicGate(1, 0)
+        with pytest.raises(AttributeError):
+            gate.qubits = (0,)
+
+    def test_masks(self):
+        gate = LogicGate(2, 0, 1)  # target=2, controls=0,1
+        assert gate.masks(3) == (0b110, 0b001)
+        assert gate.masks(4) == (0b1100, 0b0010)
+
+    def test_apply_to_row_matches_vector(self):
+        gate = LogicGate(3, 0, 2)
+        for row in range(16):
+            vector = TruthTable._idx_to_bits(row, 4)
+            gate.apply_gate_to_vector(vector)
+            assert gate.apply_to_row(row, 4) == TruthTable._bits_to_idx(vector)
+
+    @pytest.mark.parametrize("backend", ["array", "numpy"])
+    def test_dry_run_matches_applied_gate(self, backend):
+        if backend == "numpy":
+            pytest.importorskip("numpy")
+        tt = TruthTable(3, [5, 3, 0, 7, 1, 6, 2, 4], backend=backend)
+        gate = LogicGate(2, 0)
+        before = tt.get_vectors_as_ints()
+        dist_before = tt.hamming_distance_to_identity()
+
+        flipped, delta = gate.dry_run(tt)
+        assert tt.get_vectors_as_ints() == before  # dry run nie zmienia tablicy
+
+        gate.apply_gate_to_truth_table(tt)
+        after = tt.get_vectors_as_ints()
+        assert flipped == [x for x in range(8) if before[x] != after[x]]
+        assert dist_before + delta == tt.hamming_distance_to_identity()
+
+    def test_safety_oracle_matches_simulation(self):
+        import itertools
+        import random
+
+        rng = random.Random(5)
+        n = 4
+        for i in range(1, 1 << n):
+            tail = list(range(i, 1 << n))
+            rng.shuffle(tail)
+            tt = TruthTable(n, list(range(i)) + tail)  # wiersze 0..i-1 już ustawione
+            for target in range(n):
+                others = [q for q in range(n) if q != target]
+                for r in range(n):
+                    for ctrls in itertools.combinations(others, r):
+                        gate = LogicGate(target, *ctrls)
+                        flipped, _ = gate.dry_run(tt)
+                        assert gate.is_safe_for_row(i, n) == all(x >= i for x in flipped)
+
+    def test_pickle_keeps_interning(self):
+        import pickle
+
+        gate = LogicGate(1, 0)
+        assert pickle.loads(pickle.dumps(gate)) is gate
+
 
 class TestCircuit:
     def test_init(self):
@@ -243,6 +363,101 @@ class TestCircuit:
         assert "TOFFOLI" in captured.out
         assert "MCT" in captured.out
 
+    @staticmethod
+    def _circuit(*gates):
+        circuit = Circuit()
+        for qubits in gates:
+            circuit.add_gate_from_idx(*qubits)
+        return circuit
+
+    def test_optimize_cancels_through_commuting_gates(self):
+        circuit = self._circuit((0,), (1,), (0,)).optimize()
+        assert [g.qubits for g in circuit.instructions] == [(1,)]
+
+    def test_optimize_not_template(self):
+        circuit = self._circuit((0,), (2, 0, 1), (0,)).optimize()
+        assert [g.qubits for g in circuit.instructions] == [(2, 0, 1), (2, 1)]
+
+    def test_optimize_cnot_template(self):
+        circuit = self._circuit((1, 0), (2, 1), (1, 0)).optimize()
+        assert [g.qubits for g in circuit.instructions] == [(2, 1), (2, 0)]
+
+    def test_optimize_moving_rule_template(self):
+        # T(C1, t1) . T(C2, t2) . T(C1, t1) z t1 w C2 -> T2 . T((C1 | C2) - {t1}, t2)
+        circuit = self._circuit((1, 3), (2, 0, 1), (1, 3)).optimize()
+        assert [g.qubits for g in circuit.instructions] == [(2, 0, 1), (2, 0, 3)]
+
+    def test_optimize_resynthesizes_three_line_windows(self):
+        import random
+
+        import OptimalN3
+        from Permutation import Permutation
+
+        rng = random.Random(5)
+        for _ in range(20):
+            gates = [tuple(rng.sample(range(3), rng.randint(1, 3))) for _ in range(10)]
+            circuit = self._circuit(*gates)
+            perm = circuit.to_permutation(3)
+            circuit.optimize()
+            # cały obwód to jedno okno na 3 liniach -> optymalna liczba bramek
+            f = TruthTable(3, Permutation(perm).inverse().tolist())
+            assert len(circuit.instructions) == OptimalN3.optimal_size(f)
+            assert circuit.to_permutation(3) == perm
+
+    def test_optimize_shrinks_algorithm_output(self):
+        import random
+
+        import NumOfGatesOptimized
+
+        rng = random.Random(11)
+        before = after = 0
+        for n in (3, 4):
+            for _ in range(20):
+                perm = list(range(1 << n))
+                rng.shuffle(perm)
+                circuit = NumOfGatesOptimized.algorithm(TruthTable(n, perm))
+                expected = circuit.to_permutation(n)
+                before += len(circuit.instructions)
+                circuit.optimize()
+                after += len(circuit.instructions)
+                assert circuit.to_permutation(n) == expected
+        assert after < before
+
+    def test_to_permutation_matches_truth_table(self):
+        circuit = self._circuit((0,), (1, 0), (2, 0, 1))
+        perm = circuit.to_permutation(3)
+        assert perm.tolist() == circuit.to_truth_table(3).get_vectors_as_ints()
+
+    def test_to_permutation_verifies_synthesis(self):
+        from Permutation import Permutation
+
+        f = TruthTable(3, [3, 0, 7, 1, 2, 6, 5, 4])
+        expected = Permutation(f.rows).inverse()
+        assert algorithm(f).to_permutation(3) == expected
+
+    def test_fingerprint_identifies_equivalent_circuits(self):
+        a = self._circuit((0,), (1,))
+        b = self._circuit((1,), (0,))
+        c = self._circuit((0,), (1, 0))
+        assert a.fingerprint() == b.fingerprint()
+        assert a.fingerprint() != c.fingerprint()
+        assert a.fingerprint(2) != a.fingerprint(3)
+
+    def test_optimize_preserves_function(self):
+        import random
+
+        rng = random.Random(7)
+        for _ in range(200):
+            gates = []
+            for _ in range(rng.randint(0, 12)):
+                qubits = rng.sample(range(4), rng.randint(1, 3))
+                gates.append(tuple(qubits))
+            circuit = self._circuit(*gates)
+            before = circuit.to_truth_table(4).get_vectors_as_ints()
+            circuit.optimize()
+            assert circuit.to_truth_table(4).get_vectors_as_ints() == before
+            assert len(circuit.instructions) <= len(gates)
+
 
 class TestBasicAlgorithm:
     def test_algorithm_identity(self):
@@ -0,0 +1,48 @@
+import itertools
+import random
+
+import pytest
+
+pytest.importorskip("numpy")
+
+import BasicAlgorithm  # noqa: E402
+import BatchAlgorithm  # noqa: E402
+from conftest import random_perm  # noqa: E402
+from TruthTable import TruthTable  # noqa: E402
+
+
+def _qubits(cir):
+    return [g.qubits for g in cir.instructions]
+
+
+@pytest.mark.parametrize("n", [1, 2, 3, 4])
+def test_batch_matches_basic_algorithm(n):
+    rng = random.Random(n)
+    perms = [random_perm(n, rng) for _ in range(50)]
+
+    tables = [TruthTable(n, p) for p in perms]
+    circuits = BatchAlgorithm.algorithm(tables)
+
+    assert len(circuits) == len(perms)
+    for perm, tt, cir in zip(perms, tables, circuits):
+        assert tt.is_identity()
+        assert _qubits(cir) == _qubits(BasicAlgorithm.algorithm(TruthTable(n, perm)))
+
+
+def test_batch_all_n2_permutations_restore_ideal():
+    perms = [list(p) for p in itertools.permutations(range(4))]
+    circuits, R = BatchAlgorithm.synthesize(perms, 2)
+    assert (R == list(range(4))).all()
+    for perm, cir in zip(perms, circuits):
+        tt = TruthTable(2, perm)
+        cir.apply_circuit(tt)
+        assert tt.is_identity()
+
+
+def test_batch_rejects_mixed_n():
+    with pytest.raises(ValueError):
+        BatchAlgorithm.algorithm([TruthTable(2), TruthTable(3)])
+
+
+def test_batch_empty():
+    assert BatchAlgorithm.algorithm([]) == []
@@ -0,0 +1,100 @@
+import random
+
+import pytest
+
+import AESTest
+import BeamSearch
+import NumOfGatesOptimized
+from conftest import circuit_cost, random_perm
+from Permutation import Permutation
+from SynthesisStats import SynthesisStats
+from Trace import ListTracer
+from TruthTable import TruthTable
+
+
+@pytest.mark.parametrize("n", [1, 2, 3, 4, 5])
+@pytest.mark.parametrize("width", [2, 4])
+@pytest.mark.parametrize("objective", BeamSearch.OBJECTIVES)
+def test_beam_circuit_restores_identity(n, width, objective):
+    rng = random.Random(n)
+    for _ in range(10):
+        perm = random_perm(n, rng)
+        f = TruthTable(n, perm)
+        cir = BeamSearch.algorithm(f, width=width, objective=objective)
+        assert f.is_identity()
+        assert cir.to_permutation(n) == Permutation(perm).inverse()
+
+
+@pytest.mark.parametrize("n", [2, 3, 4, 5, 6])
+def test_width_one_is_greedy(n):
+    rng = random.Random(10 + n)
+    for _ in range(10 if n < 6 else 3):
+        perm = random_perm(n, rng)
+        greedy = NumOfGatesOptimized.algorithm(TruthTable(n, perm))
+        beam = BeamSearch.algorithm(TruthTable(n, perm), width=1)
+        assert [g.qubits for g in beam.instructions] == [g.qubits for g in greedy.instructions]
+
+
+def test_wider_beam_cheaper_on_aes_sbox():
+    greedy = NumOfGatesOptimized.algorithm(TruthTable(8, AESTest.sbox))
+    beam = BeamSearch.algorithm(TruthTable(8, AESTest.sbox), width=2)
+    assert beam.to_permutation(8) == Permutation(AESTest.sbox).inverse()
+    assert circuit_cost(beam) < circuit_cost(greedy)
+
+
+def test_process_pool_gives_same_circuit():
+    perm = random_perm(4, random.Random(4))
+    serial = BeamSearch.algorithm(TruthTable(4, perm), width=3)
+    pooled = BeamSearch.algorithm(TruthTable(4, perm), width=3, workers=2)
+    assert [g.qubits for g in pooled.instructions] == [g.qubits for g in serial.instructions]
+
+
+def test_stats_and_tracer():
+    stats = SynthesisStats()
+    tracer = ListTracer()
+    cir = BeamSearch.algorithm(TruthTable(3, [3, 0, 7, 1, 2, 6, 5, 4]), stats=stats, tracer=tracer)
+    assert stats.runs == 1
+    assert stats.gates_applied == len(cir.instructions)
+    assert stats.subsets_enumerated >= stats.subsets_unsafe
+    assert any(name == "beam" for name, _ in tracer.events)
+    gates = [fields["qubits"] for name, fields in tracer.events if name == "circuit_gate"]
+    assert gates == [g.qubits for g in cir.instructions]
+
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        BeamSearch.algorithm(TruthTable(2), objective="depth")
+    with pytest.raises(ValueError):
+        BeamSearch.algorithm(TruthTable(2), width=0)
+
+
+def test_beam_states_are_distinct():
+    rng = random.Random(7)
+    for _ in range(10):
+        f = TruthTable(4, random_perm(4, rng))
+        state = BeamSearch._State(f, (), 0, f.hamming_distance_to_identity())
+        for i in range(1, 16):
+            frontier, _ = BeamSearch._expand_row(state, i, 8, "cost")
+            assert len({s.f.rows.tobytes() for s in frontier}) == len(frontier)
+
+    # z kopii tej samej tablicy zostaje najtańsza
+    f = TruthTable(3, [1, 0, 2, 3, 4, 5, 6, 7])
+    copies = [BeamSearch._State(f, (), cost, 2) for cost in (3, 1, 2)]
+    assert [s.cost for s in BeamSearch._best_distinct(copies, 3, "cost")] == [1]
+
+
+def test_executor_from_caller():
+    from concurrent.futures import ProcessPoolExecutor
+
+    perm = random_perm(4, random.Random(4))
+    serial = BeamSearch.algorithm(TruthTable(4, perm), width=3)
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        for _ in range(2):
+            pooled = BeamSearch.algorithm(TruthTable(4, perm), width=3, executor=pool)
+            assert [g.qubits for g in pooled.instructions] == [
+                g.qubits for g in serial.instructions
+            ]
+        # wewnątrz procesu roboczego własna pula jest zabroniona
+        nested = pool.submit(BeamSearch.algorithm, TruthTable(4, perm), width=3, workers=2)
+        with pytest.raises(ValueError):
+            nested.result()
@@ -0,0 +1,32 @@
+import json
+
+import Benchmark
+
+
+def test_workloads_are_reproducible():
+    a = Benchmark.build_workloads(seed=1, counts={3: 5, 4: 2}, jsonl_path="")
+    b = Benchmark.build_workloads(seed=1, counts={3: 5, 4: 2}, jsonl_path="")
+    assert a == b
+    assert set(a) == {"random_n3", "random_n4", "aes_sbox", "aes_isbox"}
+    other = Benchmark.build_workloads(seed=2, counts={3: 5}, jsonl_path="")
+    assert other["random_n3"] != a["random_n3"]
+
+
+def test_benchmark_writes_results_and_compares(tmp_path):
+    out = tmp_path / "bench.json"
+    args = ["--output", str(out), "--max-n", "3", "--jsonl", "", "--repeat", "1"]
+    args += ["--algorithms", "basic,numgates"]
+    assert Benchmark.main(args) == 0
+
+    with open(out, encoding="utf-8") as f:
+        result = json.load(f)
+    entry = result["results"]["random_n3/numgates"]
+    assert entry["ok"] and entry["count"] == Benchmark.RANDOM_COUNTS[3]
+    assert entry["peak_memory_kib"] > 0
+    assert result["results"]["aes_sbox/basic"]["num_gates_total"] == 995
+
+    worse = json.loads(json.dumps(result))
+    worse["results"]["aes_sbox/basic"]["num_gates_total"] -= 1
+    report, regressions = Benchmark.compare(result, worse, tolerance=float("inf"))
+    assert len(report) == len(result["results"])
+    assert [r.split(":")[0] for r in regressions] == ["aes_sbox/basic"]
@@ -0,0 +1,84 @@
+import random
+
+import pytest
+
+import BidirectionalAlgorithm
+import ComparingAlgorithm
+from conftest import circuit_cost, random_perm
+from LogicGate import LogicGate
+from TruthTable import TruthTable
+
+
+@pytest.mark.parametrize("n", [1, 2, 3, 4])
+@pytest.mark.parametrize("objective", ["cost", "gates"])
+def test_bidirectional_circuit_restores_identity(n, objective):
+    rng = random.Random(n)
+    for _ in range(30):
+        perm = random_perm(n, rng)
+        f = TruthTable(n, perm)
+        cir = BidirectionalAlgorithm.algorithm(f, objective=objective)
+        assert f.is_identity()
+
+        reproduced = TruthTable(n, perm)
+        cir.apply_circuit(reproduced)
+        assert reproduced.is_identity()
+
+
+def test_bidirectional_not_worse_on_average_n3():
+    rng = random.Random(3)
+    bidir = comparing = 0
+    for _ in range(50):
+        perm = random_perm(3, rng)
+        bidir += circuit_cost(BidirectionalAlgorithm.algorithm(TruthTable(3, perm)))
+        comparing += circuit_cost(ComparingAlgorithm.algorithm(TruthTable(3, perm)))
+    assert bidir <= comparing
+
+
+def test_unknown_objective():
+    with pytest.raises(ValueError):
+        BidirectionalAlgorithm.algorithm(TruthTable(2), objective="depth")
+
+
+def test_plan_row_matches_comparing_step():
+    rng = random.Random(7)
+    n = 4
+    for i in range(1, 1 << n):
+        tail = list(range(i, 1 << n))
+        rng.shuffle(tail)
+        f = TruthTable(n, list(range(i)) + tail)
+        gates = ComparingAlgorithm.plan_row(f.get_row(i), i, n)
+        for gate in gates:
+            gate.apply_gate_to_truth_table(f)
+        assert f.get_vectors_as_ints()[: i + 1] == list(range(i + 1))
+
+
+@pytest.mark.parametrize("backend", ["array", "numpy"])
+def test_inverse_is_maintained(backend):
+    if backend == "numpy":
+        pytest.importorskip("numpy")
+    rng = random.Random(1)
+    tt = TruthTable(3, random_perm(3, rng), backend=backend).enable_inverse()
+    for gate in (LogicGate(0), LogicGate(2, 1), LogicGate(1, 0, 2)):
+        tt.apply_masks(*gate.masks(3))
+        tt.apply_masks_to_inputs(*gate.masks(3))
+        rows = tt.get_vectors_as_ints()
+        assert all(tt.inverse_row(rows[x]) == x for x in range(8))
+
+
+def test_input_side_gate_permutes_rows():
+    tt = TruthTable(2, [2, 0, 3, 1])
+    tt.apply_masks_to_inputs(*LogicGate(1, 0).masks(2))  # CNOT na wejściach: 2 <-> 3
+    assert tt.get_vectors_as_ints() == [2, 0, 1, 3]
+
+
+def test_inverse_disabled_after_synthesis():
+    f = TruthTable(3, [3, 0, 7, 1, 2, 6, 5, 4])
+    BidirectionalAlgorithm.algorithm(f)
+    assert f.inverse is None
+
+    # odwrotność włączona przez wywołującego zostaje i nadal się zgadza
+    f = TruthTable(3, [3, 0, 7, 1, 2, 6, 5, 4])
+    f.enable_inverse()
+    BidirectionalAlgorithm.algorithm(f)
+    LogicGate(0, 1).apply_gate_to_truth_table(f)
+    assert [f.inverse_row(f.get_row(x)) for x in range(8)] == list(range(8))
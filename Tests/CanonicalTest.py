@@ -0,0 +1,74 @@
+import itertools
+import random
+
+import pytest
+
+import Canonical
+import NumOfGatesOptimized
+from conftest import random_perm
+from TruthTable import TruthTable
+
+
+@pytest.mark.parametrize("n", [2, 3, 4])
+def test_map_circuit_synthesizes_original(n):
+    rng = random.Random(n)
+    perm = random_perm(n, rng)
+    for inverse, sigma in itertools.product((False, True), itertools.permutations(range(n))):
+        t = Canonical.Transform(inverse, sigma, rng.randrange(1 << n), rng.randrange(1 << n))
+        g = TruthTable(n, Canonical.apply_transform(perm, t, n))
+        cir = Canonical.map_circuit(NumOfGatesOptimized.algorithm(g), t, n)
+        f = TruthTable(n, perm)
+        cir.apply_circuit(f)
+        assert f.is_identity()
+
+
+def test_map_circuit_only_cancels_added_nots():
+    rng = random.Random(5)
+    for _ in range(20):
+        cir = NumOfGatesOptimized.algorithm(TruthTable(3, random_perm(3, rng)))
+        t = Canonical.Transform(rng.random() < 0.5, (2, 0, 1), rng.randrange(8), rng.randrange(8))
+        plain = Canonical.map_circuit(cir, t._replace(a=0, b=0), 3)
+        negated = Canonical.map_circuit(cir, t, 3)
+        # bramki inne niż NOT przechodzą bez zmian, NOT-ów przybywa najwyżej a i b
+        assert [g.qubits for g in negated.instructions if g.get_type() > 1] == [
+            g.qubits for g in plain.instructions if g.get_type() > 1
+        ]
+        added = bin(t.a).count("1") + bin(t.b).count("1")
+        assert len(negated.instructions) <= len(plain.instructions) + added
+
+
+@pytest.mark.parametrize("negate", [False, True])
+def test_class_members_share_representative(negate):
+    rng = random.Random(11)
+    perm = random_perm(3, rng)
+    rep, t = Canonical.canonicalize(TruthTable(3, perm), negate)
+    assert list(rep) == Canonical.apply_transform(perm, t, 3)
+    for inverse, sigma in itertools.product((False, True), itertools.permutations(range(3))):
+        a, b = (rng.randrange(8), rng.randrange(8)) if negate else (0, 0)
+        member = Canonical.apply_transform(perm, Canonical.Transform(inverse, sigma, a, b), 3)
+        assert Canonical.canonicalize(TruthTable(3, member), negate)[0] == rep
+
+
+def test_number_of_classes_n3():
+    reps = {Canonical.canonicalize(TruthTable.from_rank(3, r))[0] for r in range(40320)}
+    assert len(reps) == 3670
+
+
+def test_cache_reuses_representative_circuits():
+    cache = Canonical.CanonicalCache(NumOfGatesOptimized.algorithm)
+    perm = random_perm(3, random.Random(2))
+    for inverse, sigma in itertools.product((False, True), itertools.permutations(range(3))):
+        member = Canonical.apply_transform(perm, Canonical.Transform(inverse, sigma), 3)
+        f = TruthTable(3, member)
+        cache.algorithm(f)
+        assert f.is_identity()
+    assert (cache.misses, len(cache)) == (1, 1)
+
+
+def test_cheapest_member_not_worse_than_direct():
+    f = TruthTable(3, random_perm(3, random.Random(4)))
+    direct = NumOfGatesOptimized.algorithm(f.__copy__())
+    cir, _ = Canonical.cheapest_member(f, NumOfGatesOptimized.algorithm)
+    assert len(cir.instructions) <= len(direct.instructions)
+    cir.apply_circuit(f)
+    assert f.is_identity()
@@ -1,11 +1,20 @@
 # test_algorithm.py
 import random
+from itertools import combinations
 
 import pytest
 
-from Circuit import Circuit
-from ComparingAlgorithm import GATE_COSTS, algorithm
+from ComparingAlgorithm import (
+    COST_MODELS,
+    GATE_COSTS,
+    algorithm,
+    cheapest_safe_gate,
+    ncv_cost,
+    t_count,
+)
+from conftest import circuit_cost
 from LogicGate import LogicGate
+from SynthesisStats import SynthesisStats
 from TruthTable import TruthTable
 
 
@@ -31,10 +40,6 @@ def _random_reversible_tt(n: int, depth: int, rng: random.Random) -> TruthTable:
     return tt
 
 
-def _circuit_cost(cir: Circuit) -> int:
-    return sum(GATE_COSTS.get(g.get_type(), 1) for g in cir.instructions)
-
-
 # === TESTY tylko dla n = 3 ===
 
 
@@ -99,7 +104,7 @@ def test_gate_types_and_costs_coherent_n3():
     f = tt.__copy__()
     cir = algorithm(f, verbose=False)
 
-    cost = _circuit_cost(cir)
+    cost = circuit_cost(cir)
     assert cost >= 0
 
     for g in cir.instructions:
@@ -107,3 +112,51 @@ def test_gate_types_and_costs_coherent_n3():
         assert t >= 1
         assert t == len(g.get_qubits())
         assert GATE_COSTS.get(t, 1) in (1, 5)
+
+
+def _brute_force_cheapest(n, i, target, possible_controls, cost_model):
+    best = None
+    for r in range(len(possible_controls) + 1):
+        for ctrls in combinations(sorted(possible_controls), r):
+            gate = LogicGate(target, *ctrls)
+            if gate.is_safe_for_row(i, n):
+                key = (cost_model(gate.get_type()), r, list(ctrls))
+                if best is None or key < best[0]:
+                    best = (key, gate)
+    return None if best is None else best[1]
+
+
+@pytest.mark.parametrize("model", sorted(COST_MODELS))
+def test_branch_and_bound_matches_exhaustive_search(model):
+    cost_model = COST_MODELS[model]
+    rng = random.Random(7)
+    for _ in range(400):
+        n = rng.randrange(2, 7)
+        target = rng.randrange(n)
+        others = [q for q in range(n) if q != target]
+        controls = rng.sample(others, rng.randrange(len(others) + 1))
+        i = rng.randrange(1, 1 << n)
+        expected = _brute_force_cheapest(n, i, target, controls, cost_model)
+        assert cheapest_safe_gate(n, i, target, controls, cost_model=cost_model) is expected
+
+
+def test_branch_and_bound_prunes_large_control_sets():
+    n = 8
+    stats = SynthesisStats()
+    gate = cheapest_safe_gate(n, 3, 7, list(range(7)), stats)
+    assert gate is LogicGate(7, 0)  # QNOT (maska 0 < 3) odpada, pierwszy CNOT wystarcza
+    assert stats.subsets_enumerated == 2
+
+
+def test_cost_models():
+    assert [ncv_cost(k) for k in range(1, 6)] == [1, 1, 5, 13, 29]
+    assert [t_count(k) for k in range(1, 6)] == [0, 0, 7, 15, 23]
+
+
+@pytest.mark.parametrize("model", sorted(COST_MODELS))
+def test_algorithm_with_cost_model_restores_ideal(model):
+    rng = random.Random(99)
+    f = _random_reversible_tt(4, 20, rng)
+    cir = algorithm(f, cost_model=COST_MODELS[model])
+    assert f.get_vectors() == TruthTable(4).get_vectors()
+    assert len(cir.instructions) > 0
@@ -1,7 +1,13 @@
+import random
+
 import pytest
 
+import AESTest
+from conftest import random_perm
 from LogicGate import LogicGate
-from NumOfGatesOptimized import hamming_distance, algorithm
+from NumOfGatesOptimized import ENUMERATIONS, hamming_distance, algorithm
+from SynthesisStats import SynthesisStats
+from Trace import ListTracer
 from TruthTable import TruthTable
 
 
@@ -116,3 +122,54 @@ def test_algorithm_row0_cleanup_side_effects():
     LogicGate(1).apply_gate_to_truth_table(dirty)
     algorithm(dirty, verbose=False)
     assert dirty.get_vectors() == ideal.get_vectors()
+
+
+# === Kod Graya vs przegląd leksykograficzny ===
+
+
+def _synth(perm, n, enumeration, stats=None):
+    cir = algorithm(TruthTable(n, perm), enumeration=enumeration, stats=stats)
+    return [g.qubits for g in cir.instructions]
+
+
+@pytest.mark.parametrize("n", [3, 4, 5, 6, 7])
+def test_gray_enumeration_matches_lex(n):
+    rng = random.Random(n)
+    for _ in range(20 if n < 6 else 3):
+        perm = random_perm(n, rng)
+        assert _synth(perm, n, "gray") == _synth(perm, n, "lex") == _synth(perm, n, "auto")
+
+
+@pytest.mark.parametrize("box", [AESTest.sbox, AESTest.isbox])
+def test_gray_enumeration_matches_lex_aes(box):
+    assert _synth(box, 8, "gray") == _synth(box, 8, "lex")
+
+
+def test_gray_enumeration_keeps_candidate_counts():
+    perm = [3, 0, 7, 1, 2, 6, 5, 4, 9, 8, 15, 10, 14, 11, 13, 12]
+    counts = []
+    for enumeration in ENUMERATIONS:
+        stats = SynthesisStats()
+        _synth(perm, 4, enumeration, stats)
+        counts.append((stats.subsets_enumerated, stats.subsets_unsafe, stats.dry_runs))
+    assert counts[0] == counts[1]
+
+
+def test_unknown_enumeration():
+    with pytest.raises(ValueError):
+        algorithm(TruthTable(2), enumeration="random")
+
+
+def test_traced_hamming_distance_after_each_gate():
+    perm = [3, 0, 7, 1, 2, 6, 5, 4]
+    tracer = ListTracer()
+    cir = algorithm(TruthTable(3, perm), tracer=tracer)
+    traced = [fields["hamming_distance"] for name, fields in tracer.events if name == "gate"]
+
+    f, ideal = TruthTable(3, perm), TruthTable(3)
+    expected = []
+    for gate in cir.instructions:
+        gate.apply_gate_to_truth_table(f)
+        expected.append(hamming_distance(f.get_vectors(), ideal.get_vectors()))
+    # pierwsze bramki to NOT-y kroku 1 (bez zdarzenia "gate")
+    assert traced and traced == expected[len(expected) - len(traced) :]
@@ -0,0 +1,238 @@
+import gzip
+import itertools
+import json
+
+import pytest
+
+from main import main, parse_args, run_all
+from TruthTable import TruthTable
+
+
+@pytest.fixture
+def perms_jsonl(tmp_path):
+    path = tmp_path / "perms.jsonl"
+    tt = TruthTable(2)
+    with open(path, "w", encoding="utf-8") as f:
+        for perm in itertools.permutations(range(4)):
+            f.write(json.dumps(tt.perm_to_bitlist(perm)) + "\n")
+    return path
+
+
+def _run(tmp_path, input_path, name, **kwargs):
+    out = tmp_path / f"{name}.jsonl"
+    stats = tmp_path / f"{name}.json"
+    run_all(str(input_path), str(out), str(stats), progress_every=0, **kwargs)
+    with open(out, encoding="utf-8") as f:
+        records = [json.loads(line) for line in f]
+    with open(stats, encoding="utf-8") as f:
+        return records, json.load(f)
+
+
+def test_run_all_writes_record_per_permutation(tmp_path, perms_jsonl):
+    records, stats = _run(tmp_path, perms_jsonl, "single")
+    assert [r["perm_idx"] for r in records] == list(range(1, 25))
+    assert all(r["ok"] for r in records)
+    assert stats["total_perms"] == 24
+    assert stats["failures"] == 0
+    assert sum(stats["hist_num_gates"].values()) == 24
+
+
+def test_run_all_workers_match_single_process(tmp_path, perms_jsonl):
+    single = _run(tmp_path, perms_jsonl, "single")
+    parallel = _run(tmp_path, perms_jsonl, "parallel", workers=2, chunk_size=5)
+    assert parallel == single
+
+
+def test_run_all_accepts_binary_input(tmp_path, perms_jsonl):
+    from PermutationFile import convert_jsonl
+
+    bin_path = tmp_path / "perms.bin"
+    convert_jsonl(str(perms_jsonl), str(bin_path))
+    assert _run(tmp_path, bin_path, "bin", workers=2, chunk_size=7) == _run(
+        tmp_path, perms_jsonl, "jsonl"
+    )
+
+
+def test_run_all_generates_ranks_without_input(tmp_path, perms_jsonl):
+    records, stats = _run(tmp_path, "unused", "ranks", n=2, start=3, stop=10, workers=2)
+    from_file, _ = _run(tmp_path, perms_jsonl, "file")
+
+    assert stats["total_perms"] == 7
+    assert [r["perm_rank"] for r in records] == list(range(3, 10))
+    for rec, ref in zip(records, from_file[3:10]):
+        assert "perm_bits" not in rec
+        assert rec["perm_idx"] == ref["perm_idx"]
+        assert rec["instructions"] == ref["instructions"]
+
+
+def test_run_all_canonical_circuits_are_valid(tmp_path, perms_jsonl):
+    records, stats = _run(tmp_path, perms_jsonl, "canonical", canonical=True, workers=2)
+    assert [r["perm_idx"] for r in records] == list(range(1, 25))
+    assert all(r["ok"] for r in records)
+    assert stats["failures"] == 0
+
+
+def test_run_all_cache_reproduces_results(tmp_path, perms_jsonl):
+    cache = str(tmp_path / "cache.sqlite")
+    fresh = _run(tmp_path, perms_jsonl, "fresh")
+    first = _run(tmp_path, perms_jsonl, "first", cache_path=cache, workers=2, chunk_size=5)
+    second = _run(tmp_path, perms_jsonl, "second", cache_path=cache)
+    assert first == fresh
+    assert second == fresh
+
+
+def test_run_all_instrument_aggregates_counters(tmp_path, perms_jsonl):
+    records, stats = _run(tmp_path, perms_jsonl, "instrument", instrument=True, workers=2)
+    synthesis = stats["synthesis"]
+    assert synthesis["runs"] == 24
+    assert synthesis["gates_applied"] == sum(r["num_gates"] for r in records)
+    assert "synthesis" not in _run(tmp_path, perms_jsonl, "plain")[1]
+
+
+def test_run_all_binary_output_matches_jsonl(tmp_path, perms_jsonl):
+    from ResultsFile import ResultsFileReader
+
+    records, stats = _run(tmp_path, perms_jsonl, "jsonl")
+    out = tmp_path / "results.bin"
+    stats_path = tmp_path / "bin.json"
+    run_all(
+        str(perms_jsonl),
+        str(out),
+        str(stats_path),
+        progress_every=0,
+        workers=2,
+        chunk_size=5,
+        output_format="bin",
+    )
+    with open(stats_path, encoding="utf-8") as f:
+        assert json.load(f) == stats
+    with ResultsFileReader(str(out)) as reader:
+        binary = list(reader)
+    assert [r.perm_idx for r in binary] == [r["perm_idx"] for r in records]
+    for rec, ref in zip(binary, records):
+        assert (rec.ok, rec.num_gates, rec.circuit_cost) == (
+            ref["ok"], ref["num_gates"], ref["circuit_cost"]
+        )
+        assert rec.gates() == [tuple(i["qubits"]) for i in ref["instructions"]]
+
+
+def test_run_all_binary_output_mixed_n(tmp_path):
+    from ResultsFile import ResultsFileReader
+
+    path = tmp_path / "mixed.jsonl"
+    perms = [list(p) for p in itertools.islice(itertools.permutations(range(8)), 20)]
+    perms[10:10] = [[1, 0, 3, 2]]
+    with open(path, "w", encoding="utf-8") as f:
+        for perm in perms:
+            n = (len(perm) - 1).bit_length()
+            f.write(json.dumps(TruthTable(n).perm_to_bitlist(perm)) + "\n")
+
+    records, _ = _run(tmp_path, path, "jsonl")
+    out = tmp_path / "mixed.bin"
+    run_all(str(path), str(out), str(tmp_path / "bin.json"), progress_every=0, output_format="bin")
+    with ResultsFileReader(str(out)) as reader:
+        binary = list(reader)
+        assert [chunk.n for chunk in reader.iter_chunks()] == [3, 2, 3]
+    assert [r.perm_idx for r in binary] == [r["perm_idx"] for r in records]
+    assert [r.gates() for r in binary] == [
+        [tuple(i["qubits"]) for i in ref["instructions"]] for ref in records
+    ]
+
+
+def test_run_all_pipeline_matches_synchronous(tmp_path, perms_jsonl):
+    gz = tmp_path / "perms.jsonl.gz"
+    with open(perms_jsonl, "rb") as src, gzip.open(gz, "wb") as dst:
+        dst.write(src.read())
+    assert _run(tmp_path, gz, "piped", chunk_size=5, pipeline_depth=1) == _run(
+        tmp_path, perms_jsonl, "sync", pipeline_depth=0
+    )
+
+
+def test_run_all_pipeline_propagates_reader_errors(tmp_path, perms_jsonl):
+    bad = tmp_path / "bad_input.jsonl"
+    bad.write_text(perms_jsonl.read_text() + "{not json\n", encoding="utf-8")
+    with pytest.raises(json.JSONDecodeError):
+        _run(tmp_path, bad, "bad", chunk_size=5, pipeline_depth=1)
+
+
+def test_run_all_multiple_algorithms_in_one_pass(tmp_path, perms_jsonl):
+    names = ["basic", "comparing", "numgates"]
+    records, stats = _run(tmp_path, perms_jsonl, "multi", algorithms=names, workers=2)
+    assert stats["total_perms"] == 24
+    assert set(stats["algorithms"]) == set(names)
+
+    for name in names:
+        single, single_stats = _run(tmp_path, perms_jsonl, name, algorithms=[name])
+        per_algo = dict(stats["algorithms"][name])
+        assert per_algo.pop("best_cost_wins") >= 0
+        assert per_algo == {k: v for k, v in single_stats.items() if k != "total_perms"}
+        for rec, ref in zip(records, single):
+            result = rec["results"][name]
+            assert result["instructions"] == ref["instructions"]
+            assert result["circuit_cost"] >= rec["best"]["circuit_cost"]["value"]
+            assert result["num_gates"] >= rec["best"]["num_gates"]["value"]
+
+    assert stats["best"]["avg_cost"] <= min(s["avg_cost"] for s in stats["algorithms"].values())
+    assert sum(stats["best"]["hist_cost"].values()) == 24
+
+
+def test_run_all_rejects_unknown_algorithm(tmp_path, perms_jsonl):
+    with pytest.raises(ValueError):
+        _run(tmp_path, perms_jsonl, "unknown", algorithms=["nope"])
+
+
+def test_run_all_batch_matches_basic(tmp_path, perms_jsonl):
+    pytest.importorskip("numpy")
+    records, stats = _run(tmp_path, perms_jsonl, "batch", batch_size=5, algorithms=["basic"])
+    assert (records, stats) == _run(tmp_path, perms_jsonl, "basic", algorithms=["basic"])
+
+
+@pytest.mark.parametrize("names", [["comparing"], ["numgates"], ["basic", "comparing"]])
+def test_run_all_batch_rejects_other_algorithms(tmp_path, perms_jsonl, names):
+    with pytest.raises(ValueError):
+        _run(tmp_path, perms_jsonl, "batch", batch_size=5, algorithms=names)
+
+
+def test_run_all_passes_beam_options(tmp_path, perms_jsonl):
+    greedy, _ = _run(tmp_path, perms_jsonl, "numgates", algorithms=["numgates"])
+    narrow_options = {"beam": {"width": 1}}
+    narrow, _ = _run(
+        tmp_path, perms_jsonl, "narrow", algorithms=["beam"], algorithm_options=narrow_options
+    )
+    assert [r["instructions"] for r in narrow] == [r["instructions"] for r in greedy]
+
+    serial = _run(tmp_path, perms_jsonl, "serial", algorithms=["beam"])
+    options = {"beam": {"width": 4, "workers": 2}}
+    pooled = _run(tmp_path, perms_jsonl, "pooled", algorithms=["beam"], algorithm_options=options)
+    assert pooled == serial
+    with pytest.raises(ValueError):
+        _run(
+            tmp_path,
+            perms_jsonl,
+            "nested",
+            algorithms=["beam"],
+            algorithm_options=options,
+            workers=2,
+        )
+
+
+def test_parse_args_beam_options():
+    args = parse_args(["--beam-width", "8", "--beam-objective", "hamming", "--beam-workers", "2"])
+    assert (args.beam_width, args.beam_objective, args.beam_workers) == (8, "hamming", 2)
+    with pytest.raises(SystemExit):
+        parse_args(["--beam-objective", "depth"])
+
+
+def test_beam_options_ignored_when_beam_not_selected(tmp_path, perms_jsonl):
+    options = {"beam": {"workers": 2}}
+    records, _ = _run(tmp_path, perms_jsonl, "other", algorithm_options=options, workers=2)
+    assert len(records) == 24
+
+
+def test_main_rejects_nested_beam_workers(tmp_path, perms_jsonl):
+    argv = ["--input", str(perms_jsonl), "--output", str(tmp_path / "o.jsonl")]
+    argv += ["--stats", str(tmp_path / "s.json"), "--algorithms", "beam"]
+    with pytest.raises(SystemExit):
+        main(argv + ["--workers", "2", "--beam-workers", "2"])
+    main(argv + ["--beam-workers", "2"])
+    assert (tmp_path / "s.json").exists()
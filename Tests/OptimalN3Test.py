@@ -0,0 +1,44 @@
+import random
+from collections import Counter
+
+import pytest
+
+import NumOfGatesOptimized
+import OptimalN3
+from TruthTable import TruthTable
+
+
+def test_gate_count_distribution_matches_known_nct_result():
+    # liczba permutacji 3 kubitów wymagających k bramek NOT/CNOT/Toffoli (Shende i in.)
+    hist = Counter(OptimalN3.optimal_size(TruthTable.from_rank(3, r)) for r in range(40320))
+    assert [hist[k] for k in range(9)] == [1, 12, 102, 625, 2780, 8921, 17049, 10253, 577]
+
+
+@pytest.mark.parametrize("objective", OptimalN3.OBJECTIVES)
+def test_lookup_synthesizes_identity(objective):
+    rng = random.Random(3)
+    for r in rng.sample(range(40320), 200):
+        f = TruthTable.from_rank(3, r)
+        before = f.get_vectors_as_ints()
+        cir = OptimalN3.lookup(f, objective)
+        assert f.get_vectors_as_ints() == before
+        cir.apply_circuit(f)
+        assert f.is_identity()
+
+
+def test_table_file_matches_search(tmp_path):
+    path = tmp_path / "gates.bin"
+    OptimalN3.save(OptimalN3.build("gates"), str(path))
+    assert OptimalN3.load(str(path)) == OptimalN3.get_table("gates")
+
+
+def test_optimum_never_worse_than_heuristic():
+    rng = random.Random(5)
+    for r in rng.sample(range(40320), 200):
+        cir = NumOfGatesOptimized.algorithm(TruthTable.from_rank(3, r))
+        assert OptimalN3.optimal_size(TruthTable.from_rank(3, r)) <= len(cir.instructions)
+
+
+def test_algorithm_rejects_other_sizes():
+    with pytest.raises(ValueError):
+        OptimalN3.algorithm(TruthTable(2, [1, 0, 2, 3]))
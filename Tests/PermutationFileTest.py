@@ -0,0 +1,93 @@
+import itertools
+import json
+from array import array
+
+import pytest
+
+from PermutationFile import (
+    PermutationFileReader,
+    convert_jsonl,
+    is_perm_bin,
+    write_perms_bin,
+)
+from TruthTable import BACKENDS, TruthTable
+
+
+def test_roundtrip_and_random_access(tmp_path):
+    path = str(tmp_path / "perms.bin")
+    perms = [list(p) for p in itertools.permutations(range(4))]
+    assert write_perms_bin(path, 2, perms) == 24
+    assert is_perm_bin(path)
+
+    with PermutationFileReader(path) as reader:
+        assert reader.n == 2
+        assert len(reader) == 24
+        assert [p.tolist() for p in reader] == perms
+        assert reader[5].tolist() == perms[5]
+        assert reader[-1].tolist() == perms[-1]
+        assert [p.tolist() for p in reader.iter_range(10, 13)] == perms[10:13]
+        with pytest.raises(IndexError):
+            reader[24]
+
+
+def test_wide_records(tmp_path):
+    path = str(tmp_path / "wide.bin")
+    perm = list(reversed(range(1 << 9)))
+    write_perms_bin(path, 9, [perm])
+    with PermutationFileReader(path) as reader:
+        assert reader.width == 2
+        assert reader[0].tolist() == perm
+
+
+def test_dump_all_perms_bin(tmp_path):
+    path = str(tmp_path / "all.bin")
+    assert TruthTable(2).dump_all_perms_bin(path) == path
+    with PermutationFileReader(path) as reader:
+        assert [p.tolist() for p in reader] == [list(p) for p in itertools.permutations(range(4))]
+
+
+def test_convert_jsonl(tmp_path):
+    src = tmp_path / "perms.jsonl"
+    tt = TruthTable(2)
+    with open(src, "w", encoding="utf-8") as f:
+        f.write(json.dumps(tt.perm_to_bitlist([3, 1, 0, 2])) + "\n")
+    dst = str(tmp_path / "perms.bin")
+    assert convert_jsonl(str(src), dst) == 1
+    with PermutationFileReader(dst) as reader:
+        assert reader[0].tolist() == [3, 1, 0, 2]
+
+
+def test_records_build_truth_tables_without_lists(tmp_path):
+    path = str(tmp_path / "perms.bin")
+    perms = [[3, 1, 0, 2], [2, 3, 1, 0]]
+    write_perms_bin(path, 2, perms)
+    with PermutationFileReader(path) as reader:
+        for record, perm in zip(reader, perms):
+            assert isinstance(record, array)
+            for backend in BACKENDS:
+                if backend == "numpy":
+                    pytest.importorskip("numpy")
+                assert TruthTable(2, record, backend=backend).get_vectors_as_ints() == perm
+
+
+def test_bulk_iteration_across_blocks(tmp_path, monkeypatch):
+    import PermutationFile
+
+    path = str(tmp_path / "perms.bin")
+    perms = [list(p) for p in itertools.permutations(range(4))]
+    write_perms_bin(path, 2, perms)
+    monkeypatch.setattr(PermutationFile, "_BULK_BYTES", 20)  # 5 rekordów na blok
+    with PermutationFileReader(path) as reader:
+        assert [p.tolist() for p in reader.iter_range(3, 17)] == perms[3:17]
+        partial = reader.iter_range()
+        next(partial)
+    # zamknięcie w trakcie iteracji nie zostawia otwartych widoków mapowania
+    assert reader._view is None
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "perms.jsonl"
+    path.write_text("[[0],[1]]\n")
+    assert not is_perm_bin(str(path))
+    with pytest.raises(ValueError):
+        PermutationFileReader(str(path))
@@ -0,0 +1,64 @@
+import itertools
+import random
+
+import pytest
+
+import PermutationSource
+from TruthTable import TruthTable
+
+
+def test_rank_matches_itertools_order():
+    for r, perm in enumerate(itertools.permutations(range(5))):
+        assert PermutationSource.rank(perm) == r
+        assert PermutationSource.unrank(r, 5) == list(perm)
+
+
+def test_rank_unrank_roundtrip_large():
+    rng = random.Random(11)
+    perm = list(range(256))
+    rng.shuffle(perm)
+    r = PermutationSource.rank(perm)
+    assert PermutationSource.unrank(r, 256) == perm
+
+
+def test_unrank_out_of_range():
+    with pytest.raises(ValueError):
+        PermutationSource.unrank(24, 4)
+
+
+def test_next_permutation_last():
+    perm = [3, 2, 1, 0]
+    assert not PermutationSource.next_permutation(perm)
+    assert perm == [3, 2, 1, 0]
+
+
+def test_iter_permutations_slice():
+    everything = [list(p) for p in itertools.permutations(range(8))]
+    assert list(PermutationSource.iter_permutations(3, 100, 150)) == everything[100:150]
+    assert len(list(PermutationSource.iter_permutations(2))) == 24
+    assert list(PermutationSource.iter_permutations(2, 30)) == []
+
+
+def test_truth_table_rank_helpers():
+    tt = TruthTable.from_rank(3, 12345)
+    assert tt.rank() == 12345
+    tables = list(TruthTable.iter_permutations(2, 5, 8))
+    assert [t.rank() for t in tables] == [5, 6, 7]
+
+
+def test_truth_table_does_not_import_source_modules():
+    import os
+    import subprocess
+    import sys
+
+    import TruthTable
+
+    code = "import sys, TruthTable; print(sorted(m for m in sys.modules if m.startswith('Perm')))"
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=os.path.dirname(os.path.abspath(TruthTable.__file__)),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert out.stdout.strip() == "[]"
@@ -0,0 +1,41 @@
+import random
+
+import pytest
+
+from Permutation import Permutation
+
+
+def _random(n, seed):
+    values = list(range(1 << n))
+    random.Random(seed).shuffle(values)
+    return Permutation(values)
+
+
+def test_rejects_non_permutations():
+    with pytest.raises(ValueError):
+        Permutation([0, 0, 1, 2])
+    with pytest.raises(ValueError):
+        Permutation([0, 1, 2])
+
+
+def test_compose_and_inverse():
+    p, q = _random(3, 1), _random(3, 2)
+    assert (p @ q)(5) == p(q(5))
+    assert p.then(q) == q @ p
+    assert (p @ p.inverse()).is_identity()
+    assert (p.inverse() @ p) == Permutation.identity(3)
+
+
+def test_equality_and_hash():
+    p = _random(4, 3)
+    same = Permutation(p.tolist())
+    assert p == same and hash(p) == hash(same)
+    assert p.fingerprint() == same.fingerprint()
+    assert len({p, same, Permutation.identity(4)}) == 2
+
+
+def test_apply_to_vector():
+    p = Permutation([1, 2, 3, 0])
+    vector = [1, 1]
+    p.apply_to_vector(vector)
+    assert vector == [0, 0]
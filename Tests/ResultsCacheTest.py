@@ -0,0 +1,81 @@
+import pytest
+
+import BidirectionalAlgorithm
+import ComparingAlgorithm
+import NumOfGatesOptimized
+from ResultsCache import ResultsCache, algorithm_version
+from TruthTable import TruthTable
+
+PERM = [3, 0, 7, 1, 2, 6, 5, 4]
+
+
+def test_cached_circuit_matches_fresh_synthesis(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    fresh = NumOfGatesOptimized.algorithm(TruthTable(3, PERM))
+
+    with ResultsCache(path) as cache:
+        cache.synthesize(TruthTable(3, PERM), NumOfGatesOptimized)
+        assert (cache.hits, cache.misses) == (0, 1)
+
+    with ResultsCache(path) as cache:
+        f = TruthTable(3, PERM)
+        cir = cache.synthesize(f, NumOfGatesOptimized)
+        assert (cache.hits, cache.misses) == (1, 0)
+    assert [g.qubits for g in cir.instructions] == [g.qubits for g in fresh.instructions]
+    assert f.is_identity()
+
+
+def test_key_includes_algorithm_and_variant(tmp_path):
+    import Canonical
+
+    with ResultsCache(str(tmp_path / "cache.sqlite")) as cache:
+        cache.synthesize(TruthTable(3, PERM), NumOfGatesOptimized)
+        cache.synthesize(TruthTable(3, PERM), ComparingAlgorithm)
+        canonical = Canonical.CanonicalCache(NumOfGatesOptimized.algorithm)
+        cache.synthesize(
+            TruthTable(3, PERM), NumOfGatesOptimized, run=canonical.algorithm, variant=Canonical
+        )
+        assert cache.misses == 3
+        assert len(cache) == 3
+
+
+def test_version_tracks_dependencies():
+    # BidirectionalAlgorithm korzysta z plan_row z ComparingAlgorithm
+    from ResultsCache import _repo_dependencies
+
+    names = {m.__name__ for m in _repo_dependencies(BidirectionalAlgorithm)}
+    assert {"BidirectionalAlgorithm", "ComparingAlgorithm", "LogicGate", "TruthTable"} <= names
+    assert algorithm_version(BidirectionalAlgorithm) != algorithm_version(ComparingAlgorithm)
+
+
+def test_key_includes_bound_kwargs(tmp_path):
+    from functools import partial
+
+    import BeamSearch
+    import Canonical
+
+    with ResultsCache(str(tmp_path / "cache.sqlite")) as cache:
+        for width in (1, 2, 1):
+            run = partial(BeamSearch.algorithm, width=width)
+            cir = cache.synthesize(TruthTable(3, PERM), BeamSearch, run=run)
+            fresh = BeamSearch.algorithm(TruthTable(3, PERM), width=width)
+            assert [g.qubits for g in cir.instructions] == [g.qubits for g in fresh.instructions]
+        assert (cache.hits, cache.misses) == (1, 2)
+
+        # stats/tracer nie zmieniają obwodu — ten sam klucz
+        cache.synthesize(TruthTable(3, PERM), BeamSearch, run=partial(run, tracer=None))
+        assert cache.hits == 2
+
+        # argumenty algorytmu opakowanego w CanonicalCache też trafiają do klucza
+        for width in (1, 2):
+            canonical = Canonical.CanonicalCache(partial(BeamSearch.algorithm, width=width))
+            cache.synthesize(
+                TruthTable(3, PERM), BeamSearch, run=canonical.algorithm, variant=Canonical
+            )
+        assert cache.misses == 4
+
+        # argumentów pozycyjnych nie da się stabilnie nazwać w kluczu — odrzucane
+        f = TruthTable(3, PERM)
+        with pytest.raises(ValueError):
+            cache.synthesize(f, BeamSearch, run=partial(BeamSearch.algorithm, TruthTable(3)))
+        assert cache.misses == 4 and f.get_vectors_as_ints() == PERM
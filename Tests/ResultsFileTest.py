@@ -0,0 +1,63 @@
+import pytest
+
+from Circuit import Circuit
+from ResultsFile import ChunkBuilder, ResultsFileReader, ResultsFileWriter, is_results_bin
+
+
+def _write(path, chunks):
+    with ResultsFileWriter(str(path)) as w:
+        for builder in chunks:
+            w.write_chunk(builder.to_bytes())
+
+
+def test_round_trip_rebuilds_circuits(tmp_path):
+    first = ChunkBuilder()
+    first.add(1, 3, True, [(0,), (1, 0), (2, 0, 1)], 7)
+    first.add_error(2)
+    second = ChunkBuilder()
+    second.add(3, 3, False, [(2, 1, 0)], 5)
+    path = tmp_path / "results.bin"
+    _write(path, [first, second])
+
+    assert is_results_bin(str(path))
+    with ResultsFileReader(str(path)) as reader:
+        assert len(reader) == 3
+        records = list(reader)
+        assert list(reader.column("num_gates")) == [3, 0, 1]
+        assert list(reader.column("cost")) == [7, 0, 5]
+
+    assert [r.perm_idx for r in records] == [1, 2, 3]
+    assert [(r.ok, r.error) for r in records] == [(True, False), (False, True), (False, False)]
+    assert records[0].gates() == [(0,), (1, 0), (2, 0, 1)]
+    assert records[2].gates() == [(2, 0, 1)]  # sterowania rosnąco
+    assert records[1].circuit().instructions == []
+
+    expected = Circuit()
+    for qubits in [(0,), (1, 0), (2, 0, 1)]:
+        expected.add_gate_from_idx(*qubits)
+    assert records[0].circuit().to_permutation(3) == expected.to_permutation(3)
+
+
+def test_wide_masks(tmp_path):
+    builder = ChunkBuilder()
+    builder.add(1, 10, True, [(9, 0, 8)], 5)
+    path = tmp_path / "wide.bin"
+    _write(path, [builder])
+    with ResultsFileReader(str(path)) as reader:
+        (record,) = list(reader)
+    assert record.gates() == [(9, 0, 8)]
+
+
+def test_mixed_n_in_chunk_is_rejected():
+    builder = ChunkBuilder()
+    builder.add(1, 3, True, [], 0)
+    with pytest.raises(ValueError):
+        builder.add(2, 4, True, [], 0)
+
+
+def test_reader_rejects_other_files(tmp_path):
+    path = tmp_path / "x.bin"
+    path.write_bytes(b"PRM1" + bytes(12))
+    assert not is_results_bin(str(path))
+    with pytest.raises(ValueError):
+        ResultsFileReader(str(path))
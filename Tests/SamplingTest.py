@@ -0,0 +1,52 @@
+import statistics
+from itertools import islice
+
+import pytest
+
+import NumOfGatesOptimized
+import Sampling
+
+
+def test_running_stats_match_statistics_module():
+    values = [3, 7, 7, 2, 9, 4, 4, 4, 10, 1]
+    s = Sampling.RunningStats()
+    for v in values:
+        s.add(v)
+    assert s.mean == pytest.approx(statistics.mean(values))
+    assert s.variance == pytest.approx(statistics.variance(values))
+    assert s.quantile(0.5) == 4
+    assert (s.quantile(0.0), s.quantile(1.0)) == (1, 10)
+    lo, hi = s.quantile_ci(0.5)
+    assert lo <= 4 <= hi
+    mean_lo, mean_hi = s.mean_ci()
+    assert mean_lo < s.mean < mean_hi
+
+
+def test_random_permutations_are_reproducible():
+    a = list(islice(Sampling.iter_random_permutations(3, seed=5), 4))
+    b = list(islice(Sampling.iter_random_permutations(3, seed=5), 4))
+    assert a == b
+    assert all(sorted(p) == list(range(8)) for p in a)
+    assert a != list(islice(Sampling.iter_random_permutations(3, seed=6), 4))
+
+
+def test_sampling_stops_on_precision_and_limits():
+    reports: list[dict] = []
+    final = Sampling.run_sampling(
+        3,
+        NumOfGatesOptimized,
+        seed=1,
+        rel_precision=0.05,
+        report_every=10,
+        on_report=reports.append,
+    )
+    assert final["stop_reason"] == "precision"
+    assert final["failures"] == 0
+    assert reports[-1] is final
+    g = final["num_gates"]
+    assert g["mean_ci"][1] - g["mean"] <= 0.05 * g["mean"]
+
+    capped = Sampling.run_sampling(3, NumOfGatesOptimized, rel_precision=0, max_samples=25)
+    assert (capped["stop_reason"], capped["samples"]) == ("max_samples", 25)
+    timed = Sampling.run_sampling(3, NumOfGatesOptimized, rel_precision=0, time_budget=0)
+    assert (timed["stop_reason"], timed["samples"]) == ("time_budget", 1)
@@ -0,0 +1,37 @@
+import pytest
+
+import BasicAlgorithm
+import BidirectionalAlgorithm
+import ComparingAlgorithm
+import NumOfGatesOptimized
+from SynthesisStats import SynthesisStats
+from TruthTable import TruthTable
+
+PERM = [3, 0, 7, 1, 2, 6, 5, 4]
+
+
+@pytest.mark.parametrize(
+    "algo", [BasicAlgorithm, ComparingAlgorithm, NumOfGatesOptimized, BidirectionalAlgorithm]
+)
+def test_counters_match_circuit(algo):
+    stats = SynthesisStats()
+    cir = algo.algorithm(TruthTable(3, PERM), stats=stats)
+    assert stats.runs == 1
+    assert stats.gates_applied == len(cir.instructions)
+    assert stats.subsets_enumerated >= stats.subsets_unsafe
+    assert stats.step1_s >= 0 and stats.step2_s > 0
+
+
+def test_stats_do_not_change_circuit():
+    plain = NumOfGatesOptimized.algorithm(TruthTable(3, PERM))
+    stats = SynthesisStats()
+    counted = NumOfGatesOptimized.algorithm(TruthTable(3, PERM), stats=stats)
+    assert [g.qubits for g in counted.instructions] == [g.qubits for g in plain.instructions]
+    assert stats.dry_runs == stats.subsets_enumerated - stats.subsets_unsafe
+
+
+def test_merge_accepts_stats_and_dicts():
+    a = SynthesisStats()
+    a.runs, a.gates_applied = 2, 10
+    b = SynthesisStats().merge(a).merge(a.as_dict())
+    assert (b.runs, b.gates_applied) == (4, 20)
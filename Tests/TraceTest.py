@@ -0,0 +1,56 @@
+import io
+import json
+
+import pytest
+
+import BasicAlgorithm
+import BidirectionalAlgorithm
+import ComparingAlgorithm
+import NumOfGatesOptimized
+from Trace import NULL_TRACER, JsonlTracer, ListTracer, PrintTracer, resolve
+from TruthTable import TruthTable
+
+PERM = [3, 0, 7, 1, 2, 6, 5, 4]
+
+
+@pytest.mark.parametrize(
+    "algo", [BasicAlgorithm, ComparingAlgorithm, NumOfGatesOptimized, BidirectionalAlgorithm]
+)
+def test_events_describe_circuit(algo):
+    tracer = ListTracer()
+    cir = algo.algorithm(TruthTable(3, PERM), tracer=tracer)
+    names = [name for name, _ in tracer.events]
+    assert names[0] == "start"
+    assert names.count("circuit") == 1
+    gates = [fields["qubits"] for name, fields in tracer.events if name == "circuit_gate"]
+    assert gates == [g.qubits for g in cir.instructions]
+
+
+def test_tracer_does_not_change_circuit(capsys):
+    plain = ComparingAlgorithm.algorithm(TruthTable(3, PERM))
+    traced = ComparingAlgorithm.algorithm(TruthTable(3, PERM), tracer=ListTracer())
+    assert [g.qubits for g in traced.instructions] == [g.qubits for g in plain.instructions]
+    assert capsys.readouterr().out == ""
+
+
+def test_jsonl_tracer_writes_one_object_per_event():
+    stream = io.StringIO()
+    NumOfGatesOptimized.algorithm(TruthTable(3, PERM), tracer=JsonlTracer(stream))
+    events = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert events[0]["event"] == "start"
+    assert any(e["event"] == "gate" and "hamming_distance" in e for e in events)
+
+
+def test_print_tracer_formats_templates_and_extra_fields():
+    stream = io.StringIO()
+    tracer = PrintTracer(stream)
+    tracer.event("gate", i=2, target=0, controls=[1], cost=1)
+    tracer.event("custom", a=1)
+    assert stream.getvalue() == "[i=2] apply: target=0, controls=[1], cost=1\ncustom: a=1\n"
+
+
+def test_resolve():
+    tracer = ListTracer()
+    assert resolve(tracer, verbose=True) is tracer
+    assert resolve(None) is NULL_TRACER
+    assert isinstance(resolve(None, verbose=True), PrintTracer)
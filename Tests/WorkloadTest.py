@@ -0,0 +1,34 @@
+from itertools import islice
+
+import pytest
+
+import Benchmark
+import Sampling
+from TruthTable import TruthTable
+from Workload import gate_cost, gate_label, iter_random_permutations, parse_entry
+
+
+def test_random_permutations_shared_by_benchmark_and_sampling():
+    perms = list(islice(iter_random_permutations(3, seed=2), 5))
+    assert Benchmark.random_workload(3, 5, seed=2) == perms
+    assert list(islice(Sampling.iter_random_permutations(3, seed=2), 5)) == perms
+    assert all(sorted(p) == list(range(8)) for p in perms)
+
+
+def test_parse_entry_accepts_bits_and_indices():
+    perm = [3, 0, 7, 1, 2, 6, 5, 4]
+    bits = TruthTable(3).perm_to_bitlist(perm)
+    assert parse_entry(1, bits).get_vectors_as_ints() == perm
+    assert parse_entry(1, perm).get_vectors_as_ints() == perm
+    with pytest.raises(ValueError):
+        parse_entry(1, [])
+
+
+def test_gate_label_and_cost():
+    assert [gate_label(q) for q in [(0,), (0, 1), (0, 1, 2), (0, 1, 2, 3)]] == [
+        "QNOT",
+        "CNOT",
+        "TOFFOLI",
+        "MCT",
+    ]
+    assert [gate_cost(q) for q in [(0,), (0, 1), (0, 1, 2)]] == [1, 1, 5]
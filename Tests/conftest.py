@@ -0,0 +1,15 @@
+from ComparingAlgorithm import GATE_COSTS
+
+# Funkcje pomocnicze wspólne dla testów: from conftest import random_perm, circuit_cost
+
+
+def random_perm(n, rng):
+    """Jednostajnie losowa permutacja 2^n wierszy z generatora rng."""
+    perm = list(range(1 << n))
+    rng.shuffle(perm)
+    return perm
+
+
+def circuit_cost(cir):
+    """Koszt obwodu wg GATE_COSTS (QNOT i CNOT po 1, Toffoli 5)."""
+    return sum(GATE_COSTS.get(g.get_type(), 1) for g in cir.instructions)
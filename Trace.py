@@ -0,0 +1,110 @@
+import json
+import sys
+from string import Formatter
+from typing import IO, Any, Dict, List, Optional, Tuple, Union
+
+# Human-readable templates used by PrintTracer. Fields not referenced by a template are
+# appended as ", key=value"; events without a template print as "name: key=value, ...".
+FORMATS = {
+    "start": "\ncel: {target}\nobecny stan: {state}",
+    "step1": "1. stan: {state}",
+    "row": "\n[i={i}] fv={fv} iv={iv}",
+    "row_ok": "    już zgodny z celem",
+    "row_plan": "   p (0->1): {p}\n   q (1->0): {q}",
+    "gate": "[i={i}] apply: target={target}, controls={controls}",
+    "no_safe_gate": (
+        "[i={i}] Brak bezpiecznej bramki dla target={target} przy possible_controls={controls}"
+    ),
+    "row_done": "   po ustawianiu: {fv}",
+    "row_side": "[i={i}] strona={side}, bramki={gates}",
+    "circuit": "\nKońcowy obwód:",
+    "circuit_gate": "{name}: {qubits}",
+}
+
+
+def _template_fields(template: str) -> Tuple[str, ...]:
+    return tuple(field for _, field, _, _ in Formatter().parse(template) if field)
+
+
+_FIELDS = {name: _template_fields(template) for name, template in FORMATS.items()}
+
+
+class Tracer:
+    """
+    Event sink for the synthesis algorithms. The base class is a no-op; algorithms check
+    `enabled` before building any event payload, so a disabled tracer costs one attribute read.
+    """
+
+    enabled = False
+
+    def event(self, name: str, /, **fields: Any) -> None:
+        pass
+
+
+NULL_TRACER = Tracer()
+
+
+class PrintTracer(Tracer):
+    """Formats events as the step-by-step log previously printed with verbose=True."""
+
+    enabled = True
+
+    def __init__(self, stream: Optional[IO[str]] = None):
+        self.stream = stream
+
+    def event(self, name: str, /, **fields: Any) -> None:
+        template = FORMATS.get(name)
+        if template is None:
+            text = f"{name}: " + ", ".join(f"{k}={v}" for k, v in fields.items())
+        else:
+            text = template.format(**fields)
+            extra = [f"{k}={v}" for k, v in fields.items() if k not in _FIELDS[name]]
+            if extra:
+                text += ", " + ", ".join(extra)
+        print(text, file=self.stream or sys.stdout)
+
+
+class JsonlTracer(Tracer):
+    """Writes one JSON object per event: {"event": name, **fields}."""
+
+    enabled = True
+
+    def __init__(self, target: Union[str, IO[str]]):
+        self._own = isinstance(target, str)
+        self.stream: IO[str]
+        if isinstance(target, str):
+            self.stream = open(target, "w", encoding="utf-8")
+        else:
+            self.stream = target
+
+    def event(self, name: str, /, **fields: Any) -> None:
+        self.stream.write(json.dumps({"event": name, **fields}, separators=(",", ":")) + "\n")
+
+    def close(self) -> None:
+        if self._own:
+            self.stream.close()
+
+    def __enter__(self) -> "JsonlTracer":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class ListTracer(Tracer):
+    """Keeps events in memory as (name, fields) pairs — handy in tests and notebooks."""
+
+    enabled = True
+
+    def __init__(self):
+        self.events: List[Tuple[str, Dict[str, Any]]] = []
+
+    def event(self, name: str, /, **fields: Any) -> None:
+        self.events.append((name, fields))
+
+
+def resolve(tracer: Optional[Tracer], verbose: bool = False) -> Tracer:
+    """The tracer an algorithm should use: the given one, else PrintTracer for verbose."""
+    if tracer is not None:
+        return tracer
+    return PrintTracer() if verbose else NULL_TRACER
@@ -1,26 +1,174 @@
 import gzip
 import itertools
 import json
-from typing import List
+from array import array
+from typing import Any, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional, only needed for backend="numpy"
+    np = None  # type: ignore[assignment]
+
+BACKENDS = ("array", "numpy")
 
 
 class TruthTable:
-    def __init__(self, num_qubits: int, initial_permutation: List[int] = None):
+    """
+    Reversible function on n qubits stored as the permutation itself:
+    ``rows[x]`` is the integer output of input row ``x`` (bit of qubit 0 is the MSB).
+    Bit-vector accessors (``get_vectors``, ``get_single_vector``, ...) are views built on demand.
+    With ``backend="numpy"`` rows are a uint ndarray and gates are applied to all rows at once.
+    """
+
+    def __init__(
+        self,
+        num_qubits: int,
+        initial_permutation: Optional[Sequence[int]] = None,
+        backend: str = "array",
+    ):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend: {backend!r} (expected one of {BACKENDS})")
+        if backend == "numpy" and np is None:
+            raise ImportError("backend='numpy' requires numpy to be installed")
         self.n = num_qubits
+        self.backend = backend
+        self.inverse: Any = None
 
         if initial_permutation is not None:
             perm = initial_permutation
             self._check_perm(perm)
-            self.vectors = [self._idx_to_bits(i, self.n) for i in perm]
+            self.rows = self._make_rows(perm)
 
         else:
-            self.vectors = [list(bits) for bits in itertools.product([0, 1], repeat=num_qubits)]
+            self.rows = self._make_rows(range(1 << num_qubits))
+
+    @staticmethod
+    def _typecode(n: int) -> str:
+        return "H" if n <= 16 else "I"
+
+    def _make_rows(self, values):
+        if self.backend == "numpy":
+            dtype = np.uint16 if self.n <= 16 else np.uint32
+            return np.fromiter(values, dtype=dtype, count=1 << self.n)
+        return array(self._typecode(self.n), values)
+
+    def with_backend(self, backend: str) -> "TruthTable":
+        """Returns a copy of the table stored with the given backend."""
+        return TruthTable(self.n, backend=backend).set_rows(self.rows.tolist())
+
+    @property
+    def vectors(self) -> List[List[int]]:
+        return self.get_vectors()
 
     def get_vectors(self):
-        return self.vectors
+        n = self.n
+        return [self._idx_to_bits(row, n) for row in self.rows.tolist()]
 
     def get_single_vector(self, index: int):
-        return self.vectors[index]
+        return self._idx_to_bits(int(self.rows[index]), self.n)
+
+    def get_row(self, index: int) -> int:
+        return int(self.rows[index])
+
+    def is_identity(self) -> bool:
+        if self.backend == "numpy":
+            return bool((self.rows == np.arange(1 << self.n)).all())
+        return self.rows == array(self.rows.typecode, range(1 << self.n))
+
+    def qubit_mask(self, qubit: int) -> int:
+        """Returns the integer mask of the given qubit inside a row."""
+        return 1 << (self.n - 1 - qubit)
+
+    def apply_masks(self, control_mask: int, target_mask: int):
+        """
+        Flips target_mask in every row whose value contains control_mask
+        (the gate acts on the outputs: f <- g . f).
+        """
+        self._flip_values(self.rows, control_mask, target_mask)
+        if self.inverse is not None:
+            self._permute_by_gate(self.inverse, control_mask, target_mask)
+        return self
+
+    def apply_masks_to_inputs(self, control_mask: int, target_mask: int):
+        """
+        Applies the gate on the input side (f <- f . g): row x takes the value of row g(x).
+        """
+        self._permute_by_gate(self.rows, control_mask, target_mask)
+        if self.inverse is not None:
+            self._flip_values(self.inverse, control_mask, target_mask)
+        return self
+
+    def enable_inverse(self):
+        """
+        Starts maintaining the inverse permutation (inverse[rows[x]] == x) under both
+        apply_masks and apply_masks_to_inputs. set_rows/set_vectors drop it again.
+        """
+        if self.inverse is None:
+            inverse = [0] * (1 << self.n)
+            for idx, row in enumerate(self.rows.tolist()):
+                inverse[row] = idx
+            self.inverse = self._make_rows(inverse)
+        return self
+
+    def inverse_row(self, value: int) -> int:
+        """Index of the row holding value (requires enable_inverse)."""
+        return int(self.inverse[value])
+
+    def _flip_values(self, values, control_mask: int, target_mask: int) -> None:
+        if self.backend == "numpy":
+            values[(values & control_mask) == control_mask] ^= target_mask
+            return
+        for idx, value in enumerate(values):
+            if value & control_mask == control_mask:
+                values[idx] = value ^ target_mask
+
+    def _permute_by_gate(self, values, control_mask: int, target_mask: int) -> None:
+        """values[x] <- values[g(x)]; g flips target_mask in indices containing control_mask."""
+        if control_mask & target_mask:
+            raise ValueError("Target qubit cannot also be a control")
+        if self.backend == "numpy":
+            idx = np.arange(1 << self.n)
+            values[:] = values[idx ^ (((idx & control_mask) == control_mask) * target_mask)]
+            return
+        # pairs (x, x | target) for every x containing the controls with the target bit clear
+        free = ((1 << self.n) - 1) & ~control_mask & ~target_mask
+        sub = free
+        while True:
+            x = control_mask | sub
+            y = x | target_mask
+            values[x], values[y] = values[y], values[x]
+            if sub == 0:
+                break
+            sub = (sub - 1) & free
+
+    def dry_run(self, control_mask: int, target_mask: int) -> Tuple[List[int], int]:
+        """
+        Evaluates apply_masks without modifying the table.
+        Returns (indices of rows that would be flipped,
+        change of the Hamming distance to the identity table).
+        """
+        rows = self.rows
+        if self.backend == "numpy":
+            hit = (rows & control_mask) == control_mask
+            wrong = ((rows ^ np.arange(1 << self.n, dtype=rows.dtype)) & target_mask) != 0
+            hits = np.flatnonzero(hit)
+            return hits.tolist(), int(hits.size) - 2 * int((hit & wrong).sum())
+
+        flipped = []
+        delta = 0
+        for idx, row in enumerate(rows):
+            if row & control_mask == control_mask:
+                flipped.append(idx)
+                # bit already wrong -> flip fixes it, bit correct -> flip breaks it
+                delta += -1 if (row ^ idx) & target_mask else 1
+        return flipped, delta
+
+    def hamming_distance_to_identity(self) -> int:
+        """Number of bits that differ between the table and the identity table."""
+        if self.backend == "numpy":
+            diff = self.rows ^ np.arange(1 << self.n, dtype=self.rows.dtype)
+            return int(np.unpackbits(diff.view(np.uint8)).sum())
+        return sum((row ^ idx).bit_count() for idx, row in enumerate(self.rows))
 
     def set_vectors(self, vectors: List[List[int]]):
         """
@@ -31,19 +179,37 @@ class TruthTable:
             raise ValueError("Kazdy wektor musi mieć dlugośsc rowna liczbie qubitow")
         if len(vectors) != (1 << self.n):
             raise ValueError("Liczba wektorow musi wynosić 2^n")
-        self.vectors = [list(vec) for vec in vectors]
+        self.rows = self._make_rows(self._bits_to_idx(vec) for vec in vectors)
+        self.inverse = None
+        return self
+
+    def set_rows(self, rows: List[int]):
+        """
+        Sets the truth table to the given permutation of row integers.
+        """
+        self._check_perm(rows)
+        self.rows = self._make_rows(rows)
+        self.inverse = None
         return self
 
     def _check_perm(self, perm):
         N = 1 << self.n
-        if not isinstance(perm, (list, tuple)) or len(perm) != N:
+        sequence_types = (list, tuple, array) if np is None else (list, tuple, array, np.ndarray)
+        if not isinstance(perm, sequence_types) or len(perm) != N:
             raise ValueError("Invalid permutation length")
         if sorted(perm) != list(range(N)):
             raise ValueError("Invalid permutation elements")
 
     @staticmethod
     def _idx_to_bits(idx: int, n: int):
-        return [int(b) for b in format(idx, f"0{n}b")]
+        return [(idx >> k) & 1 for k in range(n - 1, -1, -1)]
+
+    @staticmethod
+    def _bits_to_idx(bits: List[int]) -> int:
+        idx = 0
+        for b in bits:
+            idx = (idx << 1) | b
+        return idx
 
     def perm_to_bitlist(self, perm):
         """
@@ -58,7 +224,7 @@ class TruthTable:
         Returns the vectors as a list of integers.
         Each bit vector is converted to its corresponding decimal number.
         """
-        return [int("".join(map(str, vector)), 2) for vector in self.vectors]
+        return self.rows.tolist()
 
     @staticmethod
     def all_permutations(n: int):  # static method factory design pattern
@@ -72,6 +238,31 @@ class TruthTable:
             all_truth_tables.append(tt)
         return all_truth_tables
 
+    @staticmethod
+    def iter_permutations(
+        n: int, start: int = 0, stop: Optional[int] = None, backend: str = "array"
+    ):
+        """
+        Lazy counterpart of all_permutations: yields the truth tables with lexicographic
+        ranks start..stop-1 without materializing the whole list.
+        """
+        import PermutationSource  # imported here so TruthTable stays a leaf module
+
+        for perm in PermutationSource.iter_permutations(n, start, stop):
+            yield TruthTable(n, perm, backend=backend)
+
+    @staticmethod
+    def from_rank(n: int, rank: int, backend: str = "array"):
+        import PermutationSource
+
+        return TruthTable(n, PermutationSource.unrank(rank, 1 << n), backend=backend)
+
+    def rank(self) -> int:
+        """Lexicographic (Lehmer) rank of the permutation stored in the table."""
+        import PermutationSource
+
+        return PermutationSource.rank(self.rows.tolist())
+
     def dump_all_perms_jsonl(self, path="permutacje_n3.jsonl"):
         N = 1 << self.n
         open_fn = gzip.open if path.endswith(".gz") else open
@@ -82,7 +273,24 @@ class TruthTable:
                 f.write("\n")
         return path
 
+    def dump_all_perms_bin(self, path="permutacje_n3.bin"):
+        """
+        Binary counterpart of dump_all_perms_jsonl (see PermutationFile):
+        fixed-width records of output indices, readable through an mmap.
+        """
+        from PermutationFile import write_perms_bin
+
+        N = 1 << self.n
+        write_perms_bin(path, self.n, itertools.permutations(range(N)))
+        return path
+
     def __copy__(self):
-        new_tt = TruthTable(self.n)
-        new_tt.vectors = [vec.copy() for vec in self.vectors]
+        new_tt = TruthTable.__new__(TruthTable)
+        new_tt.n = self.n
+        new_tt.backend = self.backend
+        new_tt.rows = self.rows.copy() if self.backend == "numpy" else self.rows[:]
+        if self.inverse is None:
+            new_tt.inverse = None
+        else:
+            new_tt.inverse = self.inverse.copy() if self.backend == "numpy" else self.inverse[:]
         return new_tt
@@ -0,0 +1,51 @@
+import gzip
+import json
+import random
+from typing import Any, Iterable, Iterator, List, Sequence, Tuple
+
+from TruthTable import TruthTable
+
+# Wejścia (permutacje) i koszt obwodów wspólne dla main, Benchmark i Sampling.
+
+
+def iter_jsonl(path: str) -> Iterable[List[List[int]]]:
+    """Zwraca po kolei wpisy (lista wektorów bitowych) z JSONL / JSONL.GZ."""
+    open_fn = gzip.open if path.endswith(".gz") else open
+    with open_fn(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            s = line.strip()
+            if s:
+                yield json.loads(s)
+
+
+def parse_entry(idx: int, vectors: Sequence[Any], backend: str = "array") -> TruthTable:
+    """
+    Buduje TruthTable z wpisu: listy wektorów bitowych (JSONL) albo indeksów wyjściowych
+    (lista albo array prosto z PermutationFileReader); n wyznaczane z danych.
+    """
+    if vectors and isinstance(vectors[0], int):
+        n = (len(vectors) - 1).bit_length()
+        return TruthTable(n, vectors, backend=backend)
+    if not vectors or not isinstance(vectors[0], list):
+        raise ValueError(f"Wpis {idx}: niepoprawny format (brak listy bitów).")
+    n = len(vectors[0])
+    return TruthTable(n, backend=backend).set_vectors(list(vectors))
+
+
+def iter_random_permutations(n: int, seed: int) -> Iterator[List[int]]:
+    """Nieskończony strumień jednostajnie losowych permutacji n-bitowych (ustalony przez seed)."""
+    rng = random.Random(f"{seed}:{n}")
+    while True:
+        perm = list(range(1 << n))
+        rng.shuffle(perm)
+        yield perm
+
+
+def gate_label(qubits: Tuple[int, ...]) -> str:
+    """Nazwa bramki wg liczby qubitów w krotce."""
+    t = len(qubits)
+    return {1: "QNOT", 2: "CNOT", 3: "TOFFOLI"}.get(t, "MCT")
+
+
+def gate_cost(qubits: Tuple[int, ...]) -> int:
+    return 1 if len(qubits) <= 2 else 5
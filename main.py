@@ -1,134 +1,596 @@
 import argparse
 import gzip
-import io
 import json
+import queue
 import sys
-from collections import Counter
-from contextlib import redirect_stdout
-from typing import Iterable, List, Tuple
-
-import NumOfGatesOptimized as al
-from TruthTable import TruthTable
+import threading
+from collections import Counter, deque
+from contextlib import ExitStack
+from concurrent.futures import Future, ProcessPoolExecutor
+from copy import copy
+from functools import partial
+from itertools import chain, islice
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+import Algorithms
+import BatchAlgorithm
+import BeamSearch
+import Canonical
+import PermutationSource
+from Circuit import Circuit
+from Permutation import Permutation
+from PermutationFile import PermutationFileReader, is_perm_bin
+from ResultsCache import ResultsCache
+from ResultsFile import ChunkBuilder, ResultsFileWriter
+from SynthesisStats import SynthesisStats
+from Trace import NULL_TRACER, PrintTracer
+from TruthTable import BACKENDS, TruthTable
+from Workload import gate_cost, gate_label, iter_jsonl, parse_entry
 
 
 # ---------- I/O ----------
 
 
-def iter_jsonl(path: str) -> Iterable[List[List[int]]]:
-    """Zwraca po kolei wpisy (lista wektorów bitowych) z JSONL / JSONL.GZ."""
-    open_fn = gzip.open if path.endswith(".gz") else open
-    with open_fn(path, "rt", encoding="utf-8") as f:
-        for line in f:
-            s = line.strip()
-            if s:
-                yield json.loads(s)
+def _iter_chunks(
+    entries: Iterable[Tuple[int, Any]], chunk_size: int
+) -> Iterator[List[Tuple[int, Any]]]:
+    it = iter(entries)
+    while True:
+        chunk = list(islice(it, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class BinChunk:
+    """
+    Zakres rekordów [start, stop) binarnego pliku permutacji (PermutationFile).
+    Przy pickle przenoszone są tylko ścieżka i offsety — proces roboczy sam mapuje plik.
+    """
+
+    def __init__(self, path: str, start: int, stop: int):
+        self.path = path
+        self.start = start
+        self.stop = stop
+
+    def __iter__(self) -> Iterator[Tuple[int, Sequence[int]]]:
+        with PermutationFileReader(self.path) as reader:
+            for k, perm in enumerate(reader.iter_range(self.start, self.stop), start=self.start):
+                yield k + 1, perm
+
+
+class RankChunk:
+    """
+    Zakres rang [start, stop) permutacji n-bitowych generowanych w locie (PermutationSource).
+    Wpisy mają idx = ranga + 1, czyli ten sam perm_idx co w pliku z dump_all_perms_jsonl.
+    """
+
+    def __init__(self, n: int, start: int, stop: int):
+        self.n = n
+        self.start = start
+        self.stop = stop
+
+    def __iter__(self) -> Iterator[Tuple[int, List[int]]]:
+        perms = PermutationSource.iter_permutations(self.n, self.start, self.stop)
+        for r, perm in enumerate(perms, start=self.start):
+            yield r + 1, perm
+
+
+def iter_rank_chunks(
+    n: int, start: int, stop: Optional[int], chunk_size: int
+) -> Iterator[RankChunk]:
+    """Dzieli zakres rang [start, stop) na paczki — bez pliku wejściowego."""
+    total = PermutationSource.num_permutations(n)
+    stop = total if stop is None else min(stop, total)
+    for lo in range(start, stop, chunk_size):
+        yield RankChunk(n, lo, min(lo + chunk_size, stop))
+
+
+def iter_input_chunks(path: str, chunk_size: int) -> Iterator[Iterable[Tuple[int, Any]]]:
+    """
+    Dzieli wejście na paczki wpisów (idx, wpis). Plik binarny (rozpoznawany po nagłówku)
+    jest cięty po offsetach rekordów, JSONL / JSONL.GZ czytany strumieniowo.
+    """
+    if is_perm_bin(path):
+        with PermutationFileReader(path) as reader:
+            count = len(reader)
+        for start in range(0, count, chunk_size):
+            yield BinChunk(path, start, min(start + chunk_size, count))
+    else:
+        yield from _iter_chunks(enumerate(iter_jsonl(path), start=1), chunk_size)
+
+
+# ---------- Synteza ----------
+
+
+def _perm_bits(vectors: List[Any], n: int) -> List[List[int]]:
+    """Wpis w postaci listy wektorów bitowych (do pola perm_bits w wynikach)."""
+    if vectors and isinstance(vectors[0], int):
+        return TruthTable(n).perm_to_bitlist(vectors)
+    return vectors
 
 
-# ---------- Bramki / koszty ----------
+# opcje algorytmu z rejestru przekazywane jako argumenty nazwane jego funkcji algorithm
+AlgorithmOptions = Dict[str, Dict[str, Any]]
 
+# pamięć obwodów reprezentantów klas i trwała pamięć wyników (osobne w każdym procesie)
+_canonical_caches: Dict[Tuple[str, str], Canonical.CanonicalCache] = {}
+_results_cache: Optional[ResultsCache] = None
 
-def gate_label(qubits: Tuple[int, ...]) -> str:
-    """Nazwa bramki wg liczby qubitów w krotce."""
-    t = len(qubits)
-    return {1: "QNOT", 2: "CNOT", 3: "TOFFOLI"}.get(t, "MCT")
 
+def _get_results_cache(path: str) -> ResultsCache:
+    global _results_cache
+    if _results_cache is None or _results_cache.path != path:
+        if _results_cache is not None:
+            _results_cache.close()
+        _results_cache = ResultsCache(path)
+    return _results_cache
 
-def gate_cost(qubits: Tuple[int, ...]) -> int:
-    return 1 if len(qubits) <= 2 else 5
+
+def _close_results_cache() -> None:
+    global _results_cache
+    if _results_cache is not None:
+        _results_cache.close()
+        _results_cache = None
+
+
+def _synthesize_one(
+    f: TruthTable,
+    suppress_output: bool,
+    canonical: bool = False,
+    cache_path: str = "",
+    stats: Optional[SynthesisStats] = None,
+    algorithm: str = Algorithms.DEFAULT,
+    expected: Optional[Permutation] = None,
+    algorithm_options: Optional[AlgorithmOptions] = None,
+) -> Tuple[Circuit, bool]:
+    """
+    Uruchamia algorytm z rejestru (Algorithms) na f i sprawdza zwrócony obwód: skompilowany
+    do permutacji musi być odwrotnością f (jedno porównanie tablic; expected można podać).
+    Przy canonical syntetyzowany jest tylko reprezentant klasy f (Canonical.CanonicalCache).
+    Przy cache_path obwód jest najpierw szukany w ResultsCache, a nowe wyniki są tam dopisywane.
+    Przy stats algorytm zlicza swoją pracę w podanym SynthesisStats.
+    algorithm_options[algorithm] (np. {"width": 8} dla "beam") trafia do algorytmu jako
+    argumenty nazwane.
+    """
+    if expected is None:
+        expected = Permutation(f.rows).inverse()
+    algo_mod = Algorithms.get(algorithm)
+    options = (algorithm_options or {}).get(algorithm, {})
+    algo: Callable[..., Circuit] = (
+        partial(algo_mod.algorithm, **options) if options else algo_mod.algorithm
+    )
+    if canonical:
+        key = (algorithm, repr(sorted(options.items())))
+        if key not in _canonical_caches:
+            _canonical_caches[key] = Canonical.CanonicalCache(algo)
+        algo = _canonical_caches[key].algorithm
+    if cache_path:
+        algo = partial(
+            _get_results_cache(cache_path).synthesize,
+            algo_mod=algo_mod,
+            run=algo,
+            variant=Canonical if canonical else None,
+        )
+    if stats is not None:
+        algo = partial(algo, stats=stats)
+    cir = algo(f, tracer=NULL_TRACER if suppress_output else PrintTracer())
+    return cir, cir.to_permutation(f.n) == expected
+
+
+Outcome = Union[Tuple[Circuit, bool], Exception]
+
+# BatchAlgorithm realizuje procedurę tego algorytmu z rejestru — tylko on działa paczkami
+BATCH_ALGORITHM = "basic"
+
+
+def iter_results(
+    entries: Iterable[Tuple[int, Any]],
+    suppress_output: bool = True,
+    backend: str = "array",
+    batch_size: int = 0,
+    canonical: bool = False,
+    cache_path: str = "",
+    stats: Optional[Dict[str, SynthesisStats]] = None,
+    algorithms: Sequence[str] = (Algorithms.DEFAULT,),
+    algorithm_options: Optional[AlgorithmOptions] = None,
+) -> Iterator[Tuple[int, Any, Union[Tuple[int, Dict[str, Outcome]], Exception]]]:
+    """
+    Dla każdego wpisu (idx, wektory) zwraca (idx, wektory, wynik), gdzie wynik to
+    (n, {algorytm: (obwód, ok) albo wyjątek}) albo wyjątek parsowania. Wpis jest parsowany
+    raz, a każdy algorytm dostaje własną kopię tablicy prawdy.
+    Przy batch_size > 0 wpisy są syntetyzowane paczkami przez BatchAlgorithm (procedura
+    BasicAlgorithm, wymaga numpy; algorithms musi być wtedy [BATCH_ALGORITHM]).
+    Przy canonical obwody pochodzą z syntezy reprezentantów klas, a przy cache_path
+    z trwałej pamięci wyników, jeśli już tam są (obie opcje tylko bez paczek).
+    stats (liczniki SynthesisStats per algorytm) wypełniane są tylko bez paczek.
+    algorithm_options: argumenty nazwane algorytmów wg nazwy (_synthesize_one).
+    """
+    if batch_size <= 0:
+        for idx, vectors in entries:
+            try:
+                f = parse_entry(idx, vectors, backend)
+            except Exception as e:
+                yield idx, vectors, e
+                continue
+            expected = Permutation(f.rows).inverse()
+            outcomes: Dict[str, Outcome] = {}
+            for name in algorithms:
+                try:
+                    outcomes[name] = _synthesize_one(
+                        copy(f) if len(algorithms) > 1 else f,
+                        suppress_output,
+                        canonical,
+                        cache_path,
+                        None if stats is None else stats[name],
+                        name,
+                        expected,
+                        algorithm_options,
+                    )
+                except Exception as e:
+                    outcomes[name] = e
+            yield idx, vectors, (f.n, outcomes)
+        return
+
+    (name,) = algorithms
+    for chunk in _iter_chunks(entries, batch_size):
+        parsed: List[Tuple[int, Any, Union[TruthTable, Exception]]] = []
+        for idx, vectors in chunk:
+            try:
+                parsed.append((idx, vectors, parse_entry(idx, vectors)))
+            except Exception as e:
+                parsed.append((idx, vectors, e))
+
+        # paczki muszą mieć jednakowe n — grupujemy wpisy po n
+        by_n: Dict[int, List[TruthTable]] = {}
+        for _, _, table in parsed:
+            if isinstance(table, TruthTable):
+                by_n.setdefault(table.n, []).append(table)
+        circuits: Dict[int, Union[Circuit, Exception]] = {}
+        inverses = {id(t): Permutation(t.rows).inverse() for t in chain(*by_n.values())}
+        for tables in by_n.values():
+            try:
+                for t, cir in zip(tables, BatchAlgorithm.algorithm(tables)):
+                    circuits[id(t)] = cir
+            except Exception as e:
+                for t in tables:
+                    circuits[id(t)] = e
+
+        for idx, vectors, table in parsed:
+            if isinstance(table, Exception):
+                yield idx, vectors, table
+                continue
+            circuit = circuits[id(table)]
+            outcome: Outcome = (
+                circuit
+                if isinstance(circuit, Exception)
+                else (circuit, circuit.to_permutation(table.n) == inverses[id(table)])
+            )
+            yield idx, vectors, (table.n, {name: outcome})
 
 
 # ---------- Główna pętla ----------
 
+OUTPUT_FORMATS = ("jsonl", "bin")
 
-def run_all(
-    input_path: str,
-    output_path: str,
-    stats_path: str,
+
+def _new_totals() -> Dict[str, Any]:
+    return {"hist_num_gates": Counter(), "hist_cost": Counter(), "failures": 0, "errors": 0}
+
+
+def _circuit_record(
+    is_ok: bool, instr: List[Tuple[int, ...]], num_gates: int, circuit_cost: int
+) -> Dict[str, Any]:
+    instr_names = [gate_label(t) for t in instr]
+    return {
+        "ok": is_ok,
+        "num_gates": num_gates,
+        "circuit_cost": circuit_cost,
+        "gates_used": dict(Counter(instr_names)),
+        "instructions": [
+            {"gate": name, "num_args": len(t), "qubits": list(t)}
+            for name, t in zip(instr_names, instr)
+        ],
+    }
+
+
+def _process_chunk(
+    chunk: Iterable[Tuple[int, Any]],
     suppress_output: bool = True,
-    progress_every: int = 1000,
+    backend: str = "array",
+    batch_size: int = 0,
     print_gates: bool = False,
     print_first_n: int = 3,
-) -> None:
+    store_rank: bool = False,
+    optimize: bool = False,
+    canonical: bool = False,
+    cache_path: str = "",
+    instrument: bool = False,
+    output_format: str = "jsonl",
+    algorithms: Sequence[str] = (Algorithms.DEFAULT,),
+    algorithm_options: Optional[AlgorithmOptions] = None,
+) -> Dict[str, Any]:
     """
-    Przetwarza wszystkie permutacje z pliku wejściowego:
-    - uruchamia al.algorithm,
-    - zlicza liczbę bramek i koszt,
-    - zapisuje rekordy JSONL i statystyki JSON.
+    Przetwarza paczkę wpisów (idx, wektory): syntetyzuje obwody, buduje gotowe linie JSONL
+    i cząstkowe statystyki. Wywoływana w procesie głównym albo w procesach roboczych.
+    Przy store_rank rekord zawiera perm_rank (= idx - 1) zamiast perm_bits.
+    Przy optimize obwód przechodzi przez Circuit.optimize (koszt wg gate_cost) i jest
+    ponownie weryfikowany na tablicy wejściowej. Przy cache_path nowe wpisy ResultsCache
+    są zatwierdzane na końcu paczki. Przy instrument wynik zawiera liczniki SynthesisStats.
+    Przy output_format="bin" zamiast linii JSONL powstają spakowane paczki ResultsFile
+    (paczka ma jedno n, więc przy zmianie n zaczyna się następna).
+    Przy kilku algorytmach rekord ma wyniki każdego z nich pod "results" i najlepszy
+    wynik (najmniej bramek, najmniejszy koszt) pod "best"; statystyki są per algorytm.
     """
-
-    hist_num_gates = Counter()
-    hist_cost = Counter()
-    total = 0
-    failures = 0
-    errors = 0
-
-    open_out = gzip.open if output_path.endswith(".gz") else open
-    with open_out(output_path, "wt", encoding="utf-8") as out_f:
-        for idx, vectors in enumerate(iter_jsonl(input_path), start=1):
-            total = idx
+    lines: List[str] = []
+    block = ChunkBuilder() if output_format == "bin" else None
+    blocks: List[bytes] = []
+    indices: List[int] = []
+    multi = len(algorithms) > 1
+    totals = {name: _new_totals() for name in algorithms}
+    best_totals: Dict[str, Counter] = {"hist_num_gates": Counter(), "hist_cost": Counter()}
+    wins: Counter = Counter()
+    stats = {name: SynthesisStats() for name in algorithms} if instrument else None
+
+    results = iter_results(
+        chunk,
+        suppress_output,
+        backend,
+        batch_size,
+        canonical,
+        cache_path,
+        stats,
+        algorithms,
+        algorithm_options,
+    )
+    for idx, vectors, outcome in results:
+        indices.append(idx)
+        if isinstance(outcome, Exception):
+            outcomes: Dict[str, Outcome] = {name: outcome for name in algorithms}
+            n: Optional[int] = None
+        else:
+            n, outcomes = outcome
+
+        done: Dict[str, Union[Tuple[bool, List[Tuple[int, ...]], int, int], Exception]] = {}
+        for name, res in outcomes.items():
+            t = totals[name]
             try:
-                # wyznacz n z danych
-                if not vectors or not isinstance(vectors[0], list):
-                    raise ValueError(f"Wpis {idx}: niepoprawny format (brak listy bitów).")
-                n = len(vectors[0])
-
-                # zbuduj TT i uruchom algorytm
-                f = TruthTable(n).set_vectors(vectors)
-                if suppress_output:
-                    with redirect_stdout(io.StringIO()):
-                        cir = al.algorithm(f, verbose=False)
-                else:
-                    cir = al.algorithm(f, verbose=True)
+                if isinstance(res, Exception):
+                    raise res
+                cir, is_ok = res
+                assert n is not None  # n brak tylko przy błędzie parsowania wpisu
 
-                # weryfikacja — po algorithm f powinno być ideałem
-                ideal = TruthTable(n)
-                is_ok = f.get_vectors() == ideal.get_vectors()
+                if optimize:
+                    before = cir.to_permutation(n)
+                    cir.optimize(cost=lambda g: gate_cost(g.qubits))
+                    is_ok = is_ok and cir.to_permutation(n) == before
+
+                # weryfikacja — obwód musi realizować f^-1
                 if not is_ok:
-                    failures += 1
+                    t["failures"] += 1
 
                 instr = [tuple(g.qubits) for g in cir.instructions]
                 num_gates = len(cir.instructions)
-                instr_names = [gate_label(t) for t in instr]
-                circuit_cost = sum(gate_cost(t) for t in instr)
+                circuit_cost = sum(gate_cost(q) for q in instr)
 
                 # histogramy
-                hist_num_gates.update([num_gates])
-                hist_cost.update([circuit_cost])
+                t["hist_num_gates"].update([num_gates])
+                t["hist_cost"].update([circuit_cost])
 
                 # podgląd pierwszych obwodów
                 if print_gates and idx <= print_first_n:
                     print(
-                        f"perm {idx}: n={n}, ok={is_ok}, "
-                        f"{num_gates} bramek, koszt={circuit_cost} -> {' '.join(instr_names)}"
+                        f"{f'[{name}] ' if multi else ''}perm {idx}: n={n}, ok={is_ok}, "
+                        f"{num_gates} bramek, koszt={circuit_cost} -> "
+                        f"{' '.join(gate_label(q) for q in instr)}"
                     )
-
-                # zapis JSONL
-                record = {
-                    "perm_idx": idx,
-                    "n": n,
-                    "ok": is_ok,
-                    "num_gates": num_gates,
-                    "circuit_cost": circuit_cost,
-                    "gates_used": dict(Counter(instr_names)),
-                    "instructions": [
-                        {"gate": name, "num_args": len(t), "qubits": list(t)}
-                        for name, t in zip(instr_names, instr)
-                    ],
-                    "perm_bits": vectors,
+                done[name] = (is_ok, instr, num_gates, circuit_cost)
+            except Exception as e:
+                t["errors"] += 1
+                done[name] = e
+
+        if not multi:
+            (single,) = done.values()
+            # wpisz do outputu informację o błędzie dla spójności śledzenia
+            if isinstance(single, Exception):
+                if block is not None:
+                    block.add_error(idx)
+                else:
+                    error_record = {"perm_idx": idx, "error": repr(single)}
+                    lines.append(json.dumps(error_record, separators=(",", ":")) + "\n")
+                continue
+            # zapis binarny — bez nazw bramek i JSON
+            if block is not None:
+                is_ok, instr, _, circuit_cost = single
+                if block.n is not None and block.n != n:
+                    blocks.append(block.to_bytes())
+                    block = ChunkBuilder()
+                block.add(idx, n or 0, is_ok, instr, circuit_cost)
+                continue
+            record = {"perm_idx": idx, "n": n, **_circuit_record(*single)}
+        else:
+            record = {
+                "perm_idx": idx,
+                "n": n,
+                "results": {
+                    name: {"error": repr(res)}
+                    if isinstance(res, Exception)
+                    else _circuit_record(*res)
+                    for name, res in done.items()
+                },
+            }
+            # portfolio: najlepszy poprawny wynik osobno wg liczby bramek i wg kosztu
+            valid = {k: r for k, r in done.items() if not isinstance(r, Exception) and r[0]}
+            if valid:
+                by_gates = min(valid, key=lambda k: (valid[k][2], valid[k][3]))
+                by_cost = min(valid, key=lambda k: (valid[k][3], valid[k][2]))
+                best_cost = valid[by_cost][3]
+                wins.update(k for k, r in valid.items() if r[3] == best_cost)
+                best_totals["hist_num_gates"].update([valid[by_gates][2]])
+                best_totals["hist_cost"].update([best_cost])
+                record["best"] = {
+                    "num_gates": {"algorithm": by_gates, "value": valid[by_gates][2]},
+                    "circuit_cost": {"algorithm": by_cost, "value": best_cost},
                 }
-                out_f.write(json.dumps(record, separators=(",", ":")) + "\n")
+            else:
+                record["best"] = None
+
+        if store_rank:
+            record["perm_rank"] = idx - 1
+        elif n is not None:
+            record["perm_bits"] = _perm_bits(vectors, n)
+        lines.append(json.dumps(record, separators=(",", ":")) + "\n")
+
+    if cache_path:
+        _get_results_cache(cache_path).commit()
+
+    if block is not None:
+        blocks.append(block.to_bytes())
+    for name, t in totals.items():
+        t["wins"] = wins[name]
+        t["synthesis_stats"] = None if stats is None else stats[name].as_dict()
+    return {
+        "lines": lines,
+        "blocks": blocks,
+        "indices": indices,
+        "algorithms": totals,
+        "best": best_totals,
+    }
 
-                if progress_every and idx % progress_every == 0:
-                    print(f"Przetworzono {idx} permutacji...")
 
-            except Exception as e:
-                errors += 1
-                # wpisz do outputu informację o błędzie dla spójności śledzenia
-                error_record = {"perm_idx": idx, "error": repr(e)}
-                out_f.write(json.dumps(error_record, separators=(",", ":")) + "\n")
-                # i kontynuuj
+def _iter_chunk_results(
+    chunks: Iterable[Iterable[Tuple[int, Any]]],
+    process: Callable[[Iterable[Tuple[int, Any]]], Dict[str, Any]],
+    workers: int,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Wyniki paczek w kolejności wejścia. Przy workers > 1 paczki trafiają do
+    ProcessPoolExecutor, a liczba paczek „w locie” jest ograniczona (2 na proces).
+    """
+    if workers <= 1:
+        for chunk in chunks:
+            yield process(chunk)
+        return
 
-    # statystyki zbiorcze
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending: Deque[Future] = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(process, chunk))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+_DONE = object()
+
+
+def _put(q: "queue.Queue[Any]", item: Any, stop: threading.Event) -> bool:
+    """put z backpressure, przerywane przez stop (gdy druga strona potoku już skończyła)."""
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+
+def _prefetch(items: Iterable[Any], depth: int) -> Iterator[Any]:
+    """
+    Etap czytający potoku: items (dekompresja, parsowanie JSONL) są pobierane w osobnym
+    wątku do kolejki o pojemności depth, więc I/O nakłada się na syntezę. Wyjątek wątku
+    jest rzucany u konsumenta; przerwanie konsumenta zatrzymuje wątek.
+    """
+    q: "queue.Queue[Any]" = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+    error: List[BaseException] = []
+
+    def produce() -> None:
+        try:
+            for item in items:
+                if not _put(q, item, stop):
+                    return
+        except BaseException as e:
+            error.append(e)
+        _put(q, _DONE, stop)
+
+    thread = threading.Thread(target=produce, name="run_all-reader", daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = q.get()
+            if item is _DONE:
+                break
+            yield item
+    finally:
+        stop.set()
+        thread.join()
+    if error:
+        raise error[0]
+
+
+class _WriteBehind:
+    """
+    Etap zapisujący potoku: write(item) wykonywane w osobnym wątku (kompresja gzip i zapis
+    pliku zwalniają GIL), kolejka o pojemności depth daje backpressure. Błąd zapisu jest
+    rzucany przy następnym put() albo w close().
+    """
+
+    def __init__(self, write: Callable[[Any], None], depth: int):
+        self._write = write
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=depth)
+        self._stop = threading.Event()
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._run, name="run_all-writer", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                item = self._queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if item is _DONE:
+                return
+            try:
+                self._write(item)
+            except BaseException as e:
+                self._error = e
+                self._stop.set()
+                return
+
+    def put(self, item: Any) -> None:
+        if self._error is None:
+            _put(self._queue, item, self._stop)
+        if self._error is not None:
+            raise self._error
+
+    def close(self) -> None:
+        _put(self._queue, _DONE, self._stop)
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
+
+    def abort(self) -> None:
+        """Zatrzymuje wątek bez zapisywania reszty kolejki (np. po wyjątku w syntezie)."""
+        self._stop.set()
+        self._thread.join()
+
+
+def _hist_summary(hist_num_gates: Counter, hist_cost: Counter) -> Dict[str, Any]:
     def _avg(counter: Counter) -> float:
         total_items = sum(counter.values())
         if total_items == 0:
@@ -136,10 +598,7 @@ def run_all(
         tot = sum(value * count for value, count in counter.items())
         return tot / total_items
 
-    stats = {
-        "total_perms": total,
-        "failures": failures,  # przypadki, gdzie algorytm nie doprowadził do ideału
-        "errors": errors,  # nieoczekiwane wyjątki podczas przetwarzania wpisu
+    return {
         "hist_num_gates": dict(sorted(hist_num_gates.items())),
         "hist_cost": dict(sorted(hist_cost.items())),
         "avg_num_gates": _avg(hist_num_gates),
@@ -150,6 +609,190 @@ def run_all(
         "max_cost": max(hist_cost.keys()) if hist_cost else None,
     }
 
+
+def run_all(
+    input_path: str,
+    output_path: str,
+    stats_path: str,
+    suppress_output: bool = True,
+    progress_every: int = 1000,
+    print_gates: bool = False,
+    print_first_n: int = 3,
+    backend: str = "array",
+    batch_size: int = 0,
+    workers: int = 1,
+    chunk_size: int = 1000,
+    n: Optional[int] = None,
+    start: int = 0,
+    stop: Optional[int] = None,
+    optimize: bool = False,
+    canonical: bool = False,
+    cache_path: str = "",
+    instrument: bool = False,
+    output_format: str = "jsonl",
+    pipeline_depth: int = 4,
+    algorithms: Sequence[str] = (Algorithms.DEFAULT,),
+    algorithm_options: Optional[AlgorithmOptions] = None,
+) -> None:
+    """
+    Przetwarza wszystkie permutacje z pliku wejściowego:
+    - uruchamia algorytmy z rejestru Algorithms (lub BatchAlgorithm paczkami, gdy
+      batch_size > 0); przy kilku algorytmach każdy wpis jest parsowany raz, a rekordy
+      i statystyki zawierają wyniki każdego algorytmu oraz najlepszy z nich ("best"),
+    - przy workers > 1 rozdziela paczki po chunk_size wpisów na procesy robocze,
+    - gdy podano n, pomija plik wejściowy i generuje permutacje o rangach [start, stop)
+      (rekordy identyfikuje wtedy perm_rank zamiast perm_bits),
+    - przy optimize upraszcza obwody (Circuit.optimize) przed zapisem,
+    - przy canonical syntetyzuje tylko reprezentantów klas symetrii (odwrócenie, relabeling
+      kubitów) i przekłada ich obwody na pozostałe permutacje,
+    - przy cache_path bierze gotowe obwody z trwałej pamięci wyników (sqlite) i dopisuje nowe,
+    - zlicza liczbę bramek i koszt (a przy instrument także liczniki SynthesisStats,
+      zapisywane w statystykach pod kluczem "synthesis"),
+    - zapisuje rekordy JSONL (w kolejności perm_idx) i statystyki JSON; przy
+      output_format="bin" rekordy trafiają do binarnego pliku kolumnowego (ResultsFile:
+      perm_idx, ok, liczba bramek, koszt, cel + maska sterowań każdej bramki),
+    - przy pipeline_depth > 0 czytanie wejścia i zapis wyników działają w osobnych wątkach
+      z kolejkami o tej pojemności; synteza zostaje w wątku głównym (lub w puli procesów),
+    - algorithm_options[nazwa] przekazuje algorytmowi argumenty nazwane (np. width, objective,
+      workers dla "beam"); algorytm z workers > 1 dostaje jedną pulę procesów na cały
+      przebieg, co wyklucza workers > 1 samego run_all.
+    """
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Nieznany format: {output_format!r} (dozwolone: {OUTPUT_FORMATS})")
+    if (canonical or cache_path) and batch_size > 0:
+        raise ValueError("canonical/cache nie działają z syntezą paczkami (batch_size > 0)")
+    algorithms = list(algorithms)
+    for name in algorithms:
+        Algorithms.get(name)
+    multi = len(algorithms) > 1
+    if batch_size > 0 and algorithms != [BATCH_ALGORITHM]:
+        raise ValueError(
+            f"synteza paczkami (batch_size > 0) to procedura {BATCH_ALGORITHM!r}, "
+            f"a wybrano: {', '.join(algorithms)}"
+        )
+    if multi and output_format == "bin":
+        raise ValueError("kilka algorytmów naraz nie działa z formatem bin")
+
+    # pule procesów algorytmów (workers > 1) tworzone raz i zamykane po przebiegu
+    pools = ExitStack()
+    # opcje tylko dla wybranych algorytmów — niewybrany nie dostaje puli ani nie blokuje workers
+    algorithm_options = {
+        name: dict(options)
+        for name, options in (algorithm_options or {}).items()
+        if name in algorithms
+    }
+    for name, options in algorithm_options.items():
+        if options.get("workers", 1) > 1:
+            if workers > 1:
+                raise ValueError(
+                    f"workers > 1 dla algorytmu {name!r} nie działa z workers > 1 run_all"
+                )
+            options["executor"] = pools.enter_context(
+                ProcessPoolExecutor(max_workers=options.pop("workers"))
+            )
+
+    totals = {name: _new_totals() for name in algorithms}
+    synthesis = {name: SynthesisStats() for name in algorithms}
+    best_totals: Dict[str, Counter] = {"hist_num_gates": Counter(), "hist_cost": Counter()}
+    wins: Counter = Counter()
+    total = 0
+
+    process = partial(
+        _process_chunk,
+        suppress_output=suppress_output,
+        backend=backend,
+        batch_size=batch_size,
+        print_gates=print_gates,
+        print_first_n=print_first_n,
+        store_rank=n is not None,
+        optimize=optimize,
+        canonical=canonical,
+        cache_path=cache_path,
+        instrument=instrument,
+        output_format=output_format,
+        algorithms=algorithms,
+        algorithm_options=algorithm_options,
+    )
+    chunk_size = max(chunk_size, batch_size, 1)
+    if n is not None:
+        chunks: Iterable[Iterable[Tuple[int, Any]]] = iter_rank_chunks(n, start, stop, chunk_size)
+    else:
+        chunks = iter_input_chunks(input_path, chunk_size)
+
+    if output_format == "bin":
+        out_f: Any = ResultsFileWriter(output_path)
+    else:
+        open_out = gzip.open if output_path.endswith(".gz") else open
+        out_f = open_out(output_path, "wt", encoding="utf-8")
+
+    def write(result: Dict[str, Any]) -> None:
+        if output_format == "bin":
+            for data in result["blocks"]:
+                out_f.write_chunk(data)
+        else:
+            out_f.writelines(result["lines"])
+
+    if pipeline_depth > 0:
+        if workers <= 1:
+            # paczki z pliku binarnego / rang też dekodowane w wątku czytającym
+            chunks = (c if isinstance(c, list) else list(c) for c in chunks)
+        chunks = _prefetch(chunks, pipeline_depth)
+
+    with pools, out_f:
+        writer = _WriteBehind(write, pipeline_depth) if pipeline_depth > 0 else None
+        try:
+            for result in _iter_chunk_results(chunks, process, workers):
+                if writer is not None:
+                    writer.put(result)
+                else:
+                    write(result)
+
+                # scal cząstkowe statystyki
+                for name, part in result["algorithms"].items():
+                    t = totals[name]
+                    t["hist_num_gates"].update(part["hist_num_gates"])
+                    t["hist_cost"].update(part["hist_cost"])
+                    t["failures"] += part["failures"]
+                    t["errors"] += part["errors"]
+                    wins[name] += part["wins"]
+                    if part["synthesis_stats"] is not None:
+                        synthesis[name].merge(part["synthesis_stats"])
+                for key, hist in result["best"].items():
+                    best_totals[key].update(hist)
+
+                total += len(result["indices"])
+                for idx in result["indices"]:
+                    if progress_every and idx % progress_every == 0:
+                        print(f"Przetworzono {idx} permutacji...")
+        except BaseException:
+            if writer is not None:
+                writer.abort()
+            raise
+        if writer is not None:
+            writer.close()
+    _close_results_cache()
+
+    # statystyki zbiorcze
+    def _summary(name: str) -> Dict[str, Any]:
+        t = totals[name]
+        summary = {
+            "failures": t["failures"],  # przypadki, gdzie algorytm nie doprowadził do ideału
+            "errors": t["errors"],  # nieoczekiwane wyjątki podczas przetwarzania wpisu
+            **_hist_summary(t["hist_num_gates"], t["hist_cost"]),
+        }
+        if multi:
+            summary["best_cost_wins"] = wins[name]  # wpisy z najmniejszym kosztem (z remisami)
+        if instrument:
+            summary["synthesis"] = synthesis[name].as_dict()
+        return summary
+
+    stats: Dict[str, Any] = {"total_perms": total}
+    if multi:
+        stats["algorithms"] = {name: _summary(name) for name in algorithms}
+        stats["best"] = _hist_summary(best_totals["hist_num_gates"], best_totals["hist_cost"])
+    else:
+        stats.update(_summary(algorithms[0]))
+
     with open(stats_path, "w", encoding="utf-8") as sf:
         json.dump(stats, sf, ensure_ascii=False, indent=2)
 
@@ -162,7 +805,7 @@ def parse_args(argv: List[str]) -> argparse.Namespace:
     p.add_argument(
         "--input",
         default="permutacje_n4.jsonl",
-        help="Ścieżka do JSONL/JSONL.GZ z permutacjami (bitlisty).",
+        help="Ścieżka do JSONL/JSONL.GZ z permutacjami (bitlisty) lub pliku binarnego.",
     )
     p.add_argument(
         "--output", default="results_n4.jsonl", help="Ścieżka wyjściowa JSONL/JSONL.GZ z wynikami."
@@ -188,11 +831,112 @@ def parse_args(argv: List[str]) -> argparse.Namespace:
         default=3,
         help="Ile pierwszych permutacji wypisać, jeśli --print-gates.",
     )
+    p.add_argument(
+        "--batch-size",
+        type=int,
+        default=0,
+        help="Synteza paczkami po K permutacji (procedura BasicAlgorithm, numpy; 0 = wyłącz).",
+    )
+    p.add_argument(
+        "--backend",
+        choices=BACKENDS,
+        default="array",
+        help="Reprezentacja tablicy prawdy (numpy = wektorowe nakładanie bramek).",
+    )
+    p.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Liczba procesów roboczych (1 = jednowątkowo).",
+    )
+    p.add_argument(
+        "--chunk-size",
+        type=int,
+        default=1000,
+        help="Ile wpisów trafia naraz do jednego procesu roboczego.",
+    )
+    p.add_argument(
+        "--n",
+        type=int,
+        default=None,
+        help="Generuj permutacje n-bitowe w locie (zamiast --input), po randze Lehmera.",
+    )
+    p.add_argument("--start", type=int, default=0, help="Pierwsza ranga (z --n).")
+    p.add_argument(
+        "--stop", type=int, default=None, help="Ranga za ostatnią (z --n; domyślnie (2^n)!)."
+    )
+    p.add_argument(
+        "--optimize",
+        action="store_true",
+        help="Uprość obwody po syntezie (skracanie bramek, komutacja, szablony).",
+    )
+    p.add_argument(
+        "--canonical",
+        action="store_true",
+        help="Syntetyzuj tylko reprezentantów klas (odwrócenie, relabeling kubitów).",
+    )
+    p.add_argument(
+        "--cache",
+        default="",
+        help="Plik sqlite z zapamiętanymi obwodami (pomija syntezę znanych permutacji).",
+    )
+    p.add_argument(
+        "--instrument",
+        action="store_true",
+        help="Zbieraj liczniki pracy algorytmu (SynthesisStats) do pliku statystyk.",
+    )
+    p.add_argument(
+        "--algorithms",
+        default=None,
+        help=(
+            "Algorytmy rozdzielone przecinkami "
+            f"({', '.join(Algorithms.ALGORITHMS)}); kilka = jeden przebieg z porównaniem. "
+            f"Domyślnie {Algorithms.DEFAULT} ({BATCH_ALGORITHM} przy --batch-size)."
+        ),
+    )
+    p.add_argument(
+        "--pipeline-depth",
+        type=int,
+        default=4,
+        help="Pojemność kolejek wątku czytającego i zapisującego (0 = bez wątków).",
+    )
+    p.add_argument(
+        "--format",
+        choices=OUTPUT_FORMATS,
+        default=None,
+        help="Format wyników: jsonl albo bin (ResultsFile); domyślnie wg rozszerzenia --output.",
+    )
+    p.add_argument(
+        "--beam-width",
+        type=int,
+        default=BeamSearch.DEFAULT_WIDTH,
+        help="Szerokość wiązki algorytmu beam.",
+    )
+    p.add_argument(
+        "--beam-objective",
+        choices=BeamSearch.OBJECTIVES,
+        default="cost",
+        help="Kryterium wyboru stanów wiązki algorytmu beam.",
+    )
+    p.add_argument(
+        "--beam-workers",
+        type=int,
+        default=1,
+        help="Procesy rozwijające wiązkę algorytmu beam (tylko przy --workers 1).",
+    )
     return p.parse_args(argv)
 
 
 def main(argv: List[str] | None = None) -> None:
     args = parse_args(sys.argv[1:] if argv is None else argv)
+    try:
+        if args.algorithms is None:
+            args.algorithms = BATCH_ALGORITHM if args.batch_size > 0 else Algorithms.DEFAULT
+        algorithms = Algorithms.parse_names(args.algorithms)
+    except ValueError as e:
+        raise SystemExit(str(e))
+    if "beam" in algorithms and args.beam_workers > 1 and args.workers > 1:
+        raise SystemExit("--beam-workers > 1 nie działa z --workers > 1")
     run_all(
         input_path=args.input,
         output_path=args.output,
@@ -201,6 +945,27 @@ def main(argv: List[str] | None = None) -> None:
         progress_every=args.progress_every if args.progress_every > 0 else 0,
         print_gates=args.print_gates,
         print_first_n=args.print_first_n,
+        backend=args.backend,
+        batch_size=args.batch_size,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        n=args.n,
+        start=args.start,
+        stop=args.stop,
+        optimize=args.optimize,
+        canonical=args.canonical,
+        cache_path=args.cache,
+        instrument=args.instrument,
+        pipeline_depth=args.pipeline_depth,
+        algorithms=algorithms,
+        algorithm_options={
+            "beam": {
+                "width": args.beam_width,
+                "objective": args.beam_objective,
+                "workers": args.beam_workers,
+            }
+        },
+        output_format=args.format or ("bin" if args.output.endswith(".bin") else "jsonl"),
     )
 
 